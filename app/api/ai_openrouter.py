@@ -101,13 +101,9 @@ async def chat_with_ai(req: ChatRequest):
                     json=payload,
                 )
 
-                body_snippet = (resp.text or "")[:300]
-                logger.info(
-                    "openrouter: model=%s status=%s body_snippet=%s",
-                    model,
-                    resp.status_code,
-                    body_snippet,
-                )
+                logger.info("openrouter: model=%s status=%s", model, resp.status_code)
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("openrouter: model=%s body_snippet=%s", model, (resp.text or "")[:300])
 
                 if resp.status_code != 200:
                     continue
@@ -1,32 +1,121 @@
 # app/api/routes_admin.py
-from fastapi import APIRouter, Depends, HTTPException, Body
-from typing import List, Union
+from fastapi import APIRouter, Depends, HTTPException, Body, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import List, Optional, Union
+from sqlalchemy import func
 from sqlmodel import Session, select
 from uuid import UUID
+from datetime import datetime
 import os
+import json
 from app.core.db import get_session
-from app.models.domain_models import AgentLog, SimulationSession, Offer, UserProfile
+from app.core.replica import get_read_session, read_session
+from app.models.domain_models import AgentLog, SimulationSession, SessionStatus, Offer, UserProfile, LetterRegenRun
+from app.services.agent_logs import AGENT_LOG_SUMMARY_COLUMNS, agent_log_data, agent_log_summary
+from app.services.archive import get_archived_session
+from app.services.audit_export import export_rows, ndjson_chunks, parse_export_cursor
 from app.services.chat_service import rerun_agents_for_session
+from app.services.letter_regen import regenerate_letters, run_progress
+from app.services.pagination import after, decode_cursor, encode_cursor, page_size
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
 @router.get("/sessions")
-def list_sessions(db: Session = Depends(get_session)):
-    rows = db.exec(select(SimulationSession)).all()
-    return {"sessions": rows}
+def list_sessions(
+    status: Optional[SessionStatus] = None,
+    customer_id: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    counts: bool = False,
+    db: Session = Depends(get_read_session),
+):
+    """Newest first, one bounded page at a time; pass `next_cursor` back as `cursor` for the next page."""
+    filters = []
+    if status is not None:
+        filters.append(SimulationSession.status == status)
+    if customer_id is not None:
+        filters.append(SimulationSession.customer_id == customer_id)
+    if created_from is not None:
+        filters.append(SimulationSession.created_at >= created_from)
+    if created_to is not None:
+        filters.append(SimulationSession.created_at < created_to)
+
+    size = page_size(limit)
+    stmt = select(SimulationSession).where(*filters)
+    if cursor:
+        stmt = stmt.where(after(SimulationSession.created_at, SimulationSession.id, decode_cursor(cursor), descending=True))
+    rows = db.exec(
+        stmt.order_by(SimulationSession.created_at.desc(), SimulationSession.id.desc()).limit(size + 1)
+    ).all()
+    # one extra row tells us whether there is a next page without a COUNT
+    rows, more = rows[:size], len(rows) > size
+
+    result = {
+        "sessions": rows,
+        "next_cursor": encode_cursor(rows[-1].created_at, rows[-1].id) if more else None,
+    }
+    if counts:
+        by_status = db.exec(
+            select(SimulationSession.status, func.count()).where(*filters).group_by(SimulationSession.status)
+        ).all()
+        result["counts"] = {s.value: n for s, n in by_status}
+    return result
+
+@router.get("/export/audit")
+def export_audit(
+    request: Request,
+    session_id: Optional[List[UUID]] = Query(None),
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+):
+    """
+    Stream agent logs and messages as NDJSON for a date range and/or a list of
+    sessions. Resume an interrupted export by passing the last line's `cursor`.
+    """
+    if not session_id and created_from is None and created_to is None:
+        raise HTTPException(status_code=400, detail="give a date range or session_id")
+    resume = parse_export_cursor(cursor) if cursor else None  # a bad cursor is a 400, not a broken stream
+    gzip = "gzip" in request.headers.get("accept-encoding", "")
+
+    def stream():
+        # the generator owns its session: it outlives the request handler
+        with read_session() as db:
+            yield from ndjson_chunks(export_rows(db, session_id, created_from, created_to, resume), gzip=gzip)
+
+    headers = {"vary": "accept-encoding"}
+    if gzip:
+        headers["content-encoding"] = "gzip"
+    return StreamingResponse(stream(), media_type="application/x-ndjson", headers=headers)
+
+@router.get("/archive/sessions/{session_id}")
+def get_archived(session_id: UUID, db: Session = Depends(get_read_session)):
+    """A session moved to cold storage: its rows as they were, fetched from the monthly partition."""
+    doc = get_archived_session(db, session_id)
+    if doc is None:
+        raise HTTPException(status_code=404, detail="session is not archived")
+    return doc
 
 @router.get("/sessions/{session_id}/agent-log")
-def get_agent_logs(session_id: UUID, db: Session = Depends(get_session)):
+def get_agent_logs(session_id: UUID, summary: bool = False, db: Session = Depends(get_read_session)):
+    if summary:
+        # typed columns only: the compressed payload is neither loaded nor decoded
+        rows = db.exec(
+            select(*AGENT_LOG_SUMMARY_COLUMNS).where(AgentLog.session_id == session_id).order_by(AgentLog.created_at)
+        ).all()
+        return {"logs": [agent_log_summary(r) for r in rows]}
     logs = db.exec(select(AgentLog).where(AgentLog.session_id == session_id).order_by(AgentLog.created_at)).all()
-    return {"logs": [ {"created_at": l.created_at, "log": l.log} for l in logs ]}
+    return {"logs": [ {"created_at": l.created_at, "log": agent_log_data(l)} for l in logs ]}
 
 @router.get("/sessions/{session_id}/last-prompt")
-def last_prompt(session_id: UUID, db: Session = Depends(get_session)):
+def last_prompt(session_id: UUID, db: Session = Depends(get_read_session)):
     # fetch last AgentLog entry and return stored prompt if present
     al = db.exec(select(AgentLog).where(AgentLog.session_id == session_id).order_by(AgentLog.created_at.desc())).first()
     if not al:
         raise HTTPException(status_code=404, detail="no logs")
-    return {"last_log": al.log}
+    return {"last_log": agent_log_data(al)}
 
 @router.post("/sessions/{session_id}/rerun-agents")
 def rerun_agents(session_id: UUID, agents: Union[List[str], dict] = Body(...), db: Session = Depends(get_session)):
@@ -58,3 +147,26 @@ def smtp_test(to_email: str):
         return {"sent": True}
     except Exception as e:
         return {"sent": False, "error": str(e)}
+
+
+@router.post("/sanction-letters/regenerate")
+def regenerate_sanction_letters(run_id: Optional[UUID] = None, chunk_size: Optional[int] = None, db: Session = Depends(get_session)):
+    """
+    Reissue letters for every approved offer. Streams one NDJSON progress line per
+    chunk; call again with the returned `run_id` to resume an interrupted run.
+    """
+    if run_id and not db.get(LetterRegenRun, run_id):
+        raise HTTPException(status_code=404, detail="Regeneration run not found")
+
+    def stream():
+        for progress in regenerate_letters(run_id=run_id, chunk_size=chunk_size):
+            yield json.dumps(progress) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@router.get("/sanction-letters/regenerate/{run_id}")
+def regeneration_status(run_id: UUID, db: Session = Depends(get_session)):
+    run = db.get(LetterRegenRun, run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Regeneration run not found")
+    return run_progress(run)
@@ -1,13 +1,16 @@
+import logging
+
 from fastapi import APIRouter, Depends, HTTPException
 from sqlmodel import Session, select
 from app.core.db import get_session
 from app.schemas.auth_schemas import SignupIn, TokenOut, UserOut
 from app.models.domain_models import User
-from app.services.password_service import hash_password, verify_password
-from app.services.jwt_service import create_access_token, get_current_user
+from app.services.password_service import hash_password, needs_rehash, verify_password
+from app.services.jwt_service import create_access_token, get_current_user_async
 from fastapi.security import OAuth2PasswordRequestForm
 from app.services.mock_customer_service import add_customer_to_mocks
 router = APIRouter(tags=["auth"])
+logger = logging.getLogger(__name__)
 
 
 def generate_customer_id() -> str:
@@ -17,15 +20,11 @@ def generate_customer_id() -> str:
 
 @router.post("/auth/signup", response_model=TokenOut)
 def signup(payload: SignupIn, db: Session = Depends(get_session)):
-    print("🔹 Signup payload:", payload)
-
     existing = db.exec(select(User).where(User.email == payload.email)).first()
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
 
     customer_id = generate_customer_id()
-    print("🆔 Generated customer_id:", customer_id)
-
     u = User(
         name=payload.name,
         email=payload.email,
@@ -38,9 +37,9 @@ def signup(payload: SignupIn, db: Session = Depends(get_session)):
     db.commit()
     db.refresh(u)
 
-    print("✅ User saved:", u.id, u.customer_id)
+    logger.info("signup", extra={"customer_id": u.customer_id, "user_id": str(u.id)})
 
-    token = create_access_token({"sub": u.customer_id})
+    token = create_access_token({"sub": u.customer_id}, user=u)
 
     add_customer_to_mocks({
     "customer_id": customer_id,
@@ -53,8 +52,6 @@ def signup(payload: SignupIn, db: Session = Depends(get_session)):
     "existing_emi": 0,
     "city": "Bangalore"
 })
-    print("🔐 JWT issued for:", u.customer_id)
-
     return TokenOut(access_token=token)
 
 
@@ -63,28 +60,31 @@ def login(
     form: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_session)
 ):
-    print("🔹 Login attempt:", form.username)
-
     user = db.exec(select(User).where(User.email == form.username)).first()
 
     if not user:
-        print("❌ User not found for email:", form.username)
+        logger.info("login failed: unknown email")
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     if not verify_password(form.password, user.password_hash):
-        print("❌ Password mismatch for:", user.email)
+        logger.info("login failed: wrong password", extra={"customer_id": user.customer_id})
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    print("✅ Login success for:", user.customer_id)
+    logger.info("login", extra={"customer_id": user.customer_id})
 
-    # ✅ FIX: use customer_id, NOT user.id
-    token = create_access_token({"sub": user.customer_id})
-    print("🔐 JWT issued for:", user.customer_id)
+    if needs_rehash(user.password_hash):
+        # BCRYPT_ROUNDS changed since this hash was made; the password is at hand now
+        user.password_hash = hash_password(form.password)
+        db.add(user)
+        db.commit()
+        db.refresh(user)
 
+    # ✅ FIX: use customer_id, NOT user.id
+    token = create_access_token({"sub": user.customer_id}, user=user)
     return TokenOut(access_token=token)
 
 
 @router.get("/me", response_model=UserOut)
-def auth_me(current_user: User = Depends(get_current_user)):
-    print("👤 /me accessed by:", current_user.customer_id)
+async def auth_me(current_user: User = Depends(get_current_user_async)):
+    logger.debug("/me", extra={"customer_id": current_user.customer_id})
     return current_user
@@ -1,32 +1,37 @@
 # app/api/routes_chat.py
 # app/api/routes_chat.py
 
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Request
+from starlette.concurrency import run_in_threadpool
 from uuid import UUID
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.db import get_session
+from app.core.db import get_async_session, get_session
 from app.services.chat_service import (
-    handle_user_message,
-    resume_underwriting_after_salary,
+    handle_user_message_async,
+    submit_salary_slip,
     rerun_agents_for_session
 )
+from app.models.domain_models import SimulationSession
 from app.schemas.session_schemas import ChatMessageIn
+from app.services.uploads import save_upload
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
 # 1. Send message to agents + Google LLM
 @router.post("/{session_id}/message")
-def chat_message(session_id: UUID, payload: ChatMessageIn, db: Session = Depends(get_session)):
-    return handle_user_message(db, session_id, payload)
+async def chat_message(session_id: UUID, payload: ChatMessageIn, db: AsyncSession = Depends(get_async_session)):
+    return await handle_user_message_async(db, session_id, payload)
 
 # 2. Resume underwriting after salary slip upload
 @router.post("/{session_id}/upload-salary")
-def upload_salary_slip(session_id: UUID, file: UploadFile = File(...), db: Session = Depends(get_session)):
-    save_path = f"uploads/{session_id}_{file.filename}"
-    with open(save_path, "wb") as f:
-        f.write(file.file.read())
-    return resume_underwriting_after_salary(db, session_id, save_path)
+async def upload_salary_slip(request: Request, session_id: UUID, file: UploadFile = File(...), db: Session = Depends(get_session)):
+    if not await run_in_threadpool(db.get, SimulationSession, session_id):
+        raise HTTPException(status_code=404, detail="Session not found")
+    doc = await save_upload(db, session_id, file, kind="salary_slip", request=request)
+    # parsed off-request unless this exact slip was read before
+    return await run_in_threadpool(submit_salary_slip, db, session_id, doc)
 
 # 3. Rerun agents for debugging (admin)
 @router.post("/{session_id}/rerun-agents")
@@ -1,43 +1,29 @@
 from fastapi import APIRouter, Depends
-from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.db import get_session
-from app.models.domain_models import User, UserProfile, Offer
-from app.services.jwt_service import get_current_user
+from app.core.db import get_async_session
+from app.models.domain_models import User
+from app.services.dashboard import dashboard_summary
+from app.services.jwt_service import get_current_user_async
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 
 
 @router.get("")
-def dashboard(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session),
+async def dashboard(
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_session),
 ):
     """
     Returns dashboard data for the authenticated user only
     """
 
-    # Shared BFSI / CRM identifier
+    # Shared BFSI / CRM identifier; the summary only ever covers this customer's sessions
     customer_id = current_user.customer_id
 
-    # Latest profile (if exists)
-    profile = (
-        db.exec(
-            select(UserProfile)
-            .where(UserProfile.customer_id == customer_id)
-            .order_by(UserProfile.created_at.desc())
-        )
-        .first()
-    )
-
-    # All sanctioned offers for this customer
-    sanctioned_loans = (
-        db.exec(
-            select(Offer)
-            .where(Offer.session_id.isnot(None))
-        )
-        .all()
-    )
+    # Materialized per customer: a primary-key read unless a write invalidated it.
+    # On the primary, so a view never caches what a lagging replica returned.
+    summary = await db.run_sync(dashboard_summary, customer_id)
 
     # Static curated offers (frontend-friendly)
     curated_offers = [
@@ -64,11 +50,8 @@ def dashboard(
     return {
         "greeting": f"Hi {current_user.name}",
         "customer_id": customer_id,
-        "profile_summary": {
-            "income_monthly": getattr(profile, "income_monthly", None),
-            "existing_emi": getattr(profile, "existing_emi", None),
-            "loan_type": getattr(profile, "loan_type", None),
-        },
-        "sanctioned_loans": sanctioned_loans,
+        "profile_summary": summary["profile_summary"],
+        "sanctioned_loans": summary["sanctioned_loans"],
+        "counts": summary["counts"],
         "curated_offers": curated_offers,
     }
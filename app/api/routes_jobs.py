@@ -0,0 +1,47 @@
+# app/api/routes_jobs.py
+from fastapi import APIRouter, Depends, HTTPException
+from sqlmodel import Session
+from uuid import UUID
+
+from app.core.db import get_session
+from app.models.domain_models import Job, JobStatus
+from app.services.job_queue import job_chain
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+def _job_out(job: Job) -> dict:
+    return {
+        "job_id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "run_after": job.run_after,
+        "last_error": job.last_error,
+        "result": job.result,
+        "created_at": job.created_at,
+        "finished_at": job.finished_at,
+    }
+
+
+@router.get("/{job_id}")
+def get_job_status(job_id: UUID, db: Session = Depends(get_session)):
+    job = db.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    chain = job_chain(db, job)
+    last = chain[-1]
+    # the chain is done only once its last step succeeded without spawning another
+    done = last.status == JobStatus.SUCCEEDED and not (last.result or {}).get("next_job_id")
+    if any(j.status == JobStatus.FAILED for j in chain):
+        overall = JobStatus.FAILED
+    elif done:
+        overall = JobStatus.SUCCEEDED
+    elif last.status == JobStatus.RUNNING:
+        overall = JobStatus.RUNNING
+    else:
+        overall = JobStatus.PENDING
+
+    return {**_job_out(job), "chain_status": overall, "steps": [_job_out(j) for j in chain]}
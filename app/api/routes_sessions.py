@@ -1,35 +1,42 @@
 # app/api/routes_sessions.py
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, UploadFile, File, Form
+from fastapi.responses import Response
+from starlette.concurrency import run_in_threadpool
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from uuid import UUID
-from pathlib import Path
-import shutil, uuid as _uuid, os
-from typing import Optional
+import uuid as _uuid
+from typing import AsyncIterator, Optional
 from pydantic import BaseModel
 
-from app.core.db import get_session
+from app.core.config import settings
+from app.core.db import get_async_session, get_session
+from app.core.replica import get_async_read_session
 from app.schemas.session_schemas import (
     UserProfileCreate, SessionStartResponse, ChatMessageIn, ChatResponse
 )
 from app.models.domain_models import (
-    SimulationSession, UserProfile, Message, Offer, AgentLog, SessionStatus, OfferStatus
+    SimulationSession, UserProfile, Offer, AgentLog, SessionStatus, OfferStatus, UploadedDocument
 )
-from app.services.chat_service import handle_user_message, resume_underwriting_after_salary
-from app.services.pdf_service import generate_sanction_pdf
-from app.services.pdf_mailer import augment_pdf_with_pypdf, send_email_smtp
+from app.services.agent_logs import agent_log_data
+from app.services.chat_service import handle_user_message_async, submit_salary_slip
+from app.services.pdf_service import render_sanction_pdf, offer_letter_fields
+from app.services.storage import get_storage, session_key
+from app.services.uploads import save_upload
+from app.services.file_serving import file_response, http_date, is_not_modified
+from app.services.job_handlers import enqueue_sanction_letter
+from app.services.message_feed import message_page, wait_for_messages
+from app.services.pagination import decode_cursor, page_size
+from app.services.session_service import load_session_summary, session_version
 
 router = APIRouter(prefix="/sessions", tags=["sessions"])
 
-UPLOAD_ROOT = Path("uploads")
-UPLOAD_ROOT.mkdir(exist_ok=True)
-
 class SessionStartIn(BaseModel):
     customer_id: Optional[str] = None
 
 
 @router.post("/start", response_model=SessionStartResponse)
-def create_session(body: Optional[SessionStartIn] = None, customer_id: Optional[str] = None, db: Session = Depends(get_session)):
+async def create_session(body: Optional[SessionStartIn] = None, customer_id: Optional[str] = None, db: AsyncSession = Depends(get_async_session)):
     """Start a new session. Accepts an optional `customer_id` query param.
 
     NOTE: The endpoint previously accepted a `session_id` query param which caused
@@ -43,7 +50,7 @@ def create_session(body: Optional[SessionStartIn] = None, customer_id: Optional[
     customer = customer_id or (body.customer_id if body else None)
     if customer:
         session.customer_id = customer
-    db.add(session); db.commit(); db.refresh(session)
+    db.add(session)
 
     # Create a placeholder UserProfile so other endpoints relying on its presence work.
     # Use safe defaults; the profile can be updated later through conversation or admin APIs.
@@ -59,69 +66,112 @@ def create_session(body: Optional[SessionStartIn] = None, customer_id: Optional[
         desired_amount=0.0,
         desired_tenure_months=0,
     )
-    db.add(placeholder); db.commit(); db.refresh(placeholder)
+    # ids are generated client-side, so both rows go in one commit
+    db.add(placeholder); await db.commit()
 
     return SessionStartResponse(session_id=session.id, status=session.status, customer_id=customer)
 
 @router.post("/{session_id}/message", response_model=ChatResponse)
-def post_message(session_id: UUID, message: ChatMessageIn, db: Session = Depends(get_session)):
+async def post_message(session_id: UUID, message: ChatMessageIn, db: AsyncSession = Depends(get_async_session)):
     # Delegates completely to chat_service to handle the logic and google api call
-    return handle_user_message(db=db, session_id=session_id, message=message)
+    return await handle_user_message_async(db=db, session_id=session_id, message=message)
+
+def _summary_etag(session_id: UUID, version: int) -> str:
+    return f'"{session_id.hex}-{version}"'
 
 @router.get("/{session_id}")
-def get_session_summary(session_id: UUID, db: Session = Depends(get_session)):
-    sess = db.get(SimulationSession, session_id)
-    if not sess:
+def get_session_summary(session_id: UUID, request: Request, response: Response, db: Session = Depends(get_session)):
+    # pollers send If-None-Match: answer 304 from the version column alone
+    if request.headers.get("if-none-match"):
+        version = session_version(db, session_id)
+        if version is not None:
+            etag = _summary_etag(session_id, version)
+            if is_not_modified(request, etag, None):
+                return Response(status_code=304, headers={"etag": etag, "cache-control": "private, no-cache"})
+
+    row = load_session_summary(db, session_id)
+    if not row:
         raise HTTPException(status_code=404, detail="Session not found")
-    user = db.exec(select(UserProfile).where(UserProfile.session_id == session_id)).first()
-    offer = db.exec(select(Offer).where(Offer.session_id == session_id)).first()
+    sess, user, offer = row
+    response.headers["etag"] = _summary_etag(session_id, sess.version)
+    response.headers["cache-control"] = "private, no-cache"
     return {"session": sess, "user_profile": user, "latest_offer": offer}
 
+async def _messages_session(after: Optional[str] = None) -> AsyncIterator[AsyncSession]:
+    # `after` polls are woken by commits on the primary; a lagging replica would answer them with nothing
+    source = get_async_session() if after else get_async_read_session()
+    async for session in source:
+        yield session
+
 @router.get("/{session_id}/messages")
-def get_messages(session_id: UUID, db: Session = Depends(get_session)):
-    msgs = db.exec(select(Message).where(Message.session_id == session_id).order_by(Message.created_at)).all()
-    return {"messages": msgs}
+async def get_messages(
+    session_id: UUID,
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+    limit: Optional[int] = None,
+    wait: float = 0,
+    db: AsyncSession = Depends(_messages_session),
+):
+    """
+    Latest page by default; `after` for what is new since a cursor (with `wait`
+    seconds of long-polling), `before` to scroll back.
+    """
+    if after and before:
+        raise HTTPException(status_code=400, detail="use either after or before")
+    size = page_size(limit)
+    if before:
+        return await message_page(db, session_id, size, before=decode_cursor(before))
+    wait = min(max(wait, 0.0), settings.MESSAGES_LONG_POLL_MAX_SECONDS)
+    return await wait_for_messages(db, session_id, size, decode_cursor(after) if after else None, wait)
 
 @router.post("/{session_id}/upload-salary")
-def upload_salary(
+async def upload_salary(
+    request: Request,
     session_id: UUID,
     file: UploadFile = File(...),
     declared_salary: Optional[float] = Form(None),
     db: Session = Depends(get_session)
 ):
-    sess = db.get(SimulationSession, session_id)
+    sess = await run_in_threadpool(db.get, SimulationSession, session_id)
     if not sess:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    dest_dir = UPLOAD_ROOT / str(session_id)
-    dest_dir.mkdir(parents=True, exist_ok=True)
-    dest_path = dest_dir / f"salary_{_uuid.uuid4().hex}_{file.filename}"
-    
-    with open(dest_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    # hashed in chunks with a size cap; content already stored is referenced, not written again
+    doc = await save_upload(db, session_id, file, kind="salary_slip", request=request)
+    # a declared salary (or a slip read before) resumes underwriting now; otherwise it's parsed off-request
+    return await run_in_threadpool(submit_salary_slip, db, session_id, doc, declared_salary)
 
-    # If declared_salary provided, store in profile
-    profile = db.exec(select(UserProfile).where(UserProfile.session_id == session_id)).first()
-    if not profile:
-        raise HTTPException(status_code=404, detail="User profile not found")
-    
-    if declared_salary:
-        profile.salary_reported = declared_salary
-        db.add(profile); db.commit(); db.refresh(profile)
-
-    # resume underwriting flow
-    result = resume_underwriting_after_salary(db=db, session_id=session_id, salary_slip_path=str(dest_path))
-    return result
-
-@router.get("/{session_id}/uploads/{filename}")
-def serve_upload(session_id: UUID, filename: str):
-    path = UPLOAD_ROOT / str(session_id) / filename
-    if not path.exists():
+@router.api_route("/{session_id}/uploads/{filename}", methods=["GET", "HEAD"])
+def serve_upload(request: Request, session_id: UUID, filename: str, db: Session = Depends(get_session)):
+    # uploads are references to shared content; generated letters and older files live under the session
+    doc = db.exec(
+        select(UploadedDocument)
+        .where(UploadedDocument.session_id == session_id, UploadedDocument.filename == filename)
+        .order_by(UploadedDocument.created_at.desc())
+    ).first()
+    try:
+        key = doc.key if doc else session_key(session_id, filename)
+    except ValueError:
         raise HTTPException(status_code=404, detail="File not found")
-    return FileResponse(str(path), media_type="application/octet-stream", filename=filename)
+    storage = get_storage()
+    # a document's content hash is its validator, and it never changes under the same key
+    etag = doc.sha256 if doc else None
+    last_modified = doc.created_at if doc else None
+
+    path = storage.local_path(key)
+    if path:
+        return file_response(request, filename, path=path, etag=etag, last_modified=last_modified)
+    if doc and is_not_modified(request, f'"{etag}"', http_date(last_modified)):
+        # known digest: answer the revalidation without fetching the object
+        return file_response(request, filename, data=b"", etag=etag, last_modified=last_modified)
+    try:
+        data = storage.get(key)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found")
+    return file_response(request, filename, data=data, etag=etag, last_modified=last_modified)
 
 @router.get("/{session_id}/sanction-letter")
-def get_sanction_letter(session_id: UUID, db: Session = Depends(get_session)):
+def get_sanction_letter(session_id: UUID, background_tasks: BackgroundTasks, db: Session = Depends(get_session)):
     offer = db.exec(select(Offer).where(Offer.session_id == session_id)).first()
     if not offer or offer.status != OfferStatus.APPROVED:
         raise HTTPException(status_code=404, detail="No approved offer / sanction letter available")
@@ -130,24 +180,21 @@ def get_sanction_letter(session_id: UUID, db: Session = Depends(get_session)):
     
     # Get last agent log or empty dict if none exists
     agent_log_entry = db.exec(select(AgentLog).where(AgentLog.session_id == session_id).order_by(AgentLog.created_at.desc())).first()
-    log_data = agent_log_entry.log if agent_log_entry else {}
+    log_data = agent_log_data(agent_log_entry) if agent_log_entry else {}
 
-    # create pdf on demand
+    # render in memory and answer straight from the buffer; the on-disk copy is optional
     reference_id = str(_uuid.uuid4())[:8]
-    out_dir = UPLOAD_ROOT / str(session_id)
-    out_dir.mkdir(parents=True, exist_ok=True)
-    pdf_path = str(out_dir / f"sanction_{reference_id}.pdf")
-    
-    generate_sanction_pdf(pdf_path, profile.name, {
-        "amount": offer.amount,
-        "tenure_months": offer.tenure_months,
-        "interest_rate": offer.interest_rate,
-        "monthly_emi": offer.monthly_emi,
-        "status": offer.status,
-        "reason_summary": offer.reason_summary
-    }, log_data, reference_id)
-    
-    return FileResponse(pdf_path, media_type="application/pdf", filename=f"sanction_{reference_id}.pdf")
+    filename = f"sanction_{reference_id}.pdf"
+    pdf_bytes = render_sanction_pdf(profile.name, offer_letter_fields(offer), log_data, reference_id)
+
+    if settings.PERSIST_SANCTION_LETTERS:
+        background_tasks.add_task(get_storage().put, session_key(session_id, filename), pdf_bytes, "application/pdf")
+
+    return Response(
+        content=pdf_bytes,
+        media_type="application/pdf",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 @router.post("/{session_id}/finalize")
 def finalize_session(session_id: UUID, approved: bool = Form(...), db: Session = Depends(get_session)):
@@ -179,47 +226,34 @@ def finalize_session(session_id: UUID, approved: bool = Form(...), db: Session =
         sess.status = SessionStatus.COMPLETED
         db.add(sess); db.commit()
         
-        # generate PDF
-        out_dir = UPLOAD_ROOT / str(session_id)
-        out_dir.mkdir(parents=True, exist_ok=True)
+        # queue PDF generation (+ email) instead of rendering/sending inline
         reference_id = str(_uuid.uuid4())[:8]
-        pdf_path = str(out_dir / f"sanction_{reference_id}.pdf")
-        
-        generate_sanction_pdf(pdf_path, profile.name, {
+        pdf_key = session_key(session_id, f"sanction_{reference_id}.pdf")
+
+        email = None
+        if getattr(profile, "email", None):
+            email = {
+                "to_email": profile.email,
+                "subject": f"Sanction Letter [{reference_id}]",
+                "body": f"Dear {profile.name},\nPlease find attached sanction letter.\nRef: {reference_id}",
+            }
+        job = enqueue_sanction_letter(db, session_id, pdf_key, profile.name, {
             "amount": profile.desired_amount,
             "tenure_months": profile.desired_tenure_months,
             "interest_rate": 13.5,
             "monthly_emi": 0,
             "status": OfferStatus.APPROVED,
             "reason_summary": "Finalized by admin"
-        }, {}, reference_id)
-        
-        try:
-            augment_pdf_with_pypdf(pdf_path, {"ref": reference_id, "customer": profile.name})
-        except Exception:
-            pass
-            
-        email_status = None
-        if getattr(profile, "email", None):
-            try:
-                send_email_smtp(
-                    smtp_config={
-                        "host": os.getenv("SMTP_HOST"),
-                        "port": int(os.getenv("SMTP_PORT") or 587),
-                        "user": os.getenv("SMTP_USER"),
-                        "password": os.getenv("SMTP_PASS"),
-                        "sender": os.getenv("SENDER_EMAIL")
-                    },
-                    to_email=profile.email,
-                    subject=f"Sanction Letter [{reference_id}]",
-                    body=f"Dear {profile.name},\nPlease find attached sanction letter.\nRef: {reference_id}",
-                    attachments=[pdf_path]
-                )
-                email_status = "sent"
-            except Exception as e:
-                email_status = f"error: {e}"
-                
-        return {"message": "finalized", "pdf_path": pdf_path, "email_status": email_status}
+        }, {}, reference_id, email=email)
+        email_status = "queued" if email else None
+
+        return {
+            "message": "finalized",
+            "pdf_path": pdf_key,
+            "pdf_url": f"/api/sessions/{session_id}/uploads/sanction_{reference_id}.pdf",
+            "email_status": email_status,
+            "job_id": str(job.id),
+        }
     else:
         sess.status = SessionStatus.REJECTED
         db.add(sess); db.commit()
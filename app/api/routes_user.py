@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlmodel import Session, select
 
+from app.core.config import settings
 from app.core.db import get_session
+from app.core.replica import get_read_session
 from app.models.domain_models import (
     User,
     UserProfile,
@@ -9,7 +11,7 @@ from app.models.domain_models import (
     SimulationSession,
 )
 from app.schemas.user_schemas import SaveProfileIn
-from app.services.jwt_service import get_current_user
+from app.services.jwt_service import create_access_token, get_current_user, invalidate_user
 from app.services.mock_data_service import get_customer
 
 router = APIRouter(prefix="/user", tags=["user"])
@@ -95,12 +97,21 @@ def save_profile(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_session),
 ):
-    current_user.phone = payload.phone
-    db.add(current_user)
+    # current_user may come from the identity cache or token claims; write through the row itself
+    user = db.get(User, current_user.id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    user.phone = payload.phone
+    db.add(user)
     db.commit()
-    db.refresh(current_user)
+    db.refresh(user)
+    invalidate_user(user.customer_id)
 
-    return {"saved": True, "user": current_user}
+    result = {"saved": True, "user": user}
+    if settings.AUTH_PROFILE_CLAIMS:
+        # claims in the old token still carry the previous profile
+        result["access_token"] = create_access_token({"sub": user.customer_id}, user=user)
+    return result
 
 
 # -------------------------
@@ -109,7 +120,7 @@ def save_profile(
 @router.get("/loans")
 def get_loans(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session),
+    db: Session = Depends(get_read_session),
 ):
     loans = db.exec(
         select(Offer)
@@ -0,0 +1,28 @@
+# app/commands/regenerate_letters.py
+"""
+Reissue sanction letters for every approved offer.
+
+    python -m app.commands.regenerate_letters [--resume RUN_ID] [--chunk-size N] [--workers N]
+"""
+import argparse
+import json
+from uuid import UUID
+
+from app.core.db import init_db
+from app.services.letter_regen import regenerate_letters
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--resume", type=UUID, default=None, help="run id of an interrupted run")
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None, help="pool size (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    init_db()
+    for progress in regenerate_letters(run_id=args.resume, chunk_size=args.chunk_size, workers=args.workers):
+        print(json.dumps(progress), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Dict, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -9,10 +9,44 @@ class Settings(BaseSettings):
     APP_NAME: str = "FinSync AI Backend"
     ENV: str = "dev"
 
+    # -------------------------
+    # Logging
+    # -------------------------
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"  # or "text"
+    # records waiting for the writer thread; beyond this they are dropped, not waited on
+    LOG_QUEUE_SIZE: int = 10000
+    # logger name -> fraction of its below-WARNING records kept, e.g. {"app.api.routes_auth": 0.1}
+    LOG_SAMPLE_RATES: Dict[str, float] = {}
+
     # -------------------------
     # Database
     # -------------------------
     DATABASE_URL: str = "sqlite:///./finsync.db"
+    # async stack (asyncpg / aiosqlite); derived from DATABASE_URL when unset
+    DATABASE_ASYNC_URL: Optional[str] = None
+    # optional read replica for reporting/listing endpoints
+    DATABASE_REPLICA_URL: Optional[str] = None
+    DATABASE_REPLICA_ASYNC_URL: Optional[str] = None
+    # measured via a heartbeat row, so this includes up to one heartbeat interval
+    REPLICA_MAX_LAG_SECONDS: float = 5.0
+    REPLICA_HEARTBEAT_INTERVAL_SECONDS: float = 1.0
+    REPLICA_LAG_CHECK_INTERVAL_SECONDS: float = 2.0
+    DB_ECHO: bool = False
+    # apply pending migrations at startup instead of refusing to start
+    DB_MIGRATE_ON_STARTUP: bool = False
+    # SQLite profile (PRAGMAs applied on every new connection)
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # durable in WAL mode except across power loss
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_SIZE_KB: int = 64 * 1024
+    SQLITE_MMAP_SIZE_BYTES: int = 256 * 1024 * 1024
+    # pooled profile (Postgres and other server databases)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_PRE_PING: bool = True
 
     # -------------------------
     # JWT / Auth settings
@@ -20,6 +54,24 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "CHANGE_ME_IN_PROD"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    # verified token -> claims; an entry never outlives the token's own exp
+    AUTH_TOKEN_CACHE_SIZE: int = 10000
+    AUTH_TOKEN_CACHE_TTL_SECONDS: float = 300.0
+    # customer_id -> User snapshot; dropped on save-profile in this process, expires elsewhere
+    AUTH_USER_CACHE_SIZE: int = 10000
+    AUTH_USER_CACHE_TTL_SECONDS: float = 30.0
+    # embed name/email/phone in new tokens so identity needs no DB read at all
+    AUTH_PROFILE_CLAIMS: bool = False
+
+    # -------------------------
+    # Password hashing (bcrypt)
+    # -------------------------
+    # cost factor for new hashes; existing hashes are upgraded at login when it changes
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    # hashes/verifies running or queued before new ones are refused with 503
+    PASSWORD_HASH_MAX_PENDING: int = 16
+    PASSWORD_HASH_TIMEOUT_SECONDS: float = 10.0
 
     # -------------------------
     # External integrations
@@ -36,6 +88,95 @@ class Settings(BaseSettings):
     SMTP_USER: Optional[str] = None
     SMTP_PASS: Optional[str] = None
     SENDER_EMAIL: Optional[str] = None
+    # pooled SMTP sessions per (host, port, user); see app/services/smtp_pool.py
+    SMTP_POOL_SIZE: int = 4
+    SMTP_POOL_IDLE_SECONDS: float = 60.0
+    SMTP_MAX_MESSAGES_PER_CONNECTION: int = 100
+    SMTP_STARTTLS: bool = True
+
+    # -------------------------
+    # Upload storage
+    # -------------------------
+    STORAGE_BACKEND: str = "local"  # local | s3
+    UPLOAD_ROOT: str = "uploads"
+    S3_BUCKET: Optional[str] = None
+    S3_PREFIX: str = ""
+    S3_ENDPOINT_URL: Optional[str] = None  # e.g. http://localhost:9000 for MinIO
+    S3_REGION: Optional[str] = None
+    S3_ACCESS_KEY_ID: Optional[str] = None
+    S3_SECRET_ACCESS_KEY: Optional[str] = None
+    MAX_UPLOAD_BYTES: int = 10 * 1024 * 1024
+    UPLOAD_CHUNK_BYTES: int = 64 * 1024
+    # unreferenced blobs are kept this long before GC, so a racing re-upload can still claim them
+    UPLOAD_GC_GRACE_SECONDS: int = 3600
+    UPLOAD_GC_INTERVAL_SECONDS: float = 600.0
+    # browser cache lifetime for served uploads; 0 = always revalidate (ETag makes that a 304)
+    UPLOAD_CACHE_MAX_AGE_SECONDS: int = 0
+
+    # -------------------------
+    # Sanction letters
+    # -------------------------
+    # keep a copy of on-demand letters in upload storage (written after the response)
+    PERSIST_SANCTION_LETTERS: bool = True
+
+    # -------------------------
+    # Background jobs
+    # -------------------------
+    JOB_WORKERS: int = 2
+    JOB_POLL_INTERVAL_SECONDS: float = 1.0
+    JOB_LEASE_SECONDS: int = 120
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_BACKOFF_BASE_SECONDS: float = 5.0
+    JOB_BACKOFF_MAX_SECONDS: float = 900.0
+
+    # -------------------------
+    # Email outbox (Resend)
+    # -------------------------
+    EMAIL_OUTBOX_BATCH_SIZE: int = 100  # rows claimed per flush; each is sent under its own idempotency key
+    EMAIL_OUTBOX_FLUSH_INTERVAL_SECONDS: float = 2.0
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 8
+    EMAIL_OUTBOX_LEASE_SECONDS: int = 60
+
+    # -------------------------
+    # Bulk sanction letter reissue
+    # -------------------------
+    LETTER_REGEN_CHUNK_SIZE: int = 200
+    LETTER_REGEN_WORKERS: Optional[int] = None  # defaults to os.cpu_count()
+
+    # -------------------------
+    # List endpoints (keyset pagination)
+    # -------------------------
+    PAGE_SIZE_DEFAULT: int = 50
+    PAGE_SIZE_MAX: int = 500
+    MESSAGES_LONG_POLL_MAX_SECONDS: float = 30.0
+    MESSAGES_LONG_POLL_RECHECK_SECONDS: float = 1.0  # catches messages written by other workers
+
+    # -------------------------
+    # Session archival (hot/cold)
+    # -------------------------
+    SESSION_ARCHIVE_AFTER_DAYS: Optional[int] = 180  # closed this long ago -> cold storage; None disables
+    SESSION_ARCHIVE_BATCH_SIZE: int = 200
+    SESSION_ARCHIVE_INTERVAL_SECONDS: float = 3600.0
+    SESSION_ARCHIVE_ZSTD_LEVEL: int = 10
+
+    # -------------------------
+    # Agent logs
+    # -------------------------
+    AGENT_LOG_COMPACT: bool = True  # typed columns + zstd JSON payload instead of the raw JSON column
+    AGENT_LOG_ZSTD_LEVEL: int = 6
+
+    # -------------------------
+    # Audit export
+    # -------------------------
+    AUDIT_EXPORT_BATCH_ROWS: int = 1000  # rows per server-side cursor fetch and per streamed chunk
+    AUDIT_EXPORT_GZIP_LEVEL: int = 6
+
+    # -------------------------
+    # Salary slip extraction
+    # -------------------------
+    SALARY_EXTRACTION_WORKERS: int = 2
+    SALARY_EXTRACTION_MAX_PAGES: int = 3  # payslips put the figures on the first page or two
+    SALARY_EXTRACTION_TIMEOUT_SECONDS: float = 30.0
 
     # -------------------------
     # Pydantic v2 config
@@ -1,16 +1,161 @@
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlmodel import SQLModel, create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.core.config import settings
 
-# ✅ FIX: use UPPERCASE to match config
-engine = create_engine(
-    settings.DATABASE_URL,
-    echo=False
-)
+# async driver per backend for the async stack
+_ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+
+def engine_options(url: str) -> Dict[str, Any]:
+    """create_engine() keyword arguments for the backend behind `url`."""
+    opts: Dict[str, Any] = {"echo": settings.DB_ECHO}
+    if make_url(url).get_backend_name() == "sqlite":
+        # sessions cross threads (request threadpool, background workers); the pool keeps one user at a time
+        opts["connect_args"] = {
+            "check_same_thread": False,
+            "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000,
+        }
+        return opts
+    opts.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    return opts
+
+
+def _sqlite_pragmas(in_memory: bool):
+    pragmas = [
+        f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}",
+        f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}",
+        # negative = size in KiB rather than pages
+        f"PRAGMA cache_size=-{settings.SQLITE_CACHE_SIZE_KB}",
+    ]
+    if not in_memory:
+        # WAL lets readers carry on while a chat turn writes; mmap only helps file-backed databases
+        pragmas.insert(0, f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+        pragmas.append(f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE_BYTES}")
+    return pragmas
+
+
+def _apply_sqlite_profile(eng: Engine):
+    if eng.dialect.name != "sqlite":
+        return
+    pragmas = _sqlite_pragmas(eng.url.database in (None, "", ":memory:"))
+
+    @event.listens_for(eng, "connect")
+    def _on_connect(dbapi_conn, _record):
+        cur = dbapi_conn.cursor()
+        for pragma in pragmas:
+            cur.execute(pragma)
+        cur.close()
+
+
+def build_engine(url: Optional[str] = None) -> Engine:
+    """Engine with the profile for its backend: tuned PRAGMAs on SQLite, a sized, pre-pinged pool elsewhere."""
+    url = url or settings.DATABASE_URL
+    eng = create_engine(url, **engine_options(url))
+    _apply_sqlite_profile(eng)
+    return eng
+
+
+def async_database_url(url: str) -> str:
+    """Same database through its async driver: sqlite -> aiosqlite, postgresql -> asyncpg."""
+    u = make_url(url)
+    driver = _ASYNC_DRIVERS.get(u.get_backend_name())
+    if driver is None:
+        raise RuntimeError(f"no async driver configured for {u.get_backend_name()!r}")
+    return u.set(drivername=f"{u.get_backend_name()}+{driver}").render_as_string(hide_password=False)
+
+
+def build_async_engine(url: Optional[str] = None) -> AsyncEngine:
+    """Async twin of build_engine(), same profile; DATABASE_ASYNC_URL overrides the derived URL."""
+    url = url or settings.DATABASE_ASYNC_URL or async_database_url(settings.DATABASE_URL)
+    opts = engine_options(url)
+    opts.get("connect_args", {}).pop("check_same_thread", None)  # aiosqlite runs each connection on its own thread
+    eng = create_async_engine(url, **opts)
+    _apply_sqlite_profile(eng.sync_engine)
+    return eng
+
+
+engine = build_engine()
+
+_async_engine: Optional[AsyncEngine] = None
+
+
+def get_async_engine() -> AsyncEngine:
+    # created on first use so scripts and the sync stack don't need the async drivers installed
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = build_async_engine()
+    return _async_engine
 
 def init_db():
+    """Create missing tables directly (tests, throwaway databases); real databases use migrations."""
     SQLModel.metadata.create_all(bind=engine)
 
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+def alembic_config(url: Optional[str] = None):
+    from alembic.config import Config
+
+    cfg = Config(str(ALEMBIC_INI))
+    cfg.attributes["configure_logger"] = False  # keep the app's logging setup
+    if url:
+        cfg.set_main_option("sqlalchemy.url", url)
+    return cfg
+
+def schema_revisions(eng: Optional[Engine] = None) -> Tuple[Optional[str], Optional[str]]:
+    """(revision the database is at, head revision of the migration scripts)."""
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+
+    head = ScriptDirectory.from_config(alembic_config()).get_current_head()
+    with (eng or engine).connect() as conn:
+        current = MigrationContext.configure(conn).get_current_revision()
+    return current, head
+
+def check_schema_version(eng: Optional[Engine] = None):
+    """
+    Startup check in place of create_all(): the database must be at the
+    migration head. With DB_MIGRATE_ON_STARTUP the app upgrades it instead.
+    """
+    eng = eng or engine
+    current, head = schema_revisions(eng)
+    if current == head:
+        return
+    if settings.DB_MIGRATE_ON_STARTUP:
+        from alembic import command
+
+        cfg = alembic_config()
+        with eng.begin() as conn:
+            cfg.attributes["connection"] = conn
+            command.upgrade(cfg, "head")
+        return
+    raise RuntimeError(
+        f"database schema is at revision {current or '(none)'} but the code expects {head}; "
+        "run `alembic upgrade head` (databases made by the old create_all startup: `alembic stamp 0001` first)"
+    )
+
 def get_session():
     with Session(engine) as session:
         yield session
 
+async def get_async_session() -> AsyncIterator[AsyncSession]:
+    # no expiry on commit: attributes can't lazy-load outside the greenlet bridge
+    async with AsyncSession(get_async_engine(), expire_on_commit=False) as session:
+        yield session
+
+async def dispose_async_engine():
+    global _async_engine
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
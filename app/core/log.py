@@ -0,0 +1,175 @@
+# app/core/log.py
+"""
+Structured, non-blocking logging.
+
+Records are put on an in-memory queue by the thread that logs them and
+written to stdout as one JSON object per line by a single QueueListener
+thread, so a request never waits on a slow terminal or log pipe. When the
+queue is full (LOG_QUEUE_SIZE) records are dropped and counted rather than
+blocking the caller.
+
+Every record carries the request id of the request it was logged under (the
+X-Request-ID header, or a fresh one; see RequestIdMiddleware). Loggers named
+in LOG_SAMPLE_RATES keep only that fraction of their records below WARNING;
+per-request detail on hot paths goes to DEBUG, which the default LOG_LEVEL
+discards before anything is formatted.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import threading
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from app.core.config import settings
+
+request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+REQUEST_ID_HEADER = "x-request-id"
+
+# attributes every LogRecord has; anything else came in through `extra=`
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "request_id"}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        doc = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            doc["request_id"] = record.request_id
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS and not key.startswith("_"):
+                doc[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            doc["exc"] = record.exc_text
+        return json.dumps(doc, default=str, ensure_ascii=False)
+
+
+class RequestIdFilter(logging.Filter):
+    # runs in the caller's thread before the record is queued, while the request's context is current
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id.get()
+        return True
+
+
+class SampleFilter(logging.Filter):
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(record.name)
+        return rate is None or random.random() < rate
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Never blocks: a full queue drops the record. Keeps the traceback apart from the message."""
+
+    def __init__(self, q: queue.Queue):
+        super().__init__(q)
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # resolve args and the exception here: both may change once the caller moves on
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+
+_handler: Optional[_QueueHandler] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+_config_lock = threading.Lock()
+
+
+def configure_logging(stream=None) -> _QueueHandler:
+    """Route the root logger through the queue. Idempotent; returns the queue handler."""
+    global _handler, _listener
+    with _config_lock:
+        if _handler is not None:
+            return _handler
+        q: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+        out = logging.StreamHandler(stream or sys.stdout)
+        if settings.LOG_FORMAT == "json":
+            out.setFormatter(JsonFormatter())
+        else:
+            out.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"))
+
+        handler = _QueueHandler(q)
+        handler.addFilter(RequestIdFilter())
+        if settings.LOG_SAMPLE_RATES:
+            handler.addFilter(SampleFilter(settings.LOG_SAMPLE_RATES))
+
+        root = logging.getLogger()
+        root.setLevel(settings.LOG_LEVEL.upper())
+        root.addHandler(handler)
+        _listener = logging.handlers.QueueListener(q, out)
+        _listener.start()
+        _handler = handler
+        atexit.register(stop_logging)
+        return handler
+
+
+def stop_logging():
+    """Flush what is queued and stop the writer thread."""
+    global _handler, _listener
+    with _config_lock:
+        handler, listener, _handler, _listener = _handler, _listener, None, None
+    if handler is not None:
+        logging.getLogger().removeHandler(handler)
+    if listener is not None:
+        listener.stop()
+
+
+class RequestIdMiddleware:
+    """Binds a request id to everything logged while handling the request and echoes it back."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        rid = None
+        for name, value in scope["headers"]:
+            if name == REQUEST_ID_HEADER.encode():
+                rid = value.decode("latin-1")[:128]
+                break
+        rid = rid or uuid.uuid4().hex
+        token = request_id.set(rid)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (REQUEST_ID_HEADER.encode(), rid.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            request_id.reset(token)
@@ -0,0 +1,170 @@
+# app/core/replica.py
+"""
+Read-replica routing for reporting and listing endpoints.
+
+The primary updates a heartbeat row every REPLICA_HEARTBEAT_INTERVAL_SECONDS;
+the age of that row as seen on the replica is its lag. Read sessions go to the
+replica while the lag is within REPLICA_MAX_LAG_SECONDS and fall back to the
+primary otherwise (or when the replica is unreachable or not configured).
+
+Locally, point DATABASE_REPLICA_URL at a second SQLite file kept in sync with
+`sqlite3 finsync.db ".backup finsync_replica.db"` (or litestream), or at the
+standby of two Postgres containers using streaming replication.
+"""
+import threading
+import time
+from datetime import datetime
+from typing import AsyncIterator, Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.db import async_database_url, build_async_engine, build_engine, engine, get_async_engine
+from app.models.domain_models import ReplicaHeartbeat
+from app.services.workers import BackgroundLoop, register_loop
+
+HEARTBEAT_ID = 1
+
+
+class ReadOnlySessionError(RuntimeError):
+    pass
+
+
+@event.listens_for(Session, "before_flush")
+def _refuse_writes(session, flush_context, instances):
+    # read sessions may land on a replica; a write there would fail late or diverge
+    if session.info.get("read_only") and (session.new or session.dirty or session.deleted):
+        raise ReadOnlySessionError("read-only session: writes must use the primary session")
+
+
+_replica: Optional[Engine] = None
+_async_replica: Optional[AsyncEngine] = None
+
+
+def replica_engine() -> Optional[Engine]:
+    global _replica
+    if not settings.DATABASE_REPLICA_URL:
+        return None
+    if _replica is None:
+        _replica = build_engine(settings.DATABASE_REPLICA_URL)
+    return _replica
+
+
+def async_replica_engine() -> Optional[AsyncEngine]:
+    global _async_replica
+    if not settings.DATABASE_REPLICA_URL:
+        return None
+    if _async_replica is None:
+        _async_replica = build_async_engine(
+            settings.DATABASE_REPLICA_ASYNC_URL or async_database_url(settings.DATABASE_REPLICA_URL)
+        )
+    return _async_replica
+
+
+class ReplicaMonitor:
+    """Cached replica lag, re-measured at most every REPLICA_LAG_CHECK_INTERVAL_SECONDS."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._checked_at = float("-inf")
+        self.lag: Optional[float] = None  # None: unknown / unreachable
+
+    def measure(self) -> Optional[float]:
+        eng = replica_engine()
+        lag = None
+        if eng is not None:
+            try:
+                with Session(eng) as db:
+                    beat = db.get(ReplicaHeartbeat, HEARTBEAT_ID)
+                if beat is not None:
+                    lag = max((datetime.utcnow() - beat.beat_at).total_seconds(), 0.0)
+            except Exception:
+                lag = None
+        with self._lock:
+            self.lag = lag
+            self._checked_at = time.monotonic()
+        return lag
+
+    def stale(self) -> bool:
+        return time.monotonic() - self._checked_at > settings.REPLICA_LAG_CHECK_INTERVAL_SECONDS
+
+    def _ok(self) -> bool:
+        return self.lag is not None and self.lag <= settings.REPLICA_MAX_LAG_SECONDS
+
+    def healthy(self) -> bool:
+        if self.stale():
+            self.measure()
+        return self._ok()
+
+    async def healthy_async(self) -> bool:
+        if self.stale():
+            await run_in_threadpool(self.measure)
+        return self._ok()
+
+    def reset(self):
+        with self._lock:
+            self.lag = None
+            self._checked_at = float("-inf")
+
+
+monitor = ReplicaMonitor()
+
+
+def write_heartbeat(now: Optional[datetime] = None):
+    with Session(engine) as db:
+        beat = db.get(ReplicaHeartbeat, HEARTBEAT_ID) or ReplicaHeartbeat(id=HEARTBEAT_ID)
+        beat.beat_at = now or datetime.utcnow()
+        db.add(beat); db.commit()
+
+
+def register_replica_heartbeat() -> Optional[BackgroundLoop]:
+    if not settings.DATABASE_REPLICA_URL:
+        return None
+
+    def tick() -> bool:
+        write_heartbeat()
+        monitor.measure()  # keeps request-time checks off the replica
+        return False
+
+    return register_loop(BackgroundLoop("replica-heartbeat", tick, settings.REPLICA_HEARTBEAT_INTERVAL_SECONDS))
+
+
+def read_engine() -> Engine:
+    """The replica when it is fresh enough, else the primary."""
+    eng = replica_engine()
+    if eng is None or not monitor.healthy():
+        return engine
+    return eng
+
+
+def read_session() -> Session:
+    return Session(read_engine(), info={"read_only": True})
+
+
+def get_read_session() -> Iterator[Session]:
+    """Read-only session on the replica when it is fresh enough, else on the primary."""
+    with read_session() as session:
+        yield session
+
+
+async def get_async_read_session() -> AsyncIterator[AsyncSession]:
+    eng = async_replica_engine()
+    if eng is None or not await monitor.healthy_async():
+        eng = get_async_engine()
+    async with AsyncSession(eng, expire_on_commit=False, info={"read_only": True}) as session:
+        yield session
+
+
+async def dispose_replica_engines():
+    global _replica, _async_replica
+    if _async_replica is not None:
+        await _async_replica.dispose()
+    if _replica is not None:
+        _replica.dispose()
+    _replica = _async_replica = None
+    monitor.reset()
@@ -4,16 +4,18 @@ from typing import Optional, Any, Dict
 from datetime import datetime
 from enum import Enum
 import uuid
-from sqlalchemy import Column
+from sqlalchemy import Column, Index, LargeBinary
 from sqlalchemy import JSON  # cross-db JSON
 
+from app.core.ids import uuid7  # time-ordered keys: inserts append to the PK index
+
 # --- NEW: persistent User account model (added without modifying any existing models) ---
 class User(SQLModel, table=True):
     """
     Persistent user account for signup/login. Added so auth routes can reference a User.
     This does not replace UserProfile (which remains tied to SimulationSession).
     """
-    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    id: uuid.UUID = Field(default_factory=uuid7, primary_key=True)
     customer_id: str = Field(index=True, unique=True)
     name: str
     email: Optional[str] = None
@@ -37,14 +39,27 @@ class OfferStatus(str, Enum):
     PENDING = "Pending"
 
 class SimulationSession(SQLModel, table=True):
+    # admin listing pages on (created_at, id), optionally narrowed by status or customer
+    __table_args__ = (
+        Index("ix_simulationsession_created_at_id", "created_at", "id"),
+        Index("ix_simulationsession_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_simulationsession_customer_id_created_at_id", "customer_id", "created_at", "id"),
+    )
+
+    # stays random: the session id is what the /sessions/{id} routes are addressed by
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     status: SessionStatus = Field(default=SessionStatus.PENDING)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
-    customer_id: Optional[str] = Field(default=None, index=True)  # ties to synthetic customers
+    customer_id: Optional[str] = None  # ties to synthetic customers
+    # bumped in SQL by every write to the session, its profile or its offers (summary ETag)
+    version: int = 0
 
 class UserProfile(SQLModel, table=True):
-    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    # dashboard: latest profile per customer
+    __table_args__ = (Index("ix_userprofile_customer_id_created_at", "customer_id", "created_at"),)
+
+    id: uuid.UUID = Field(default_factory=uuid7, primary_key=True)
     session_id: uuid.UUID = Field(foreign_key="simulationsession.id", index=True)
     customer_id: Optional[str] = None
     name: str
@@ -60,15 +75,60 @@ class UserProfile(SQLModel, table=True):
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 class Message(SQLModel, table=True):
-    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
-    session_id: uuid.UUID = Field(foreign_key="simulationsession.id", index=True)
+    # a session's transcript in order (covers session_id lookups too); audit export by date range
+    __table_args__ = (
+        Index("ix_message_session_id_created_at", "session_id", "created_at"),
+        Index("ix_message_created_at_id", "created_at", "id"),
+    )
+
+    id: uuid.UUID = Field(default_factory=uuid7, primary_key=True)
+    session_id: uuid.UUID = Field(foreign_key="simulationsession.id")
     sender: str  # "user" | "bot"
     text: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
-class Offer(SQLModel, table=True):
-    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+class StoredBlob(SQLModel, table=True):
+    """
+    One stored copy of an uploaded file, addressed by its SHA-256. Sessions point
+    at it through UploadedDocument rows; `refcount` counts them, and a blob at
+    zero since `orphaned_at` is removed by the upload GC.
+    """
+    sha256: str = Field(primary_key=True)
+    key: str  # storage key, see app.services.storage.content_key
+    size_bytes: int
+    content_type: Optional[str] = None
+    refcount: int = 0
+    orphaned_at: Optional[datetime] = Field(default=None, index=True)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+class UploadedDocument(SQLModel, table=True):
+    """A session's reference to an uploaded file (salary slip, ...); the bytes live in a StoredBlob."""
+    id: uuid.UUID = Field(default_factory=uuid7, primary_key=True)
     session_id: uuid.UUID = Field(foreign_key="simulationsession.id", index=True)
+    kind: str = "salary_slip"
+    key: str  # storage key of the shared blob
+    filename: str
+    content_type: Optional[str] = None
+    size_bytes: int
+    sha256: str = Field(index=True)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+class SalaryExtraction(SQLModel, table=True):
+    """Salary figures parsed from a slip, cached by file content so a re-upload is never parsed twice."""
+    sha256: str = Field(primary_key=True)
+    salary: Optional[float] = None  # figure used for underwriting (net, else gross)
+    net_salary: Optional[float] = None
+    gross_salary: Optional[float] = None
+    pages: int = 0
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+class Offer(SQLModel, table=True):
+    # approved offer for a session (sanction letter, finalize); covers session_id lookups too
+    __table_args__ = (Index("ix_offer_session_id_status", "session_id", "status"),)
+
+    id: uuid.UUID = Field(default_factory=uuid7, primary_key=True)
+    session_id: uuid.UUID = Field(foreign_key="simulationsession.id")
     requested_amount: float
     amount: float
     tenure_months: int
@@ -79,14 +139,136 @@ class Offer(SQLModel, table=True):
     pre_approved_limit: Optional[float] = None
     decision_reason: Optional[str] = None
     salary_slip_path: Optional[str] = None
+    sanction_letter_key: Optional[str] = None  # storage key of the latest reissued letter
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 class AgentLog(SQLModel, table=True):
-    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
-    session_id: uuid.UUID = Field(foreign_key="simulationsession.id", index=True)
+    # latest log per session: "ORDER BY created_at DESC LIMIT 1" walks this index backwards;
+    # (created_at, id) serves the audit export by date range
+    __table_args__ = (
+        Index("ix_agentlog_session_id_created_at", "session_id", "created_at"),
+        Index("ix_agentlog_created_at_id", "created_at", "id"),
+    )
+
+    id: uuid.UUID = Field(default_factory=uuid7, primary_key=True)
+    session_id: uuid.UUID = Field(foreign_key="simulationsession.id")
     offer_id: Optional[uuid.UUID] = Field(default=None, foreign_key="offer.id")
 
-    # explicit JSON column so SQLModel knows how to store it
-    log: Dict[str, Any] = Field(sa_column=Column(JSON), default_factory=dict)
+    # explicit JSON column so SQLModel knows how to store it; legacy rows and AGENT_LOG_COMPACT=false only
+    log: Optional[Dict[str, Any]] = Field(sa_column=Column(JSON(none_as_null=True)), default_factory=dict)
+
+    # compact mode: queried fields as columns, the rest compressed (see app.services.agent_logs)
+    approved: Optional[bool] = None
+    reason: Optional[str] = None
+    sentiment: Optional[str] = None
+    model_latency_ms: Optional[float] = None
+    payload: Optional[bytes] = Field(default=None, sa_column=Column(LargeBinary))
+    encoding: Optional[str] = None
+
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class JobStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+class Job(SQLModel, table=True):
+    """
+    Durable background job (PDF rendering, email delivery). Workers claim rows by
+    taking a time-limited lease, so a crashed worker's job is picked up again.
+    """
+    id: uuid.UUID = Field(default_factory=uuid7, primary_key=True)
+    kind: str = Field(index=True)
+    status: JobStatus = Field(default=JobStatus.PENDING, index=True)
+    payload: Dict[str, Any] = Field(sa_column=Column(JSON), default_factory=dict)
+    result: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON))
+    last_error: Optional[str] = None
+    attempts: int = 0
+    max_attempts: int = 5
+    run_after: datetime = Field(default_factory=datetime.utcnow, index=True)
+    lease_owner: Optional[str] = None
+    lease_expires_at: Optional[datetime] = None
+    session_id: Optional[uuid.UUID] = Field(default=None, foreign_key="simulationsession.id", index=True)
+    parent_id: Optional[uuid.UUID] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+
+
+class LetterRegenRun(SQLModel, table=True):
+    """
+    Progress record for a bulk sanction-letter reissue. The cursor is the
+    (created_at, id) of the last offer rendered, so an interrupted run resumes
+    where it stopped.
+    """
+    id: uuid.UUID = Field(default_factory=uuid7, primary_key=True)
+    status: str = "running"  # running | interrupted | completed
+    total: int = 0
+    processed: int = 0
+    failed: int = 0
+    cursor_created_at: Optional[datetime] = None
+    cursor_offer_id: Optional[uuid.UUID] = None
+    started_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+
 
+class OutboxStatus(str, Enum):
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed"
+
+class EmailOutbox(SQLModel, table=True):
+    """Transactional email waiting for the outbox flusher to hand it to the provider."""
+    id: uuid.UUID = Field(default_factory=uuid7, primary_key=True)
+    to_email: str
+    subject: str
+    html: str
+    template: Optional[str] = None
+    status: OutboxStatus = Field(default=OutboxStatus.PENDING, index=True)
+    attempts: int = 0
+    max_attempts: int = 8
+    next_attempt_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+    lease_owner: Optional[str] = None
+    lease_expires_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+    provider_message_id: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    sent_at: Optional[datetime] = None
+
+
+class ReplicaHeartbeat(SQLModel, table=True):
+    """Single row the primary touches every few seconds; its age on a replica is the replication lag."""
+    id: int = Field(default=1, primary_key=True)
+    beat_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class DashboardSummary(SQLModel, table=True):
+    """
+    Materialized dashboard aggregate per customer. `data` is cleared and
+    `generation` bumped by any write to the customer's offers or profiles
+    (see app.services.dashboard); the next view recomputes it.
+    """
+    customer_id: str = Field(primary_key=True)
+    generation: int = 0
+    data: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON(none_as_null=True)))
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class ArchivedSession(SQLModel, table=True):
+    """
+    Where an archived session went: its zstd frame inside a monthly partition
+    object (see app.services.archive). The hot rows are gone once this exists.
+    """
+    session_id: uuid.UUID = Field(primary_key=True)
+    customer_id: Optional[str] = Field(default=None, index=True)
+    status: SessionStatus
+    created_at: datetime
+    closed_at: datetime
+    archived_at: datetime = Field(default_factory=datetime.utcnow)
+    partition: str  # "yyyy-mm" the session started in
+    key: str
+    frame_offset: int
+    frame_length: int
@@ -45,6 +45,7 @@ class ChatReply(BaseModel):
     is_final_offer: bool = False
     final_offer: Optional[OfferOut] = None
     next_action: Optional[str] = None
+    job_id: Optional[UUID] = None
 
 class InternalLogOut(BaseModel):
     emotion_agent: Dict[str, Any]
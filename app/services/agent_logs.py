@@ -0,0 +1,91 @@
+# app/services/agent_logs.py
+import json
+import threading
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+import zstandard
+
+from app.core.config import settings
+from app.models.domain_models import AgentLog
+
+ZSTD_JSON = "zstd+json"
+
+# zstd contexts aren't thread-safe; one pair per thread
+_local = threading.local()
+
+
+def _compressor() -> zstandard.ZstdCompressor:
+    c = getattr(_local, "compressor", None)
+    if c is None:
+        c = _local.compressor = zstandard.ZstdCompressor(level=settings.AGENT_LOG_ZSTD_LEVEL)
+    return c
+
+
+def _decompressor() -> zstandard.ZstdDecompressor:
+    d = getattr(_local, "decompressor", None)
+    if d is None:
+        d = _local.decompressor = zstandard.ZstdDecompressor()
+    return d
+
+
+def encode_log(log: Dict[str, Any]) -> bytes:
+    # compact separators; default=str matches what the JSON column did for UUIDs/datetimes
+    raw = json.dumps(log, separators=(",", ":"), default=str).encode()
+    return _compressor().compress(raw)
+
+
+def decode_log(payload: bytes, encoding: str) -> Dict[str, Any]:
+    if encoding != ZSTD_JSON:
+        raise ValueError(f"unknown agent log encoding {encoding!r}")
+    return json.loads(_decompressor().decompress(payload))
+
+
+def summarize(log: Dict[str, Any]) -> Dict[str, Any]:
+    """The fields admin views filter and list on, lifted out of the payload."""
+    decision = log.get("underwriting_agent") or log.get("salary_resume") or {}
+    offer = decision.get("offer") or {}
+    latency = log.get("model_latency_ms")
+    return {
+        "approved": decision.get("approved"),
+        "reason": decision.get("reason") or offer.get("reason_summary"),
+        "sentiment": (log.get("emotion_agent") or {}).get("sentiment"),
+        "model_latency_ms": float(latency) if latency is not None else None,
+    }
+
+
+def new_agent_log(session_id: UUID, log: Dict[str, Any], offer_id: Optional[UUID] = None) -> AgentLog:
+    """Build an AgentLog row: typed summary columns plus the payload, compressed unless AGENT_LOG_COMPACT is off."""
+    if not settings.AGENT_LOG_COMPACT:
+        return AgentLog(session_id=session_id, offer_id=offer_id, log=log, **summarize(log))
+    return AgentLog(
+        session_id=session_id,
+        offer_id=offer_id,
+        log=None,
+        payload=encode_log(log),
+        encoding=ZSTD_JSON,
+        **summarize(log),
+    )
+
+
+def agent_log_data(al: AgentLog) -> Dict[str, Any]:
+    """Full log for a row, decoded only when asked for; legacy rows still carry the JSON column."""
+    if al.payload is not None:
+        return decode_log(al.payload, al.encoding)
+    return al.log or {}
+
+
+AGENT_LOG_SUMMARY_COLUMNS = (
+    AgentLog.id, AgentLog.created_at, AgentLog.approved, AgentLog.reason, AgentLog.sentiment, AgentLog.model_latency_ms,
+)
+
+
+def agent_log_summary(al: AgentLog) -> Dict[str, Any]:
+    return {
+        "id": al.id,
+        "created_at": al.created_at,
+        "approved": al.approved,
+        "reason": al.reason,
+        "sentiment": al.sentiment,
+        "model_latency_ms": al.model_latency_ms,
+    }
@@ -0,0 +1,196 @@
+# app/services/archive.py
+"""
+Hot/cold archival of closed sessions.
+
+Sessions COMPLETED or REJECTED more than SESSION_ARCHIVE_AFTER_DAYS ago are
+written out, one JSON document per session (the session with its profiles,
+messages, offers, agent logs and upload references), into zstd-compressed
+NDJSON partitions keyed by the month the session started. Each session is
+its own zstd frame, so a partition is an ordinary .ndjson.zst file for bulk
+tools and a single session can still be cut out of it by offset.
+
+ArchivedSession keeps where every session went; the hot rows are deleted
+in the same transaction that records it. Objects stored under the session
+(persisted sanction letters) are copied next to the partition first and the
+originals deleted once that transaction commits; if it fails, the run's
+partitions and copies are removed instead. Uploaded documents keep their
+reference on the shared blob, so upload GC never collects archived content.
+"""
+import json
+import logging
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+import zstandard
+from sqlalchemy import delete, exists, update
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.core.db import engine
+from app.models.domain_models import (
+    AgentLog, ArchivedSession, Job, JobStatus, Message, Offer, SessionStatus, SimulationSession,
+    UploadedDocument, UserProfile,
+)
+from app.services.agent_logs import agent_log_data
+from app.services.dashboard import invalidate_dashboards
+from app.services.storage import archive_key, archived_file_key, get_storage
+from app.services.workers import BackgroundLoop, register_loop
+
+logger = logging.getLogger(__name__)
+
+CLOSED = (SessionStatus.COMPLETED, SessionStatus.REJECTED)
+# children first: agent logs point at offers, everything points at the session.
+# Upload rows go without unpinning: the archive holds their blob references from then on.
+_CHILDREN = (AgentLog, Offer, Message, UserProfile, UploadedDocument)
+
+
+def _candidates(db: Session, cutoff: datetime, limit: int) -> List[SimulationSession]:
+    busy = select(Job.id).where(Job.session_id == SimulationSession.id, Job.status.in_((JobStatus.PENDING, JobStatus.RUNNING)))
+    return db.exec(
+        select(SimulationSession)
+        .where(SimulationSession.status.in_(CLOSED), SimulationSession.updated_at < cutoff, ~exists(busy))
+        .order_by(SimulationSession.updated_at, SimulationSession.id)
+        .limit(limit)
+    ).all()
+
+
+def _by_session(db: Session, model, ids: List[UUID]) -> Dict[UUID, List[Any]]:
+    grouped = defaultdict(list)
+    for row in db.exec(select(model).where(model.session_id.in_(ids)).order_by(model.created_at)).all():
+        grouped[row.session_id].append(row)
+    return grouped
+
+
+def _agent_log_doc(al: AgentLog) -> Dict[str, Any]:
+    doc = al.model_dump(mode="json", exclude={"payload", "encoding"})
+    doc["log"] = agent_log_data(al)
+    return doc
+
+
+def _documents(db: Session, ids: List[UUID], files: Dict[UUID, List[Dict[str, str]]]) -> Dict[UUID, Dict[str, Any]]:
+    children = {model: _by_session(db, model, ids) for model in _CHILDREN}
+    return {
+        sid: {
+            "profiles": [p.model_dump(mode="json") for p in children[UserProfile][sid]],
+            "messages": [m.model_dump(mode="json") for m in children[Message][sid]],
+            "offers": [o.model_dump(mode="json") for o in children[Offer][sid]],
+            "agent_logs": [_agent_log_doc(al) for al in children[AgentLog][sid]],
+            "uploads": [d.model_dump(mode="json") for d in children[UploadedDocument][sid]],
+            # per-session objects (persisted sanction letters) and their cold-storage copies
+            "files": files[sid],
+        }
+        for sid in ids
+    }
+
+
+def archive_sessions(
+    db: Session,
+    after_days: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    now: Optional[datetime] = None,
+) -> int:
+    """Archive one batch of closed sessions. Returns how many were moved out of the hot tables."""
+    after_days = settings.SESSION_ARCHIVE_AFTER_DAYS if after_days is None else after_days
+    cutoff = (now or datetime.utcnow()) - timedelta(days=after_days)
+    sessions = _candidates(db, cutoff, batch_size or settings.SESSION_ARCHIVE_BATCH_SIZE)
+    if not sessions:
+        return 0
+    ids = [s.id for s in sessions]
+    storage = get_storage()
+    by_month = defaultdict(list)
+    for sess in sessions:
+        by_month[sess.created_at.strftime("%Y-%m")].append(sess)
+
+    # one object per month touched by this batch; partitions are never rewritten
+    compressor = zstandard.ZstdCompressor(level=settings.SESSION_ARCHIVE_ZSTD_LEVEL)
+    run_id = uuid.uuid4().hex
+    index: List[ArchivedSession] = []
+    written: List[str] = []  # everything this run puts; removed again if it doesn't commit
+    try:
+        files = {
+            sess.id: _copy_files(storage, month, sess.id, written)
+            for month, members in by_month.items() for sess in members
+        }
+        docs = _documents(db, ids, files)
+        for month, members in by_month.items():
+            key = archive_key(month, run_id)
+            frames, offset = [], 0
+            for sess in members:
+                line = json.dumps({"session": sess.model_dump(mode="json"), **docs[sess.id]}, separators=(",", ":"))
+                frame = compressor.compress((line + "\n").encode())
+                index.append(ArchivedSession(
+                    session_id=sess.id, customer_id=sess.customer_id, status=sess.status,
+                    created_at=sess.created_at, closed_at=sess.updated_at,
+                    partition=month, key=key, frame_offset=offset, frame_length=len(frame),
+                ))
+                frames.append(frame)
+                offset += len(frame)
+            written.append(key)
+            storage.put(key, b"".join(frames), content_type="application/zstd")
+    except Exception:
+        _remove_written(storage, written)
+        raise
+
+    # index in, hot rows out: one transaction, so a session is always in exactly one place
+    customers = {s.customer_id for s in sessions}
+    try:
+        db.add_all(index)
+        db.execute(update(Job).where(Job.session_id.in_(ids)).values(session_id=None))
+        for model in _CHILDREN:
+            db.execute(delete(model).where(model.session_id.in_(ids)))
+        db.execute(delete(SimulationSession).where(SimulationSession.id.in_(ids)))
+        invalidate_dashboards(db.connection(), customers)
+        db.commit()
+    except Exception:
+        db.rollback()
+        # nothing references this run's objects; the sessions are still hot and go in a later run
+        _remove_written(storage, written)
+        raise
+
+    for f in (f for sid in ids for f in files[sid]):
+        storage.delete(f["key"])
+    return len(ids)
+
+
+def _copy_files(storage, month: str, session_id: UUID, written: List[str]) -> List[Dict[str, str]]:
+    # letters are legal documents: they move to cold storage with the session, never just away
+    files = []
+    for key in storage.list_session(session_id):
+        copy = archived_file_key(month, session_id, key)
+        written.append(copy)
+        storage.put(copy, storage.get(key), content_type="application/pdf" if key.endswith(".pdf") else None)
+        files.append({"key": key, "archived_key": copy})
+    return files
+
+
+def _remove_written(storage, keys: List[str]):
+    for key in keys:
+        try:
+            storage.delete(key)
+        except Exception:
+            logger.exception("archive object %s left behind after a failed run", key)
+
+
+def get_archived_session(db: Session, session_id: UUID) -> Optional[Dict[str, Any]]:
+    """An archived session's document, read back from its partition on demand."""
+    entry = db.get(ArchivedSession, session_id)
+    if entry is None:
+        return None
+    data = get_storage().get(entry.key)
+    frame = data[entry.frame_offset:entry.frame_offset + entry.frame_length]
+    return json.loads(zstandard.ZstdDecompressor().decompress(frame))
+
+
+def register_session_archiver() -> Optional[BackgroundLoop]:
+    if settings.SESSION_ARCHIVE_AFTER_DAYS is None:
+        return None
+
+    def tick() -> bool:
+        with Session(engine) as db:
+            # a full batch means there is probably more to do right away
+            return archive_sessions(db) >= settings.SESSION_ARCHIVE_BATCH_SIZE
+
+    return register_loop(BackgroundLoop("session-archiver", tick, settings.SESSION_ARCHIVE_INTERVAL_SECONDS))
@@ -0,0 +1,117 @@
+# app/services/audit_export.py
+"""
+Streaming NDJSON export of agent logs and messages for audit.
+
+Rows are read through server-side cursors (`yield_per`) and written out a
+batch at a time, so memory stays flat however large the range is. Agent logs
+come first, then messages, each in (created_at, id) order. Every line carries
+a `cursor`; passing the last one received back resumes right after it. The
+stream ends with a {"type": "end"} line, so a client can tell a complete
+export from a dropped connection.
+"""
+import json
+import zlib
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.models.domain_models import AgentLog, Message
+from app.services.agent_logs import agent_log_data
+from app.services.pagination import Position, after, decode_cursor, encode_cursor
+
+KINDS = ("agent_log", "message")
+
+
+def _agent_log_row(al: AgentLog) -> Dict[str, Any]:
+    return {
+        "type": "agent_log",
+        "id": str(al.id),
+        "session_id": str(al.session_id),
+        "offer_id": str(al.offer_id) if al.offer_id else None,
+        "created_at": al.created_at.isoformat(),
+        "approved": al.approved,
+        "reason": al.reason,
+        "sentiment": al.sentiment,
+        "model_latency_ms": al.model_latency_ms,
+        "log": agent_log_data(al),
+    }
+
+
+def _message_row(m: Message) -> Dict[str, Any]:
+    return {
+        "type": "message",
+        "id": str(m.id),
+        "session_id": str(m.session_id),
+        "created_at": m.created_at.isoformat(),
+        "sender": m.sender,
+        "text": m.text,
+    }
+
+
+_SOURCES = {"agent_log": (AgentLog, _agent_log_row), "message": (Message, _message_row)}
+
+
+def parse_export_cursor(cursor: str) -> Tuple[str, Position]:
+    kind, _, token = cursor.partition(".")
+    if kind not in _SOURCES:
+        raise HTTPException(status_code=400, detail="invalid cursor")
+    return kind, decode_cursor(token)
+
+
+def export_rows(
+    db: Session,
+    session_ids: Optional[List[UUID]] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    resume: Optional[Tuple[str, Position]] = None,
+) -> Iterator[Dict[str, Any]]:
+    start = KINDS.index(resume[0]) if resume else 0
+    for kind in KINDS[start:]:
+        model, render = _SOURCES[kind]
+        stmt = select(model)
+        if session_ids:
+            stmt = stmt.where(model.session_id.in_(session_ids))
+        if created_from is not None:
+            stmt = stmt.where(model.created_at >= created_from)
+        if created_to is not None:
+            stmt = stmt.where(model.created_at < created_to)
+        if resume and resume[0] == kind:
+            stmt = stmt.where(after(model.created_at, model.id, resume[1]))
+        stmt = stmt.order_by(model.created_at, model.id).execution_options(yield_per=settings.AUDIT_EXPORT_BATCH_ROWS)
+
+        for batch in db.exec(stmt).partitions():
+            for obj in batch:
+                row = render(obj)
+                row["cursor"] = f"{kind}.{encode_cursor(obj.created_at, obj.id)}"
+                # the identity map would otherwise keep every exported row alive
+                db.expunge(obj)
+                yield row
+
+
+def ndjson_chunks(rows: Iterable[Dict[str, Any]], gzip: bool = False) -> Iterator[bytes]:
+    """Encode rows as NDJSON, one chunk per AUDIT_EXPORT_BATCH_ROWS lines, gzip-framed if asked."""
+    compressor = zlib.compressobj(settings.AUDIT_EXPORT_GZIP_LEVEL, wbits=31) if gzip else None
+
+    def emit(lines: List[str]) -> bytes:
+        data = "".join(lines).encode()
+        if compressor is None:
+            return data
+        # sync flush: the client can decode everything sent so far
+        return compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    lines: List[str] = []
+    count = 0
+    for row in rows:
+        lines.append(json.dumps(row, separators=(",", ":")) + "\n")
+        count += 1
+        if len(lines) >= settings.AUDIT_EXPORT_BATCH_ROWS:
+            yield emit(lines)
+            lines = []
+    lines.append(json.dumps({"type": "end", "rows": count}) + "\n")
+    yield emit(lines)
+    if compressor is not None:
+        yield compressor.flush()
@@ -1,25 +1,31 @@
 # app/services/chat_service.py
 import os
 import json
+import time
 import uuid
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.concurrency import run_in_threadpool
 from uuid import UUID
 from datetime import datetime
 from fastapi import HTTPException
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import google.generativeai as genai
 from dotenv import load_dotenv
 
 from app.models.domain_models import (
-    SimulationSession, Message, Offer, AgentLog, SessionStatus, OfferStatus, UserProfile
+    SimulationSession, Message, Offer, SessionStatus, OfferStatus, UserProfile, UploadedDocument
 )
 from app.agents.emotion_agent import run_emotion_agent
 from app.agents.sales_agent import run_sales_agent
 from app.agents.verification_agent import run_verification_agent
 from app.agents.underwriting_agent import run_underwriting_agent
 from app.services.utils import save_message
-from app.services.pdf_service import generate_sanction_pdf
-from app.services.pdf_mailer import augment_pdf_with_pypdf, send_email_smtp
+from app.services.job_handlers import enqueue_sanction_letter
+from app.services.job_queue import enqueue_job, job_handler
+from app.services.agent_logs import new_agent_log
+from app.services.salary_extraction import cached_extraction, extract_document
+from app.services.storage import session_key
 from app.schemas.session_schemas import UserProfileCreate
 
 load_dotenv()
@@ -28,14 +34,6 @@ GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 if GOOGLE_API_KEY:
     genai.configure(api_key=GOOGLE_API_KEY)
 
-SMTP_CONFIG = {
-    "host": os.getenv("SMTP_HOST"),
-    "port": int(os.getenv("SMTP_PORT") or 587),
-    "user": os.getenv("SMTP_USER"),
-    "password": os.getenv("SMTP_PASS"),
-    "sender": os.getenv("SENDER_EMAIL")
-}
-
 # --- helper: call Google chat API ---
 def call_google_chat_api(prompt: str, model: str = "gemini-1.5-flash") -> Dict[str, Any]:
     """
@@ -125,33 +123,18 @@ def call_google_chat_api(prompt: str, model: str = "gemini-1.5-flash") -> Dict[s
     return model_json
 
 
-def resume_underwriting_after_salary(db: Session, session_id: UUID, salary_slip_path: str):
+def resume_underwriting_after_salary(db: Session, session_id: UUID, salary_slip_path: str, extracted_salary: Optional[float] = None):
     """
-    Called after a salary slip upload. Attaches a declared salary to the UserProfile
-    when possible (or uses filename parsing), re-runs sales + underwriting, and
-    persists offer or rejection accordingly.
+    Called once a salary slip has been read. Attaches the salary extracted from the
+    slip to the UserProfile unless one was already declared, re-runs sales +
+    underwriting, and persists offer or rejection accordingly.
     """
     profile = db.exec(select(UserProfile).where(UserProfile.session_id == session_id)).first()
     if not profile:
         raise HTTPException(status_code=404, detail="profile not found")
 
-    # try to parse declared salary from filename if not set
-    declared_salary = None
-    try:
-        # naive parse: simple digit extraction
-        filename = salary_slip_path.split(os.sep)[-1]
-        for token in filename.split("_"):
-            if token.isdigit():
-                val = float(token)
-                # arbitrary sanity check to avoid parsing IDs as salary
-                if val > 1000: 
-                    declared_salary = val
-                break
-    except Exception:
-        declared_salary = None
-
-    if declared_salary and (not profile.salary_reported):
-        profile.salary_reported = declared_salary
+    if extracted_salary and (not profile.salary_reported):
+        profile.salary_reported = extracted_salary
         db.add(profile); db.commit(); db.refresh(profile)
 
     # re-run sales and underwriting
@@ -160,24 +143,27 @@ def resume_underwriting_after_salary(db: Session, session_id: UUID, salary_slip_
 
     # Save a short agent log about resume
     log_payload = {"salary_resume": underwriting_result, "salary_slip_path": salary_slip_path}
-    agent_log = AgentLog(session_id=session_id, log=log_payload)
+    agent_log = new_agent_log(session_id, log_payload)
     db.add(agent_log); db.commit()
 
     if underwriting_result.get("approved"):
         final_offer = underwriting_result["offer"]
-        offer = Offer(
-            session_id=session_id,
-            requested_amount=profile.desired_amount,
-            amount=final_offer["amount"],
-            tenure_months=final_offer["tenure_months"],
-            interest_rate=final_offer["interest_rate"],
-            monthly_emi=final_offer["monthly_emi"],
-            status=OfferStatus.APPROVED,
-            reason_summary=final_offer.get("reason_summary", ""),
-            salary_slip_path=salary_slip_path
-        )
-        db.add(offer); db.commit(); db.refresh(offer)
-        
+        # a retried extract_salary job may already have got this far
+        offer = db.exec(select(Offer).where(Offer.session_id == session_id)).first()
+        if not offer:
+            offer = Offer(
+                session_id=session_id,
+                requested_amount=profile.desired_amount,
+                amount=final_offer["amount"],
+                tenure_months=final_offer["tenure_months"],
+                interest_rate=final_offer["interest_rate"],
+                monthly_emi=final_offer["monthly_emi"],
+                status=OfferStatus.APPROVED,
+                reason_summary=final_offer.get("reason_summary", ""),
+                salary_slip_path=salary_slip_path
+            )
+            db.add(offer); db.commit(); db.refresh(offer)
+
         session = db.get(SimulationSession, session_id)
         # be tolerant if DB schema doesn't include this column
         if hasattr(session, "latest_offer_id"):
@@ -193,6 +179,44 @@ def resume_underwriting_after_salary(db: Session, session_id: UUID, salary_slip_
     return {"message": "Offer rejected after salary upload", "reason": underwriting_result.get("reason")}
 
 
+def submit_salary_slip(db: Session, session_id: UUID, doc: UploadedDocument, declared_salary: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Entry point after a salary slip upload. With a declared salary, or a slip whose
+    content was parsed before, underwriting resumes right away; otherwise the slip
+    is queued for extraction and a pending state is returned.
+    """
+    profile = db.exec(select(UserProfile).where(UserProfile.session_id == session_id)).first()
+    if not profile:
+        raise HTTPException(status_code=404, detail="User profile not found")
+
+    if declared_salary:
+        profile.salary_reported = declared_salary
+        db.add(profile); db.commit(); db.refresh(profile)
+        return resume_underwriting_after_salary(db, session_id, doc.key)
+
+    cached = cached_extraction(db, doc.sha256)
+    if cached:
+        return resume_underwriting_after_salary(db, session_id, doc.key, extracted_salary=cached.salary)
+
+    job = enqueue_job(db, "extract_salary", {"document_id": str(doc.id)}, session_id=session_id)
+    return {
+        "status": "processing",
+        "message": "Salary slip received; reading it now",
+        "document_id": str(doc.id),
+        "job_id": str(job.id),
+    }
+
+
+@job_handler("extract_salary")
+def extract_salary_job(db: Session, payload: Dict[str, Any]):
+    doc = db.get(UploadedDocument, UUID(payload["document_id"]))
+    if not doc:
+        raise ValueError(f"uploaded document {payload['document_id']} not found")
+    extraction = extract_document(db, doc)
+    outcome = resume_underwriting_after_salary(db, doc.session_id, doc.key, extracted_salary=extraction.salary)
+    return {"salary": extraction.salary, "message": outcome.get("message")}
+
+
 # --- helper: build prompt (strict format) ---
 def build_prompt(profile: UserProfile, conversation_history: List[Dict[str, str]], agent_lines: List[str]) -> str:
     persona_context = (
@@ -240,7 +264,9 @@ def rerun_agents_for_session(db: Session, session_id: UUID, agents: list):
 
 
 # --- main function ---
-def handle_user_message(db: Session, session_id: UUID, message):
+# A chat turn runs in three steps so the async route can keep DB work on the
+# event loop (AsyncSession.run_sync) and only hand the blocking model call to a thread.
+def _prepare_turn(db: Session, session_id: UUID, message) -> Dict[str, Any]:
     session = db.get(SimulationSession, session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -275,9 +301,6 @@ def handle_user_message(db: Session, session_id: UUID, message):
     msgs = db.exec(select(Message).where(Message.session_id == session_id).order_by(Message.created_at)).all()
     conversation_history = [{"sender": m.sender, "text": m.text} for m in msgs]
 
-    # 3. Build prompt and call Google chat API
-    prompt = build_prompt(profile, conversation_history, agent_lines)
-
     log_payload = {
         "emotion_agent": emotion_res,
         "sales_agent": sales_res,
@@ -285,14 +308,34 @@ def handle_user_message(db: Session, session_id: UUID, message):
         "underwriting_agent": underwriting_res,
         "agent_lines": agent_lines,
     }
+    return {
+        "session": session,
+        "profile": profile,
+        "sales_res": sales_res,
+        "underwriting_res": underwriting_res,
+        # 3. Build prompt for the Google chat API
+        "prompt": build_prompt(profile, conversation_history, agent_lines),
+        "log_payload": log_payload,
+    }
+
 
+def _call_model(turn: Dict[str, Any]) -> Dict[str, Any]:
+    # Use a valid Gemini model. Fallback to gemini-1.5-flash if env var is missing/invalid.
+    model_name = os.getenv("GOOGLE_MODEL", "gemini-1.5-flash")
+    started = time.perf_counter()
     try:
-        # Use a valid Gemini model. Fallback to gemini-1.5-flash if env var is missing/invalid.
-        model_name = os.getenv("GOOGLE_MODEL", "gemini-1.5-flash")
-        model_json = call_google_chat_api(prompt, model=model_name)
-    except Exception as e:
-        log_payload["model_error"] = str(e)
-        agent_log = AgentLog(session_id=session_id, log=log_payload)
+        return call_google_chat_api(turn["prompt"], model=model_name)
+    finally:
+        turn["log_payload"]["model_latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+
+def _finish_turn(db: Session, session_id: UUID, turn: Dict[str, Any], model_json: Optional[Dict[str, Any]], model_error: Optional[Exception] = None):
+    session, profile = turn["session"], turn["profile"]
+    sales_res, underwriting_res, log_payload = turn["sales_res"], turn["underwriting_res"], turn["log_payload"]
+
+    if model_error is not None:
+        log_payload["model_error"] = str(model_error)
+        agent_log = new_agent_log(session_id, log_payload)
         db.add(agent_log); db.commit()
         
         reply_text = "Sorry, I'm temporarily unable to process that. Please try again."
@@ -301,7 +344,7 @@ def handle_user_message(db: Session, session_id: UUID, message):
 
     # Add response to log
     log_payload["model_response"] = model_json
-    agent_log = AgentLog(session_id=session_id, log=log_payload)
+    agent_log = new_agent_log(session_id, log_payload)
     db.add(agent_log); db.commit(); db.refresh(agent_log)
 
     # Respond to user
@@ -344,32 +387,45 @@ def handle_user_message(db: Session, session_id: UUID, message):
         session.status = SessionStatus.COMPLETED
         db.add(session); db.commit()
 
-        # Generate PDF
+        # Queue PDF generation + email so the turn doesn't wait on reportlab/SMTP
         reference_id = str(uuid.uuid4())[:8]
-        pdf_path = f"uploads/{session_id}/sanction_{reference_id}.pdf"
-        try:
-            generate_sanction_pdf(pdf_path, profile.name, final_offer, log_payload, reference_id)
-            augment_pdf_with_pypdf(pdf_path, {"ref": reference_id, "customer": profile.name})
-        except Exception as e:
-            log_payload["pdf_error"] = str(e)
-
-        # Send Email
+        pdf_key = session_key(session_id, f"sanction_{reference_id}.pdf")
+        email = None
         if profile and getattr(profile, "email", None):
-            try:
-                send_email_smtp(
-                    smtp_config=SMTP_CONFIG,
-                    to_email=profile.email,
-                    subject=f"FinSync Sanction Letter [{reference_id}]",
-                    body=f"Dear {profile.name},\n\nPlease find attached your sanction letter.\nRef: {reference_id}",
-                    attachments=[pdf_path] if os.path.exists(pdf_path) else [],
-                )
-            except Exception as e:
-                log_payload["email_error"] = str(e)
+            email = {
+                "to_email": profile.email,
+                "subject": f"FinSync Sanction Letter [{reference_id}]",
+                "body": f"Dear {profile.name},\n\nPlease find attached your sanction letter.\nRef: {reference_id}",
+            }
+        job = enqueue_sanction_letter(db, session_id, pdf_key, profile.name, final_offer, log_payload, reference_id, email=email)
+        log_payload["sanction_job_id"] = str(job.id)
 
         return {
             "session_id": session_id, 
-            "reply": {"text": bot_text, "is_final_offer": True, "final_offer": final_offer}, 
+            "reply": {"text": bot_text, "is_final_offer": True, "final_offer": final_offer, "job_id": job.id}, 
             "internal_log": log_payload
         }
 
     return {"session_id": session_id, "reply": {"text": bot_text}, "internal_log": log_payload}
+
+
+def handle_user_message(db: Session, session_id: UUID, message):
+    turn = _prepare_turn(db, session_id, message)
+    try:
+        model_json = _call_model(turn)
+    except Exception as e:
+        return _finish_turn(db, session_id, turn, None, model_error=e)
+    return _finish_turn(db, session_id, turn, model_json)
+
+
+async def handle_user_message_async(db: AsyncSession, session_id: UUID, message):
+    """
+    handle_user_message for the async stack: the agents' DB work runs on the
+    event loop through run_sync, and only the blocking model call takes a thread.
+    """
+    turn = await db.run_sync(_prepare_turn, session_id, message)
+    try:
+        model_json = await run_in_threadpool(_call_model, turn)
+    except Exception as e:
+        return await db.run_sync(_finish_turn, session_id, turn, None, e)
+    return await db.run_sync(_finish_turn, session_id, turn, model_json)
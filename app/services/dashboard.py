@@ -0,0 +1,127 @@
+# app/services/dashboard.py
+"""
+Per-customer dashboard summary, materialized in DashboardSummary.
+
+Reads are a primary-key lookup. Any flush that writes an Offer or a
+UserProfile, or creates, deletes or changes the status of a
+SimulationSession, clears the affected customers' rows in the same
+transaction (and bumps their generation); the next dashboard view recomputes from the
+customer's own sessions and stores the result, unless another write bumped
+the generation while it was computing, in which case that stale result is
+simply not stored.
+"""
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Set
+from uuid import UUID
+
+from sqlalchemy import event, func, inspect, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from app.models.domain_models import DashboardSummary, Offer, SimulationSession, UserProfile
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_on_write(session, flush_context):
+    customer_ids: Set[Optional[str]] = set()
+    session_ids: Set[UUID] = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, UserProfile):
+            customer_ids.add(obj.customer_id)
+        elif isinstance(obj, SimulationSession):
+            # the summary counts sessions by status; other session updates don't show in it
+            state = inspect(obj)
+            if obj in session.dirty and not any(state.attrs[a].history.has_changes() for a in ("status", "customer_id")):
+                continue
+            customer_ids.add(obj.customer_id)
+            customer_ids.update(state.attrs.customer_id.history.deleted)
+        elif isinstance(obj, Offer):
+            session_ids.add(obj.session_id)
+    if not customer_ids and not session_ids:
+        return
+    conn = session.connection()
+    if session_ids:
+        customer_ids.update(conn.execute(
+            select(SimulationSession.customer_id).where(SimulationSession.id.in_(session_ids))
+        ).scalars())
+    invalidate_dashboards(conn, customer_ids)
+
+
+def invalidate_dashboards(conn, customer_ids: Iterable[Optional[str]]):
+    """For writes that bypass the ORM (bulk DELETE/UPDATE) and so the flush hook above."""
+    customer_ids = {c for c in customer_ids if c is not None}
+    if customer_ids:
+        conn.execute(
+            update(DashboardSummary)
+            .where(DashboardSummary.customer_id.in_(customer_ids))
+            .values(data=None, generation=DashboardSummary.generation + 1)
+        )
+
+
+def compute_summary(db: Session, customer_id: Optional[str]) -> Dict[str, Any]:
+    """The customer's latest profile, their offers (via their sessions) and counts by status."""
+    profile = db.exec(
+        select(UserProfile)
+        .where(UserProfile.customer_id == customer_id)
+        .order_by(UserProfile.created_at.desc())
+        .limit(1)
+    ).first()
+    offers = db.exec(
+        select(Offer)
+        .join(SimulationSession, Offer.session_id == SimulationSession.id)
+        .where(SimulationSession.customer_id == customer_id)
+        .order_by(Offer.created_at.desc())
+    ).all()
+    counts = db.exec(
+        select(SimulationSession.status, func.count())
+        .where(SimulationSession.customer_id == customer_id)
+        .group_by(SimulationSession.status)
+    ).all()
+    return {
+        "profile_summary": {
+            "income_monthly": getattr(profile, "income_monthly", None),
+            "existing_emi": getattr(profile, "existing_emi", None),
+            "loan_type": getattr(profile, "loan_type", None),
+        },
+        "sanctioned_loans": [o.model_dump(mode="json") for o in offers],
+        "counts": {
+            "offers": len(offers),
+            "offers_by_status": {
+                status.value: sum(1 for o in offers if o.status == status) for status in {o.status for o in offers}
+            },
+            "sessions_by_status": {status.value: n for status, n in counts},
+        },
+    }
+
+
+def _generation(db: Session, customer_id: str) -> int:
+    row = db.get(DashboardSummary, customer_id)
+    if row is None:
+        try:
+            row = DashboardSummary(customer_id=customer_id)
+            db.add(row); db.commit()
+        except IntegrityError:
+            db.rollback()  # a concurrent view created it
+        row = db.get(DashboardSummary, customer_id)
+    generation = row.generation
+    db.commit()  # end the read so the compute below sees writes committed since
+    return generation
+
+
+def dashboard_summary(db: Session, customer_id: Optional[str]) -> Dict[str, Any]:
+    """Cached summary for a customer, recomputed after an invalidating write. Runs on the primary."""
+    if customer_id is None:
+        return compute_summary(db, customer_id)
+    row = db.get(DashboardSummary, customer_id)
+    if row is not None and row.data is not None:
+        return row.data
+
+    generation = _generation(db, customer_id)
+    data = compute_summary(db, customer_id)
+    db.execute(
+        update(DashboardSummary)
+        .where(DashboardSummary.customer_id == customer_id, DashboardSummary.generation == generation)
+        .values(data=data, updated_at=datetime.utcnow())
+    )
+    db.commit()
+    return data
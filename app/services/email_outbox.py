@@ -0,0 +1,140 @@
+# app/services/email_outbox.py
+import logging
+import os
+import socket
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+import httpx
+from sqlalchemy import and_, or_, update
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.core.db import engine
+from app.models.domain_models import EmailOutbox, OutboxStatus
+from app.services.job_queue import backoff_delay
+from app.services.workers import BackgroundLoop, register_loop
+
+logger = logging.getLogger(__name__)
+
+RESEND_URL = "https://api.resend.com/emails"
+
+_client: Optional[httpx.Client] = None
+
+
+def _http() -> httpx.Client:
+    # one keep-alive client for the flusher instead of a TLS handshake per email
+    global _client
+    if _client is None:
+        _client = httpx.Client(timeout=10)
+    return _client
+
+
+def queue_email(db: Session, to_email: str, subject: str, html: str, template: Optional[str] = None) -> EmailOutbox:
+    row = EmailOutbox(
+        to_email=to_email,
+        subject=subject,
+        html=html,
+        template=template,
+        max_attempts=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+    )
+    db.add(row); db.commit(); db.refresh(row)
+    return row
+
+
+def _claimable(now: datetime):
+    return or_(
+        and_(EmailOutbox.status == OutboxStatus.PENDING, EmailOutbox.next_attempt_at <= now),
+        and_(EmailOutbox.status == OutboxStatus.SENDING, EmailOutbox.lease_expires_at < now),
+    )
+
+
+def claim_batch(db: Session, owner: str, size: int, now: Optional[datetime] = None) -> List[EmailOutbox]:
+    """Lease up to `size` due rows for `owner` with a single conditional UPDATE."""
+    now = now or datetime.utcnow()
+    ids = db.exec(
+        select(EmailOutbox.id).where(_claimable(now)).order_by(EmailOutbox.next_attempt_at).limit(size)
+    ).all()
+    if not ids:
+        return []
+    db.execute(
+        update(EmailOutbox)
+        .where(EmailOutbox.id.in_(ids), _claimable(now))
+        .values(
+            status=OutboxStatus.SENDING,
+            lease_owner=owner,
+            lease_expires_at=now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE_SECONDS),
+            attempts=EmailOutbox.attempts + 1,
+        )
+    )
+    db.commit()
+    # rows another flusher won in the meantime simply don't come back
+    return db.exec(
+        select(EmailOutbox).where(
+            EmailOutbox.id.in_(ids),
+            EmailOutbox.lease_owner == owner,
+            EmailOutbox.status == OutboxStatus.SENDING,
+        ).execution_options(populate_existing=True)
+    ).all()
+
+
+def _send(row: EmailOutbox) -> Optional[str]:
+    api_key = os.getenv("RESEND_API_KEY")
+    sender = os.getenv("SENDER_EMAIL")
+    if not api_key or not sender:
+        raise RuntimeError("Resend email is not configured")
+
+    # keyed by the row, so a retry of an email that actually went through isn't sent
+    # twice, whatever else was claimed with it. Resend's batch endpoint takes one key
+    # for the whole request, which can't give that guarantee once batches regroup.
+    response = _http().post(
+        RESEND_URL,
+        headers={
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+            "Idempotency-Key": f"outbox-{row.id}",
+        },
+        json={"from": sender, "to": row.to_email, "subject": row.subject, "html": row.html},
+    )
+    if response.status_code not in (200, 201, 202):
+        raise RuntimeError(f"Resend send failed ({response.status_code}): {response.text[:300]}")
+    return (response.json() or {}).get("id")
+
+
+def flush_outbox(owner: str = "inline", batch_size: Optional[int] = None) -> int:
+    """
+    Send one claimed batch of due emails. Returns how many rows were attempted.
+    Each row's outcome is committed as soon as it is known, so a crash mid-batch
+    leaves only the email in flight to be retried (under the same key).
+    """
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    with Session(engine) as db:
+        rows = claim_batch(db, owner, batch_size)
+        for r in rows:
+            try:
+                provider_id = _send(r)
+            except Exception as e:
+                logger.warning("email outbox row %s attempt %s failed: %s", r.id, r.attempts, e)
+                r.last_error = str(e)
+                if r.attempts >= r.max_attempts:
+                    r.status = OutboxStatus.FAILED
+                else:
+                    r.status = OutboxStatus.PENDING
+                    r.next_attempt_at = datetime.utcnow() + timedelta(seconds=backoff_delay(r.attempts))
+            else:
+                r.status = OutboxStatus.SENT
+                r.provider_message_id = provider_id
+                r.sent_at = datetime.utcnow()
+                r.last_error = None
+            r.lease_owner = None
+            r.lease_expires_at = None
+            db.add(r)
+            db.commit()
+        return len(rows)
+
+
+def register_outbox_flusher() -> BackgroundLoop:
+    owner = f"{socket.gethostname()}:{os.getpid()}:outbox"
+    return register_loop(
+        BackgroundLoop("email-outbox", lambda: flush_outbox(owner) > 0, settings.EMAIL_OUTBOX_FLUSH_INTERVAL_SECONDS)
+    )
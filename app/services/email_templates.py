@@ -1,3 +1,6 @@
+from html import escape
+from string import Template
+
 def sanction_letter_email(name: str, ref: str):
     return f"""
 Hi {name},
@@ -10,3 +13,98 @@ Your sanction letter is attached.
 Regards,
 FinSync AI
 """
+
+
+class CompiledTemplate:
+    """
+    `string.Template` source split once into literal chunks and field names, so
+    rendering is a single join with no per-call parsing. Values are HTML-escaped.
+    """
+
+    def __init__(self, source: str):
+        self.parts = []  # alternating literal, field name, literal, ...
+        pos = 0
+        for m in Template.pattern.finditer(source):
+            name = m.group("named") or m.group("braced")
+            if name is None:
+                # "$$" escape (or a stray "$"): keep a literal "$"
+                self.parts.append(source[pos:m.start()] + "$")
+                self.parts.append(None)
+            else:
+                self.parts.append(source[pos:m.start()])
+                self.parts.append(name)
+            pos = m.end()
+        self.parts.append(source[pos:])
+
+    def render(self, **values) -> str:
+        out = []
+        for i, part in enumerate(self.parts):
+            if i % 2 == 0:
+                out.append(part)
+            elif part is not None:
+                out.append(escape(str(values[part])))
+        return "".join(out)
+
+
+LOAN_CONFIRMATION_SUBJECT = " Loan Confirmation – FinSync"
+
+LOAN_CONFIRMATION_HTML = CompiledTemplate("""
+    <div style="font-family: Arial, sans-serif; line-height: 1.6;">
+        <h2>Loan Confirmation – FinSync</h2>
+
+        <p>Dear <strong>${name}</strong>,</p>
+
+        <p>
+            We are pleased to inform you that your loan request has been
+            <strong>successfully approved</strong>. Below are the details of your loan:
+        </p>
+
+        <table style="border-collapse: collapse;">
+            <tr>
+                <td><strong>Name</strong></td>
+                <td>: ${name}</td>
+            </tr>
+            <tr>
+                <td><strong>Age</strong></td>
+                <td>: ${age}</td>
+            </tr>
+            <tr>
+                <td><strong>Loan Amount</strong></td>
+                <td>: ₹${loan_amount}</td>
+            </tr>
+            <tr>
+                <td><strong>EMI</strong></td>
+                <td>: ₹${emi}</td>
+            </tr>
+            <tr>
+                <td><strong>Interest Rate</strong></td>
+                <td>: ${interest_rate}% per annum</td>
+            </tr>
+            <tr>
+                <td><strong>Tenure</strong></td>
+                <td>: ${tenure_months} months</td>
+            </tr>
+        </table>
+
+        <p>
+            Our team will contact you shortly for further formalities.
+            If you have any questions, feel free to reply to this email.
+        </p>
+
+        <p>
+            Warm regards,<br/>
+            <strong>FinSync Loan Services</strong>
+        </p>
+    </div>
+    """)
+
+
+def loan_confirmation_html(name: str, age: int, loan_amount: float, emi: float, interest_rate: float, tenure_months: int) -> str:
+    return LOAN_CONFIRMATION_HTML.render(
+        name=name,
+        age=age,
+        loan_amount=f"{loan_amount:,.2f}",
+        emi=f"{emi:,.2f}",
+        interest_rate=interest_rate,
+        tenure_months=tenure_months,
+    )
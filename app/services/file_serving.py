@@ -0,0 +1,146 @@
+# app/services/file_serving.py
+import hashlib
+import mimetypes
+import os
+from datetime import datetime, timezone
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import quote
+
+from fastapi import Request
+from fastapi.responses import FileResponse, Response
+
+from app.core.config import settings
+
+# shown in the browser / document viewer; anything else is downloaded
+INLINE_TYPES = {"application/pdf", "image/png", "image/jpeg", "image/gif", "image/webp", "text/plain"}
+
+
+def guess_media_type(filename: str) -> str:
+    # from the extension only: the client-declared type of an upload is not trusted for serving
+    return mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+
+def http_date(dt: datetime) -> str:
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)  # naive timestamps in this app are UTC
+    return formatdate(dt.timestamp(), usegmt=True)
+
+
+def _strip_weak(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def is_not_modified(request: Request, etag: Optional[str], last_modified: Optional[str]) -> bool:
+    """RFC 9110 evaluation: If-None-Match wins; If-Modified-Since only applies without it."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if not etag:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        return _strip_weak(etag) in {_strip_weak(t) for t in if_none_match.split(",")}
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _parse_single_range(header: str, size: int):
+    """(start, end) inclusive for a single "bytes=" range, None to ignore it, or "unsatisfiable"."""
+    units, _, spec = header.partition("=")
+    if units.strip().lower() != "bytes" or "," in spec:
+        return None  # multi-range from non-local storage: just send the whole thing
+    start_s, _, end_s = spec.strip().partition("-")
+    try:
+        if not start_s:
+            length = int(end_s)
+            if length <= 0:
+                return "unsatisfiable"
+            return max(size - length, 0), size - 1
+        start = int(start_s)
+        end = min(int(end_s), size - 1) if end_s else size - 1
+    except ValueError:
+        return None
+    if start >= size or start > end:
+        return "unsatisfiable"
+    return start, end
+
+
+def _cache_control() -> str:
+    max_age = settings.UPLOAD_CACHE_MAX_AGE_SECONDS
+    # private: these are customer documents; with max-age 0 every view revalidates (cheap 304)
+    return f"private, max-age={max_age}" if max_age > 0 else "private, no-cache"
+
+
+def file_response(
+    request: Request,
+    filename: str,
+    path: Optional[str] = None,
+    data: Optional[bytes] = None,
+    etag: Optional[str] = None,
+    last_modified: Optional[datetime] = None,
+    media_type: Optional[str] = None,
+) -> Response:
+    """
+    Serve a stored file with validators, conditional GET and byte ranges.
+
+    With a local `path` the body goes through FileResponse (ranges, If-Range,
+    and pathsend where the server supports it); otherwise `data` is sliced
+    in memory. `etag` is a bare token, quoted here; without one it's derived
+    from the file's stat or the bytes.
+    """
+    media_type = media_type or guess_media_type(filename)
+    disposition = "inline" if media_type in INLINE_TYPES else "attachment"
+
+    stat = os.stat(path) if path else None
+    if etag is None:
+        etag = (
+            hashlib.md5(f"{stat.st_mtime_ns}-{stat.st_size}".encode(), usedforsecurity=False).hexdigest()
+            if stat else hashlib.sha256(data).hexdigest()
+        )
+    headers: Dict[str, str] = {
+        "etag": f'"{etag}"',
+        "cache-control": _cache_control(),
+        "x-content-type-options": "nosniff",
+    }
+    if last_modified is not None:
+        headers["last-modified"] = http_date(last_modified)
+    elif stat is not None:
+        headers["last-modified"] = formatdate(stat.st_mtime, usegmt=True)
+
+    if is_not_modified(request, headers["etag"], headers.get("last-modified")):
+        return Response(status_code=304, headers=headers)
+
+    if path:
+        return FileResponse(
+            path,
+            media_type=media_type,
+            filename=filename,
+            stat_result=stat,
+            content_disposition_type=disposition,
+            headers=headers,
+        )
+
+    quoted = quote(filename)
+    headers["content-disposition"] = (
+        f'{disposition}; filename="{filename}"' if quoted == filename
+        else f"{disposition}; filename*=utf-8''{quoted}"
+    )
+    headers["accept-ranges"] = "bytes"
+    size = len(data)
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or if_range in (headers["etag"], headers.get("last-modified"))):
+        rng = _parse_single_range(range_header, size)
+        if rng == "unsatisfiable":
+            return Response(status_code=416, headers={**headers, "content-range": f"bytes */{size}"})
+        if rng is not None:
+            start, end = rng
+            headers["content-range"] = f"bytes {start}-{end}/{size}"
+            return Response(content=data[start:end + 1], status_code=206, media_type=media_type, headers=headers)
+    return Response(content=data, media_type=media_type, headers=headers)
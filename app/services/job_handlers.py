@@ -0,0 +1,92 @@
+# app/services/job_handlers.py
+import logging
+import os
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from sqlmodel import Session
+
+from app.models.domain_models import Job
+from app.services.job_queue import enqueue_job, job_handler
+from app.services.pdf_mailer import augment_pdf_bytes, send_email_smtp, smtp_config_from_env
+from app.services.pdf_service import render_sanction_pdf
+from app.services.storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+
+@job_handler("render_pdf")
+def render_pdf_job(db: Session, payload: Dict[str, Any]):
+    data = render_sanction_pdf(
+        payload["customer_name"],
+        payload["offer"],
+        payload.get("agent_log") or {},
+        payload["reference_id"],
+    )
+    stamped = False
+    if payload.get("metadata"):
+        # best effort, as it always was: an unstamped letter still goes out
+        try:
+            data = augment_pdf_bytes(data, payload["metadata"])
+            stamped = True
+        except Exception as e:
+            logger.warning("sanction letter %s sent without metadata: %s", payload["reference_id"], e)
+    get_storage().put(payload["key"], data, content_type="application/pdf")
+    return {"key": payload["key"], "size": len(data), "stamped": stamped}
+
+
+@job_handler("send_email")
+def send_email_job(db: Session, payload: Dict[str, Any]):
+    storage = get_storage()
+    attachments = [
+        (os.path.basename(key), storage.get(key))
+        for key in payload.get("attachment_keys") or []
+        if storage.exists(key)
+    ]
+    send_email_smtp(
+        smtp_config=smtp_config_from_env(),
+        to_email=payload["to_email"],
+        subject=payload["subject"],
+        body=payload["body"],
+        attachments=attachments,
+    )
+    return {"sent_to": payload["to_email"]}
+
+
+def enqueue_sanction_letter(
+    db: Session,
+    session_id: UUID,
+    pdf_key: str,
+    customer_name: str,
+    offer: Dict[str, Any],
+    agent_log: Dict[str, Any],
+    reference_id: str,
+    email: Optional[Dict[str, str]] = None,
+) -> Job:
+    """
+    Queue render -> (optional) send for a sanction letter and return the first
+    job of the chain. Rendering stamps the metadata in memory and stores the
+    letter once under `pdf_key`; the mail step attaches it from storage.
+    """
+    then = []
+    if email:
+        then.append({"kind": "send_email", "payload": {
+            "to_email": email["to_email"],
+            "subject": email["subject"],
+            "body": email["body"],
+            "attachment_keys": [pdf_key],
+        }})
+    return enqueue_job(
+        db,
+        "render_pdf",
+        {
+            "key": pdf_key,
+            "customer_name": customer_name,
+            "offer": offer,
+            "agent_log": agent_log,
+            "reference_id": reference_id,
+            "metadata": {"ref": reference_id, "customer": customer_name},
+        },
+        session_id=session_id,
+        then=then,
+    )
@@ -0,0 +1,270 @@
+# app/services/job_queue.py
+import logging
+import os
+import random
+import socket
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import and_, or_, update
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.core.db import engine
+from app.models.domain_models import Job, JobStatus
+from app.services.workers import BackgroundLoop, register_loop
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[Session, Dict[str, Any]], Optional[Dict[str, Any]]]
+
+JOB_HANDLERS: Dict[str, JobHandler] = {}
+
+
+def job_handler(kind: str):
+    """Register a function as the handler for jobs of `kind`."""
+    def decorator(fn: JobHandler) -> JobHandler:
+        JOB_HANDLERS[kind] = fn
+        return fn
+    return decorator
+
+
+def enqueue_job(
+    db: Session,
+    kind: str,
+    payload: Dict[str, Any],
+    session_id: Optional[UUID] = None,
+    then: Optional[List[Dict[str, Any]]] = None,
+    parent_id: Optional[UUID] = None,
+    commit: bool = True,
+) -> Job:
+    """
+    Persist a job for the workers to pick up.
+
+    `then` is an ordered list of follow-up jobs ({"kind", "payload"}) that are
+    enqueued one after another as each step succeeds.
+    """
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"unknown job kind: {kind}")
+    body = dict(payload)
+    if then:
+        body["then"] = then
+    job = Job(
+        kind=kind,
+        payload=body,
+        session_id=session_id,
+        parent_id=parent_id,
+        max_attempts=settings.JOB_MAX_ATTEMPTS,
+    )
+    db.add(job)
+    if commit:
+        db.commit(); db.refresh(job)
+    return job
+
+
+def _claimable(now: datetime):
+    return or_(
+        and_(Job.status == JobStatus.PENDING, Job.run_after <= now),
+        # a RUNNING job whose lease lapsed belongs to a dead worker
+        and_(Job.status == JobStatus.RUNNING, Job.lease_expires_at < now, Job.attempts < Job.max_attempts),
+    )
+
+
+def _leased_by(job_id: UUID, worker_id: str):
+    return and_(Job.id == job_id, Job.status == JobStatus.RUNNING, Job.lease_owner == worker_id)
+
+
+def claim_next_job(db: Session, worker_id: str, now: Optional[datetime] = None) -> Optional[Job]:
+    """
+    Atomically lease the next due job. The conditional UPDATE makes the claim
+    safe across threads and processes without row locks.
+
+    A lapsed lease on a job that already used its last attempt is not handed
+    out again: the job is marked FAILED instead.
+    """
+    now = now or datetime.utcnow()
+    db.execute(
+        update(Job)
+        .where(Job.status == JobStatus.RUNNING, Job.lease_expires_at < now, Job.attempts >= Job.max_attempts)
+        .values(
+            status=JobStatus.FAILED,
+            last_error="lease expired on the last attempt",
+            lease_owner=None,
+            lease_expires_at=None,
+            finished_at=now,
+        )
+    )
+    db.commit()
+    candidates = db.exec(
+        select(Job.id).where(_claimable(now)).order_by(Job.run_after).limit(10)
+    ).all()
+    for job_id in candidates:
+        res = db.execute(
+            update(Job)
+            .where(Job.id == job_id, _claimable(now))
+            .values(
+                status=JobStatus.RUNNING,
+                lease_owner=worker_id,
+                lease_expires_at=now + timedelta(seconds=settings.JOB_LEASE_SECONDS),
+                attempts=Job.attempts + 1,
+            )
+        )
+        db.commit()
+        if res.rowcount == 1:
+            job = db.get(Job, job_id)
+            db.refresh(job)
+            return job
+    return None
+
+
+def renew_lease(db: Session, job_id: UUID, worker_id: str, now: Optional[datetime] = None) -> bool:
+    """Push the lease out by JOB_LEASE_SECONDS. False once `worker_id` no longer holds it."""
+    now = now or datetime.utcnow()
+    res = db.execute(
+        update(Job)
+        .where(_leased_by(job_id, worker_id))
+        .values(lease_expires_at=now + timedelta(seconds=settings.JOB_LEASE_SECONDS))
+    )
+    db.commit()
+    return res.rowcount == 1
+
+
+@contextmanager
+def _lease_heartbeat(db: Session, job_id: UUID, worker_id: str):
+    # renews from its own session so a handler longer than the lease isn't reclaimed mid-run
+    stop = threading.Event()
+
+    def beat():
+        with Session(db.get_bind()) as hb:
+            while not stop.wait(settings.JOB_LEASE_SECONDS / 3):
+                try:
+                    if not renew_lease(hb, job_id, worker_id):
+                        return
+                except Exception as e:
+                    hb.rollback()
+                    logger.warning("job %s: lease renewal failed: %s", job_id, e)
+
+    thread = threading.Thread(target=beat, name=f"job-lease-{job_id}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def backoff_delay(attempts: int) -> float:
+    base = settings.JOB_BACKOFF_BASE_SECONDS
+    delay = min(base * (2 ** max(attempts - 1, 0)), settings.JOB_BACKOFF_MAX_SECONDS)
+    return delay + random.uniform(0, base)
+
+
+def _finish(db: Session, job: Job, worker_id: str, **values) -> bool:
+    # only the lease holder records an outcome; a worker whose lease lapsed and
+    # was reclaimed drops its result (and any follow-up it staged) instead
+    res = db.execute(
+        update(Job)
+        .where(_leased_by(job.id, worker_id))
+        .values(lease_owner=None, lease_expires_at=None, **values)
+    )
+    if res.rowcount != 1:
+        db.rollback()
+        logger.warning("job %s (%s) attempt %s lost its lease; outcome discarded", job.id, job.kind, job.attempts)
+        db.refresh(job)
+        return False
+    db.commit()
+    db.refresh(job)
+    return True
+
+
+def run_job(db: Session, job: Job) -> Job:
+    """Execute a leased job and record the outcome (success, retry or failure)."""
+    handler = JOB_HANDLERS.get(job.kind)
+    worker_id = job.lease_owner
+    payload = dict(job.payload or {})
+    then = payload.pop("then", None) or []
+    try:
+        if handler is None:
+            raise ValueError(f"no handler registered for job kind {job.kind}")
+        with _lease_heartbeat(db, job.id, worker_id):
+            result = handler(db, payload) or {}
+    except Exception as e:
+        db.rollback()
+        logger.warning("job %s (%s) attempt %s failed: %s", job.id, job.kind, job.attempts, e)
+        if job.attempts >= job.max_attempts:
+            _finish(db, job, worker_id, status=JobStatus.FAILED, last_error=str(e), finished_at=datetime.utcnow())
+        else:
+            _finish(
+                db, job, worker_id,
+                status=JobStatus.PENDING,
+                last_error=str(e),
+                run_after=datetime.utcnow() + timedelta(seconds=backoff_delay(job.attempts)),
+            )
+        return job
+
+    if then:
+        step = then[0]
+        follow_up = enqueue_job(
+            db,
+            step["kind"],
+            step.get("payload", {}),
+            session_id=job.session_id,
+            then=then[1:],
+            parent_id=job.id,
+            commit=False,
+        )
+        result["next_job_id"] = str(follow_up.id)
+
+    _finish(
+        db, job, worker_id,
+        status=JobStatus.SUCCEEDED,
+        result=result,
+        last_error=None,
+        finished_at=datetime.utcnow(),
+    )
+    return job
+
+
+def run_pending_jobs(worker_id: str = "inline", limit: Optional[int] = None) -> int:
+    """Drain due jobs on the calling thread (scripts and tests)."""
+    done = 0
+    with Session(engine) as db:
+        while limit is None or done < limit:
+            job = claim_next_job(db, worker_id)
+            if not job:
+                break
+            run_job(db, job)
+            done += 1
+    return done
+
+
+def job_chain(db: Session, job: Job) -> List[Job]:
+    """Return `job` followed by every follow-up job it spawned so far."""
+    chain = [job]
+    while chain[-1].result and chain[-1].result.get("next_job_id"):
+        nxt = db.get(Job, UUID(chain[-1].result["next_job_id"]))
+        if not nxt:
+            break
+        chain.append(nxt)
+    return chain
+
+
+def _worker_tick(worker_id: str) -> Callable[[], bool]:
+    def tick() -> bool:
+        return run_pending_jobs(worker_id, limit=1) > 0
+    return tick
+
+
+def register_job_workers(count: Optional[int] = None) -> List[BackgroundLoop]:
+    count = settings.JOB_WORKERS if count is None else count
+    loops = []
+    for i in range(count):
+        worker_id = f"{socket.gethostname()}:{os.getpid()}:{i}"
+        loop = register_loop(
+            BackgroundLoop(f"job-worker-{i}", _worker_tick(worker_id), settings.JOB_POLL_INTERVAL_SECONDS)
+        )
+        loops.append(loop)
+    return loops
@@ -1,26 +1,80 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
 from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError, ExpiredSignatureError
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.models.domain_models import User
 from app.core.config import settings
-from app.core.db import get_session
+from app.core.db import engine, get_async_engine
 
 ALGO = "HS256"
 
+# claims carried by tokens issued with AUTH_PROFILE_CLAIMS on
+PROFILE_CLAIM = "usr"
+PROFILE_FIELDS = ("id", "name", "email", "phone")
+
 # This enables the Swagger "Authorize" button
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 
-def create_access_token(data: dict):
+class TTLCache:
+    """Bounded LRU with a per-entry deadline; safe to share between threads."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            deadline, value = entry
+            if deadline <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl: float):
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_token_cache = TTLCache(settings.AUTH_TOKEN_CACHE_SIZE)
+_user_cache = TTLCache(settings.AUTH_USER_CACHE_SIZE)
+
+
+def create_access_token(data: dict, user: Optional[User] = None):
     """
     data MUST contain:
     {
         "sub": customer_id (str)
     }
+    With AUTH_PROFILE_CLAIMS on and a `user`, the profile fields the routes
+    read go into the token too.
     """
     if not settings.SECRET_KEY:
         raise RuntimeError("SECRET_KEY is not set")
@@ -30,20 +84,23 @@ def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=expire_minutes)
     to_encode.update({"exp": expire})
+    if settings.AUTH_PROFILE_CLAIMS and user is not None:
+        to_encode[PROFILE_CLAIM] = {f: (str(getattr(user, f)) if f == "id" else getattr(user, f)) for f in PROFILE_FIELDS}
 
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGO)
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_session),
-):
+def _decode(token: str) -> Dict[str, Any]:
     if not settings.SECRET_KEY:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Server misconfiguration",
         )
 
+    claims = _token_cache.get(token)
+    if claims is not None:
+        return claims
+
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGO])
 
@@ -67,14 +124,71 @@ def get_current_user(
             detail="Invalid authentication token",
         )
 
-    user = db.exec(
-        select(User).where(User.customer_id == customer_id)
-    ).first()
+    # only verified tokens are cached, and never past their exp
+    ttl = settings.AUTH_TOKEN_CACHE_TTL_SECONDS
+    if "exp" in payload:
+        ttl = min(ttl, payload["exp"] - time.time())
+    _token_cache.set(token, payload, ttl)
+    return payload
+
+
+def _customer_id_from_token(token: str) -> str:
+    return _decode(token)["sub"]
 
+
+def _user_or_404(user):
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found",
         )
+    return user
+
+
+def _from_claims(claims: Dict[str, Any]) -> Optional[User]:
+    profile = claims.get(PROFILE_CLAIM)
+    if not profile:
+        return None
+    return User(customer_id=claims["sub"], **{**profile, "id": uuid.UUID(profile["id"])})
+
+
+def _cached_user(customer_id: str) -> Optional[User]:
+    # a fresh detached object per request: routes may modify what they get
+    snapshot = _user_cache.get(customer_id)
+    return User(**snapshot) if snapshot is not None else None
+
 
+def _remember(user: Optional[User]) -> Optional[User]:
+    if user is not None:
+        # credentials stay in the database; login reads the hash from there
+        _user_cache.set(user.customer_id, user.model_dump(exclude={"password_hash"}), settings.AUTH_USER_CACHE_TTL_SECONDS)
     return user
+
+
+def invalidate_user(customer_id: str):
+    """Call after changing a User so this process stops serving the old snapshot."""
+    _user_cache.pop(customer_id)
+
+
+def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
+    """
+    The caller's User: from the token's profile claims, else a short-lived
+    snapshot, else the database. The returned object is detached; routes that
+    change the user load it into their own session.
+    """
+    claims = _decode(token)
+    user = _from_claims(claims) or _cached_user(claims["sub"])
+    if user is None:
+        with Session(engine) as db:
+            user = _remember(db.exec(select(User).where(User.customer_id == claims["sub"])).first())
+    return _user_or_404(user)
+
+
+async def get_current_user_async(token: str = Depends(oauth2_scheme)) -> User:
+    """get_current_user for async routes; a cache miss doesn't hold a threadpool worker."""
+    claims = _decode(token)
+    user = _from_claims(claims) or _cached_user(claims["sub"])
+    if user is None:
+        async with AsyncSession(get_async_engine(), expire_on_commit=False) as db:
+            user = _remember((await db.exec(select(User).where(User.customer_id == claims["sub"]))).first())
+    return _user_or_404(user)
@@ -0,0 +1,170 @@
+# app/services/letter_regen.py
+import multiprocessing
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+from uuid import UUID
+
+from sqlalchemy import and_, func, or_, update
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.core.db import engine
+from app.models.domain_models import AgentLog, LetterRegenRun, Offer, OfferStatus, UserProfile
+from app.services.agent_logs import agent_log_data
+from app.services.pdf_service import offer_letter_fields, render_sanction_pdf
+from app.services.storage import get_storage, session_key
+
+
+def _render_letter(task: Dict[str, Any]) -> Dict[str, Any]:
+    """Runs in a pool process: render + stamp one letter. Must stay top-level (picklable)."""
+    try:
+        data = render_sanction_pdf(
+            task["customer_name"], task["offer"], task["agent_log"], task["reference_id"],
+            metadata={"ref": task["reference_id"], "customer": task["customer_name"]},
+        )
+        get_storage().put(task["key"], data, content_type="application/pdf")
+        return {"offer_id": task["offer_id"], "key": task["key"]}
+    except Exception as e:
+        return {"offer_id": task["offer_id"], "error": str(e)}
+
+
+def _approved_offers():
+    return select(Offer).where(Offer.status == OfferStatus.APPROVED)
+
+
+def _next_chunk(db: Session, run: LetterRegenRun, size: int) -> List[Offer]:
+    stmt = _approved_offers()
+    if run.cursor_created_at is not None:
+        stmt = stmt.where(or_(
+            Offer.created_at > run.cursor_created_at,
+            and_(Offer.created_at == run.cursor_created_at, Offer.id > run.cursor_offer_id),
+        ))
+    return db.exec(stmt.order_by(Offer.created_at, Offer.id).limit(size)).all()
+
+
+def _build_tasks(db: Session, run: LetterRegenRun, offers: List[Offer]) -> List[Dict[str, Any]]:
+    session_ids = {o.session_id for o in offers}
+    names = {
+        p.session_id: p.name
+        for p in db.exec(select(UserProfile).where(UserProfile.session_id.in_(session_ids))).all()
+    }
+    # latest agent log per session, same as the on-demand /sanction-letter route;
+    # only those rows are loaded, not every log the sessions ever wrote
+    latest = (
+        select(AgentLog.session_id, func.max(AgentLog.created_at).label("created_at"))
+        .where(AgentLog.session_id.in_(session_ids))
+        .group_by(AgentLog.session_id)
+        .subquery()
+    )
+    logs: Dict[UUID, Dict[str, Any]] = {
+        al.session_id: agent_log_data(al)
+        for al in db.exec(
+            select(AgentLog).join(latest, and_(
+                AgentLog.session_id == latest.c.session_id,
+                AgentLog.created_at == latest.c.created_at,
+            ))
+        ).all()
+    }
+
+    tasks = []
+    for offer in offers:
+        # deterministic per (run, offer) so a resumed chunk overwrites instead of duplicating
+        reference_id = uuid.uuid5(run.id, str(offer.id)).hex[:8]
+        tasks.append({
+            "offer_id": str(offer.id),
+            "key": session_key(offer.session_id, f"sanction_{reference_id}.pdf"),
+            "customer_name": names.get(offer.session_id, "Customer"),
+            "offer": {**offer_letter_fields(offer), "status": str(offer.status.value)},
+            "agent_log": logs.get(offer.session_id, {}),
+            "reference_id": reference_id,
+        })
+    return tasks
+
+
+def start_run(db: Session) -> LetterRegenRun:
+    total = db.exec(select(func.count()).select_from(Offer).where(Offer.status == OfferStatus.APPROVED)).one()
+    run = LetterRegenRun(total=total)
+    db.add(run); db.commit(); db.refresh(run)
+    return run
+
+
+def run_progress(run: LetterRegenRun, rate: Optional[float] = None) -> Dict[str, Any]:
+    return {
+        "run_id": str(run.id),
+        "status": run.status,
+        "total": run.total,
+        "processed": run.processed,
+        "failed": run.failed,
+        "letters_per_second": rate,
+    }
+
+
+def regenerate_letters(
+    run_id: Optional[UUID] = None,
+    chunk_size: Optional[int] = None,
+    workers: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Reissue sanction letters for every approved offer, rendering each chunk
+    across a process pool. Yields a progress dict after every chunk; pass the
+    `run_id` of an interrupted run to resume from its checkpoint.
+    """
+    chunk_size = chunk_size or settings.LETTER_REGEN_CHUNK_SIZE
+    workers = workers or settings.LETTER_REGEN_WORKERS or os.cpu_count() or 1
+
+    with Session(engine) as db:
+        if run_id:
+            run = db.get(LetterRegenRun, run_id)
+            if not run:
+                raise ValueError(f"unknown regeneration run {run_id}")
+            if run.status == "completed":
+                yield run_progress(run)
+                return
+            run.status = "running"
+            db.add(run); db.commit(); db.refresh(run)
+        else:
+            run = start_run(db)
+
+        started = time.monotonic()
+        done_here = 0
+        try:
+            # spawn, not fork: this also runs inside the threaded API server, and a
+            # forked child would inherit its locks and open connections mid-use
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                while True:
+                    offers = _next_chunk(db, run, chunk_size)
+                    if not offers:
+                        break
+                    tasks = _build_tasks(db, run, offers)
+                    results = list(pool.map(_render_letter, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+
+                    letters = [{"id": UUID(r["offer_id"]), "sanction_letter_key": r["key"]} for r in results if "key" in r]
+                    if letters:
+                        db.execute(update(Offer), letters)
+                    failed = len(results) - len(letters)
+                    run.processed += len(results) - failed
+                    run.failed += failed
+                    run.cursor_created_at = offers[-1].created_at
+                    run.cursor_offer_id = offers[-1].id
+                    run.updated_at = datetime.utcnow()
+                    db.add(run); db.commit(); db.refresh(run)
+
+                    done_here += len(results)
+                    elapsed = time.monotonic() - started
+                    yield run_progress(run, round(done_here / elapsed, 2) if elapsed else None)
+
+            run.status = "completed"
+            run.finished_at = datetime.utcnow()
+        finally:
+            if run.status != "completed":
+                # client went away or a chunk blew up; the checkpoint stays for --resume
+                run.status = "interrupted"
+            run.updated_at = datetime.utcnow()
+            db.add(run); db.commit(); db.refresh(run)
+
+        elapsed = time.monotonic() - started
+        yield run_progress(run, round(done_here / elapsed, 2) if elapsed else None)
@@ -0,0 +1,125 @@
+# app/services/message_feed.py
+"""
+Incremental message history for chat UIs.
+
+Pages are keyset ranges on (created_at, id) within a session, so a poll
+with `after` reads and sends only what is new. Long-polls park on an
+in-process notifier that commits of new messages wake up, and re-check the
+database every MESSAGES_LONG_POLL_RECHECK_SECONDS for messages written by
+other workers.
+"""
+import asyncio
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import event
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.models.domain_models import Message
+from app.services.pagination import Position, after as past, encode_cursor
+
+
+class MessageNotifier:
+    """Wakes long-polls waiting on a session; safe to notify from any thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waiters: Dict[UUID, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Event]]] = defaultdict(set)
+
+    def notify(self, session_id: UUID):
+        with self._lock:
+            waiters = list(self._waiters.get(session_id, ()))
+        for loop, ev in waiters:
+            loop.call_soon_threadsafe(ev.set)
+
+    async def wait(self, session_id: UUID, timeout: float) -> bool:
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            self._waiters[session_id].add(waiter)
+        try:
+            await asyncio.wait_for(waiter[1].wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._lock:
+                self._waiters[session_id].discard(waiter)
+                if not self._waiters[session_id]:
+                    del self._waiters[session_id]
+
+
+notifier = MessageNotifier()
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_new_messages(session, flush_context):
+    ids = {obj.session_id for obj in session.new if isinstance(obj, Message)}
+    if ids:
+        session.info.setdefault("new_message_sessions", set()).update(ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_new_messages(session):
+    for session_id in session.info.pop("new_message_sessions", ()):
+        notifier.notify(session_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_new_messages(session):
+    session.info.pop("new_message_sessions", None)
+
+
+def _cursor(m: Message) -> str:
+    return encode_cursor(m.created_at, m.id)
+
+
+async def message_page(
+    db: AsyncSession,
+    session_id: UUID,
+    limit: int,
+    after: Optional[Position] = None,
+    before: Optional[Position] = None,
+) -> Dict[str, Any]:
+    """
+    Up to `limit` messages in chronological order: the ones right after `after`,
+    the ones right before `before`, or the latest ones when neither is given.
+    """
+    stmt = select(Message).where(Message.session_id == session_id)
+    if after is not None:
+        stmt = stmt.where(past(Message.created_at, Message.id, after)).order_by(Message.created_at, Message.id)
+    else:
+        if before is not None:
+            stmt = stmt.where(past(Message.created_at, Message.id, before, descending=True))
+        stmt = stmt.order_by(Message.created_at.desc(), Message.id.desc())
+    rows: List[Message] = list((await db.exec(stmt.limit(limit + 1))).all())
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if after is None:
+        rows.reverse()
+    return {
+        "messages": rows,
+        "has_more": has_more,
+        # poll with this as `after` for what comes next; scroll back with `prev_cursor` as `before`
+        "next_cursor": _cursor(rows[-1]) if rows else (encode_cursor(*after) if after else None),
+        "prev_cursor": _cursor(rows[0]) if rows else (encode_cursor(*before) if before else None),
+    }
+
+
+async def wait_for_messages(
+    db: AsyncSession, session_id: UUID, limit: int, after: Optional[Position], wait: float
+) -> Dict[str, Any]:
+    """Long-poll: return as soon as there is something after `after`, or empty after `wait` seconds."""
+    deadline = time.monotonic() + wait
+    while True:
+        page = await message_page(db, session_id, limit, after=after)
+        remaining = deadline - time.monotonic()
+        if page["messages"] or remaining <= 0:
+            return page
+        # give the connection back while parked; the next query also starts a fresh snapshot
+        await db.close()
+        await notifier.wait(session_id, min(remaining, settings.MESSAGES_LONG_POLL_RECHECK_SECONDS))
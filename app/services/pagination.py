@@ -0,0 +1,48 @@
+# app/services/pagination.py
+"""
+Keyset pagination on (created_at, id).
+
+A cursor is the position of the last row of a page, encoded as an opaque
+URL-safe token. The next page is "rows strictly after that position", which
+an index on (created_at, id) answers without OFFSET, so every page costs the
+same no matter how deep the client has paged.
+"""
+import base64
+import uuid
+from datetime import datetime
+from typing import Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+
+from app.core.config import settings
+
+Position = Tuple[datetime, uuid.UUID]
+
+
+def encode_cursor(created_at: datetime, row_id: uuid.UUID) -> str:
+    raw = f"{created_at.isoformat()}|{row_id.hex}".encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> Position:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, _, row_id = raw.partition("|")
+        return datetime.fromisoformat(created_at), uuid.UUID(hex=row_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="invalid cursor")
+
+
+def page_size(limit: Optional[int]) -> int:
+    if limit is None:
+        return settings.PAGE_SIZE_DEFAULT
+    return max(1, min(limit, settings.PAGE_SIZE_MAX))
+
+
+def after(created_col, id_col, position: Position, descending: bool = False):
+    """Rows strictly past `position` in (created_at, id) order (or its reverse)."""
+    created_at, row_id = position
+    if descending:
+        return or_(created_col < created_at, and_(created_col == created_at, id_col < row_id))
+    return or_(created_col > created_at, and_(created_col == created_at, id_col > row_id))
@@ -1,7 +1,94 @@
+# app/services/password_service.py
+"""
+bcrypt hashing and verification on a dedicated process pool.
+
+A bcrypt call is pure CPU for a few hundred milliseconds; run on the request
+threadpool it holds the GIL and a worker while every other sync route waits.
+Here it runs in PASSWORD_HASH_WORKERS child processes instead, and at most
+PASSWORD_HASH_MAX_PENDING calls may be running or queued at once: past that
+the request is refused straight away with a 503 rather than left to time out
+behind a login burst.
+
+The cost factor is BCRYPT_ROUNDS. Hashes made at another cost still verify;
+login re-hashes them at the configured cost (see needs_rehash).
+"""
+import threading
+from concurrent.futures import CancelledError, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
 from passlib.hash import bcrypt
 
+from app.core.config import settings
+
+
+def _hash(p: str, rounds: int) -> str:
+    return bcrypt.using(rounds=rounds).hash(p)
+
+
+def _verify(p: str, hash: str) -> bool:
+    return bcrypt.verify(p, hash)
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_pending: Optional[threading.BoundedSemaphore] = None
+
+
+def _get_pool() -> Tuple[ProcessPoolExecutor, threading.BoundedSemaphore]:
+    global _pool, _pending
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS)
+            _pending = threading.BoundedSemaphore(settings.PASSWORD_HASH_MAX_PENDING)
+        return _pool, _pending
+
+
+def shutdown_password_pool():
+    global _pool, _pending
+    with _pool_lock:
+        pool, _pool, _pending = _pool, None, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many sign-ins in progress, try again shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
+def _run(fn, *args):
+    pool, pending = _get_pool()
+    if not pending.acquire(blocking=False):
+        raise _busy()
+    try:
+        future = pool.submit(fn, *args)
+    except RuntimeError:
+        # the pool was shut down between _get_pool() and submit
+        pending.release()
+        raise _busy()
+    except BaseException:
+        pending.release()
+        raise
+    # released when the work finishes, not when this caller stops waiting
+    future.add_done_callback(lambda _: pending.release())
+    try:
+        return future.result(timeout=settings.PASSWORD_HASH_TIMEOUT_SECONDS)
+    except (FutureTimeoutError, CancelledError):
+        raise _busy()
+
+
 def hash_password(p: str) -> str:
-    return bcrypt.hash(p)
+    return _run(_hash, p, settings.BCRYPT_ROUNDS)
+
 
 def verify_password(p: str, hash: str) -> bool:
-    return bcrypt.verify(p, hash)
+    return _run(_verify, p, hash)
+
+
+def needs_rehash(hash: str) -> bool:
+    """True when `hash` was made at a cost other than BCRYPT_ROUNDS (cheap: parses the hash only)."""
+    return bcrypt.using(rounds=settings.BCRYPT_ROUNDS).needs_update(hash)
@@ -1,34 +1,46 @@
 # app/services/pdf_mailer.py
 # app/services/pdf_mailer.py
 from pypdf import PdfReader, PdfWriter
-import smtplib, ssl
 from email.message import EmailMessage
-from typing import Dict, List, Optional
+from io import BytesIO
+from typing import Dict, List, Optional, Tuple, Union
 import os
 
-def augment_pdf_with_pypdf(pdf_path: str, metadata: Dict[str,str]):
-    reader = PdfReader(pdf_path)
+from app.services.smtp_pool import get_smtp_pool
+
+# an attachment is either a path on disk or an in-memory (filename, bytes) pair
+Attachment = Union[str, Tuple[str, bytes]]
+
+def smtp_config_from_env() -> Dict:
+    return {
+        "host": os.getenv("SMTP_HOST"),
+        "port": int(os.getenv("SMTP_PORT") or 587),
+        "user": os.getenv("SMTP_USER"),
+        "password": os.getenv("SMTP_PASS"),
+        "sender": os.getenv("SENDER_EMAIL")
+    }
+
+def augment_pdf_bytes(data: bytes, metadata: Dict[str,str]) -> bytes:
+    reader = PdfReader(BytesIO(data))
     writer = PdfWriter()
     for p in reader.pages:
         writer.add_page(p)
     writer.add_metadata({f"/{k}": str(v) for k,v in metadata.items()})
-    out_path = pdf_path.replace(".pdf", "_meta.pdf")
-    with open(out_path, "wb") as f:
-        writer.write(f)
-    os.replace(out_path, pdf_path)
-    return pdf_path
+    out = BytesIO()
+    writer.write(out)
+    return out.getvalue()
 
-def send_email_smtp(
+def build_email_message(
     smtp_config: Dict,
     to_email: str,
     subject: str,
     body: str,
-    attachments: Optional[List[str]] = None,
+    attachments: Optional[List[Attachment]] = None,
     reply_to: Optional[str] = None,
     from_display_name: Optional[str] = None
-):
+) -> EmailMessage:
     """
-    Sends email using configured SMTP server.
+    Builds the message send_email_smtp sends.
 
     - smtp_config: {host, port, user, password, sender}
       'sender' should be the authenticated address (SENDER_EMAIL) used in SMTP login.
@@ -53,17 +65,36 @@ def send_email_smtp(
 
     msg.set_content(body)
 
-    # Attach files
-    for path in attachments or []:
-        with open(path, "rb") as f:
-            data = f.read()
+    # Attach files (paths are read from disk, (filename, bytes) pairs are used as-is)
+    for item in attachments or []:
+        if isinstance(item, tuple):
+            filename, data = item
+        else:
+            with open(item, "rb") as f:
+                data = f.read()
+            filename = os.path.basename(item)
         # set mime as application/pdf for PDF attachments
         maintype, subtype = ("application", "pdf")
-        filename = os.path.basename(path)
         msg.add_attachment(data, maintype=maintype, subtype=subtype, filename=filename)
 
-    context = ssl.create_default_context()
-    with smtplib.SMTP(smtp_config["host"], smtp_config["port"]) as server:
-        server.starttls(context=context)
-        server.login(smtp_config["user"], smtp_config["password"])
-        server.send_message(msg)
+    return msg
+
+def send_email_smtp(
+    smtp_config: Dict,
+    to_email: str,
+    subject: str,
+    body: str,
+    attachments: Optional[List[Attachment]] = None,
+    reply_to: Optional[str] = None,
+    from_display_name: Optional[str] = None
+):
+    """
+    Sends email using configured SMTP server, over a pooled connection that
+    stays authenticated between messages (see smtp_pool).
+    """
+    msg = build_email_message(smtp_config, to_email, subject, body, attachments, reply_to, from_display_name)
+    get_smtp_pool(smtp_config).send(msg)
+
+def send_emails_smtp(smtp_config: Dict, messages: List[EmailMessage]):
+    """Send a batch over the pool, reusing each connection for several messages."""
+    return get_smtp_pool(smtp_config).send_many(messages)
@@ -1,13 +1,31 @@
 # app/services/pdf_service.py
 from reportlab.lib.pagesizes import A4
 from reportlab.pdfgen import canvas
-from pathlib import Path
 from datetime import datetime
+from io import BytesIO
+from typing import Dict, Optional
 
-def generate_sanction_pdf(output_path: str, customer_name: str, offer: dict, agent_log: dict, reference_id: str):
-    out = Path(output_path)
-    out.parent.mkdir(parents=True, exist_ok=True)
-    c = canvas.Canvas(str(out), pagesize=A4)
+from app.services.pdf_mailer import augment_pdf_bytes
+
+def offer_letter_fields(offer) -> dict:
+    """Offer attributes printed on the sanction letter."""
+    return {
+        "amount": offer.amount,
+        "tenure_months": offer.tenure_months,
+        "interest_rate": offer.interest_rate,
+        "monthly_emi": offer.monthly_emi,
+        "status": offer.status,
+        "reason_summary": offer.reason_summary
+    }
+
+def render_sanction_pdf(customer_name: str, offer: dict, agent_log: dict, reference_id: str, metadata: Optional[Dict[str, str]] = None) -> bytes:
+    """
+    Render the sanction letter into memory and return the PDF bytes. When
+    `metadata` is given the document info is stamped in the same pass, so no
+    temporary file is needed.
+    """
+    buf = BytesIO()
+    c = canvas.Canvas(buf, pagesize=A4)
     width, height = A4
 
     # Header
@@ -50,4 +68,7 @@ def generate_sanction_pdf(output_path: str, customer_name: str, offer: dict, age
 
     c.showPage()
     c.save()
-    return str(out)
+    data = buf.getvalue()
+    if metadata:
+        data = augment_pdf_bytes(data, metadata)
+    return data
@@ -0,0 +1,110 @@
+# app/services/salary_extraction.py
+import io
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.models.domain_models import SalaryExtraction, UploadedDocument
+from app.services.storage import get_storage
+
+# "Rs. 1,23,456.00", "INR 45000", "₹ 45,000" -- Indian and western digit grouping
+_AMOUNT = r"[:\-\s]*(?:rs\.?|inr|₹)?\s*([0-9]{1,3}(?:,[0-9]{2,3})+(?:\.[0-9]{1,2})?|[0-9]+(?:\.[0-9]{1,2})?)"
+
+NET_PATTERNS = [
+    re.compile(p + _AMOUNT, re.IGNORECASE)
+    for p in (
+        r"net\s+(?:salary|pay(?:able)?|take[\s-]*home|amount(?:\s+payable)?)(?:\s*\(.*?\))?",
+        r"take[\s-]*home(?:\s+(?:pay|salary))?",
+        r"amount\s+credited(?:\s+to\s+(?:bank|account))?",
+    )
+]
+GROSS_PATTERNS = [
+    re.compile(p + _AMOUNT, re.IGNORECASE)
+    for p in (
+        r"gross\s+(?:salary|pay|earnings|total)(?:\s*\(.*?\))?",
+        r"total\s+(?:earnings|gross)",
+    )
+]
+
+# below this a match is more likely a day count, a code or a year than a salary
+MIN_PLAUSIBLE_SALARY = 1000.0
+
+
+def _first_amount(patterns, text: str) -> Optional[float]:
+    for pattern in patterns:
+        for m in pattern.finditer(text):
+            value = float(m.group(1).replace(",", ""))
+            if value >= MIN_PLAUSIBLE_SALARY:
+                return value
+    return None
+
+
+def parse_salary_text(text: str) -> Dict[str, Optional[float]]:
+    """Pick net and gross monthly figures out of payslip text; net wins when both are present."""
+    text = " ".join(text.split())  # pypdf breaks lines mid-label
+    net = _first_amount(NET_PATTERNS, text)
+    gross = _first_amount(GROSS_PATTERNS, text)
+    return {"net_salary": net, "gross_salary": gross, "salary": net or gross}
+
+
+def extract_salary_figures(data: bytes, max_pages: int) -> Dict[str, Any]:
+    """Runs in a pool process: text of the first `max_pages` pages -> figures. Must stay top-level (picklable)."""
+    from pypdf import PdfReader
+
+    try:
+        reader = PdfReader(io.BytesIO(data))
+        pages = reader.pages[:max_pages]
+        text = "\n".join(page.extract_text() or "" for page in pages)
+    except Exception as e:  # not a PDF, encrypted, truncated upload...
+        return {"salary": None, "net_salary": None, "gross_salary": None, "pages": 0, "error": str(e)[:300]}
+    return {**parse_salary_text(text), "pages": len(pages), "error": None}
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    # parsing is CPU-bound; keep it off the API process's GIL
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=settings.SALARY_EXTRACTION_WORKERS)
+        return _pool
+
+
+def shutdown_extraction_pool():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def cached_extraction(db: Session, sha256: str) -> Optional[SalaryExtraction]:
+    return db.get(SalaryExtraction, sha256)
+
+
+def extract_document(db: Session, doc: UploadedDocument) -> SalaryExtraction:
+    """Return the cached figures for `doc`'s content, parsing it in the pool on a miss."""
+    cached = cached_extraction(db, doc.sha256)
+    if cached:
+        return cached
+
+    data = get_storage().get(doc.key)
+    future = _get_pool().submit(extract_salary_figures, data, settings.SALARY_EXTRACTION_MAX_PAGES)
+    figures = future.result(timeout=settings.SALARY_EXTRACTION_TIMEOUT_SECONDS)
+
+    row = SalaryExtraction(sha256=doc.sha256, **figures)
+    try:
+        db.add(row); db.commit(); db.refresh(row)
+    except IntegrityError:
+        # another worker parsed the same slip first; theirs is just as good
+        db.rollback()
+        row = cached_extraction(db, doc.sha256)
+    return row
@@ -1,9 +1,63 @@
-from sqlmodel import Session
-from uuid import uuid4
+from sqlalchemy import event, update
+from sqlmodel import Session, select
+from typing import Optional, Set, Tuple
+from uuid import UUID, uuid4
 from datetime import datetime
-from app.models.domain_models import SimulationSession, UserProfile, SessionStatus
+from app.models.domain_models import SimulationSession, UserProfile, Offer, SessionStatus
 from app.schemas.session_schemas import UserProfileCreate, SessionStartResponse
 
+
+@event.listens_for(Session, "after_flush")
+def _bump_session_version(session, flush_context):
+    # anything the session summary shows changed: the session row, its profile or its offers
+    ids: Set[UUID] = set()
+    for obj in session.dirty:
+        if isinstance(obj, SimulationSession) and session.is_modified(obj):
+            ids.add(obj.id)
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, (UserProfile, Offer)):
+            ids.add(obj.session_id)
+    ids.discard(None)
+    if ids:
+        # in SQL, so concurrent writers never lose a bump
+        session.connection().execute(
+            update(SimulationSession)
+            .where(SimulationSession.id.in_(ids))
+            .values(version=SimulationSession.version + 1, updated_at=datetime.utcnow())
+        )
+
+
+def session_version(db: Session, session_id: UUID) -> Optional[int]:
+    return db.exec(select(SimulationSession.version).where(SimulationSession.id == session_id)).first()
+
+
+def load_session_summary(
+    db: Session, session_id: UUID
+) -> Optional[Tuple[SimulationSession, Optional[UserProfile], Optional[Offer]]]:
+    """Session, its latest profile and its latest offer in one round trip."""
+    latest_profile = (
+        select(UserProfile.id)
+        .where(UserProfile.session_id == SimulationSession.id)
+        .order_by(UserProfile.created_at.desc())
+        .limit(1)
+        .correlate(SimulationSession)
+        .scalar_subquery()
+    )
+    latest_offer = (
+        select(Offer.id)
+        .where(Offer.session_id == SimulationSession.id)
+        .order_by(Offer.created_at.desc())
+        .limit(1)
+        .correlate(SimulationSession)
+        .scalar_subquery()
+    )
+    return db.exec(
+        select(SimulationSession, UserProfile, Offer)
+        .outerjoin(UserProfile, UserProfile.id == latest_profile)
+        .outerjoin(Offer, Offer.id == latest_offer)
+        .where(SimulationSession.id == session_id)
+    ).first()
+
 def start_session(db: Session, profile: UserProfileCreate) -> SessionStartResponse:
     # create session
     session = SimulationSession(status=SessionStatus.PENDING)
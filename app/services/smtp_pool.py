@@ -0,0 +1,209 @@
+# app/services/smtp_pool.py
+import logging
+import smtplib
+import ssl
+import threading
+import time
+from contextlib import contextmanager
+from email.message import EmailMessage
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# errors that leave the SMTP session usable (the server just refused this message)
+_MESSAGE_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError)
+# errors that mean the connection itself is gone
+_CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+
+class _PooledConnection:
+    def __init__(self, smtp: smtplib.SMTP):
+        self.smtp = smtp
+        self.sent = 0
+        self.last_used = time.monotonic()
+
+
+class SMTPConnectionPool:
+    """
+    Bounded pool of authenticated SMTP sessions.
+
+    Idle connections are checked with NOOP before reuse and replaced when the
+    server has dropped them; a connection is retired after
+    `max_messages_per_connection` sends or `idle_timeout` seconds unused.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int = 587,
+        user: Optional[str] = None,
+        password: Optional[str] = None,
+        max_size: int = 4,
+        idle_timeout: float = 60.0,
+        max_messages_per_connection: int = 100,
+        starttls: bool = True,
+        timeout: float = 30.0,
+        smtp_factory: Callable[..., smtplib.SMTP] = smtplib.SMTP,
+    ):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.idle_timeout = idle_timeout
+        self.max_messages_per_connection = max_messages_per_connection
+        self.starttls = starttls
+        self.timeout = timeout
+        self.smtp_factory = smtp_factory
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._idle: List[_PooledConnection] = []
+        self._lock = threading.Lock()
+        self.connects = 0  # handy for tests and throughput checks
+
+    # --- connection lifecycle ---
+    def _connect(self) -> _PooledConnection:
+        smtp = self.smtp_factory(self.host, self.port, timeout=self.timeout)
+        try:
+            smtp.ehlo()
+            if self.starttls:
+                smtp.starttls(context=ssl.create_default_context())
+                smtp.ehlo()
+            if self.user:
+                smtp.login(self.user, self.password)
+        except Exception:
+            _quietly_close(smtp)
+            raise
+        self.connects += 1
+        return _PooledConnection(smtp)
+
+    def _usable(self, conn: _PooledConnection) -> bool:
+        if time.monotonic() - conn.last_used > self.idle_timeout:
+            return False
+        if conn.sent >= self.max_messages_per_connection:
+            return False
+        try:
+            return conn.smtp.noop()[0] == 250
+        except OSError:  # includes SMTPException
+            return False
+
+    def _checkout(self) -> _PooledConnection:
+        while True:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                return self._connect()
+            if self._usable(conn):
+                return conn
+            _quietly_close(conn.smtp)
+
+    def _checkin(self, conn: _PooledConnection):
+        conn.last_used = time.monotonic()
+        with self._lock:
+            self._idle.append(conn)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a live connection; a connection that raised is discarded, not returned."""
+        self._slots.acquire()
+        conn = None
+        try:
+            conn = self._checkout()
+            yield conn
+        except Exception as e:
+            if conn is not None and not isinstance(e, _MESSAGE_ERRORS):
+                _quietly_close(conn.smtp)
+                conn = None
+            raise
+        finally:
+            if conn is not None:
+                self._checkin(conn)
+            self._slots.release()
+
+    # --- sending ---
+    def send(self, msg: EmailMessage):
+        self.send_many([msg])
+
+    def send_many(self, messages: List[EmailMessage]) -> List[Tuple[EmailMessage, Optional[Exception]]]:
+        """
+        Send `messages` over as few connections as possible. A dropped connection
+        is replaced and the message retried once; recipient-level refusals are
+        reported per message without failing the batch. With a single message
+        the error is raised instead.
+        """
+        results: List[Tuple[EmailMessage, Optional[Exception]]] = []
+        pending = list(messages)
+        retried = False
+        while pending:
+            try:
+                with self.connection() as conn:
+                    while pending:
+                        if conn.sent >= self.max_messages_per_connection:
+                            break
+                        msg = pending[0]
+                        try:
+                            conn.smtp.send_message(msg)
+                            results.append((msg, None))
+                        except _MESSAGE_ERRORS as e:
+                            if len(messages) == 1:
+                                raise
+                            results.append((msg, e))
+                        conn.sent += 1
+                        pending.pop(0)
+                        retried = False
+            except _CONNECTION_ERRORS as e:
+                if retried:
+                    raise
+                logger.info("smtp connection to %s dropped (%s); reconnecting", self.host, e)
+                retried = True
+        return results
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            _quietly_close(conn.smtp)
+
+
+def _quietly_close(smtp: smtplib.SMTP):
+    try:
+        smtp.quit()
+    except Exception:
+        try:
+            smtp.close()
+        except Exception:
+            pass
+
+
+_pools: Dict[tuple, SMTPConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_smtp_pool(smtp_config: Dict) -> SMTPConnectionPool:
+    """Shared pool per (host, port, user) from an `smtp_config` dict."""
+    if not smtp_config.get("host"):
+        raise RuntimeError("SMTP is not configured")
+    key = (smtp_config["host"], int(smtp_config["port"]), smtp_config.get("user"))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = SMTPConnectionPool(
+                smtp_config["host"],
+                int(smtp_config["port"]),
+                smtp_config.get("user"),
+                smtp_config.get("password"),
+                max_size=settings.SMTP_POOL_SIZE,
+                idle_timeout=settings.SMTP_POOL_IDLE_SECONDS,
+                max_messages_per_connection=settings.SMTP_MAX_MESSAGES_PER_CONNECTION,
+                starttls=smtp_config.get("starttls", settings.SMTP_STARTTLS),
+            )
+            _pools[key] = pool
+        return pool
+
+
+def close_smtp_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
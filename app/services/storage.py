@@ -0,0 +1,279 @@
+# app/services/storage.py
+import hashlib
+import os
+import shutil
+import uuid
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import BinaryIO, List, Optional
+
+from app.core.config import settings
+
+
+def session_key(session_id, filename: str) -> str:
+    """Storage key for a per-session document: "<session_id>/<filename>"."""
+    name = os.path.basename(filename)
+    if not name or name in (".", ".."):
+        raise ValueError("invalid filename")
+    return f"{session_id}/{name}"
+
+
+def content_key(sha256: str) -> str:
+    """
+    Storage key for deduplicated upload content: "sha256-<abc>/<digest>". The
+    digest prefix plays the part of the session ID, so blobs shard the same way.
+    """
+    if len(sha256) != 64 or any(c not in "0123456789abcdef" for c in sha256):
+        raise ValueError("invalid sha256 digest")
+    return f"sha256-{sha256[:3]}/{sha256}"
+
+
+def archive_key(month: str, run_id: str) -> str:
+    """Storage key for one archival run's partition of a month: "archive-<yyyy-mm>/<run>.ndjson.zst"."""
+    return f"archive-{month}/{run_id}.ndjson.zst"
+
+
+def archived_file_key(month: str, session_id, filename: str) -> str:
+    """Cold-storage copy of a per-session object: "archive-<yyyy-mm>/<session_id>-<filename>"."""
+    return f"archive-{month}/{session_id}-{os.path.basename(filename)}"
+
+
+def shard_prefix(session_id: str) -> str:
+    """Two-level hashed prefix ("ab/cd") so no single directory grows without bound."""
+    digest = hashlib.sha1(str(session_id).encode()).hexdigest()
+    return f"{digest[:2]}/{digest[2:4]}"
+
+
+def _split(key: str):
+    session_id, _, name = key.partition("/")
+    if not session_id or not name or "/" in name or name in (".", ".."):
+        raise ValueError(f"invalid storage key: {key}")
+    return session_id, name
+
+
+class StorageBackend(ABC):
+    """Where uploads and generated letters live. Keys look like "<session_id>/<filename>"."""
+
+    @abstractmethod
+    def put(self, key: str, data: bytes, content_type: Optional[str] = None) -> str:
+        ...
+
+    @abstractmethod
+    def put_fileobj(self, key: str, fileobj: BinaryIO, content_type: Optional[str] = None) -> str:
+        ...
+
+    @abstractmethod
+    def put_file(self, key: str, src_path: str, content_type: Optional[str] = None) -> str:
+        """Store a local file, consuming it (moved or uploaded, then removed)."""
+        ...
+
+    @abstractmethod
+    def get(self, key: str) -> bytes:
+        ...
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def list_session(self, session_id) -> List[str]:
+        ...
+
+    def local_path(self, key: str) -> Optional[str]:
+        """Filesystem path for `key` when the backend is local (lets routes use sendfile)."""
+        return None
+
+
+class LocalStorage(StorageBackend):
+    """
+    Files under `root/<ab>/<cd>/<session_id>/<filename>`, where ab/cd come from a
+    hash of the session ID. Reads fall back to the legacy flat layouts
+    (`root/<session_id>/<name>` and `root/<session_id>_<name>`).
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        session_id, name = _split(key)
+        return self.root / shard_prefix(session_id) / session_id / name
+
+    def _existing_path(self, key: str) -> Optional[Path]:
+        path = self._path(key)
+        if path.exists():
+            return path
+        session_id, name = _split(key)
+        for legacy in (self.root / session_id / name, self.root / f"{session_id}_{name}"):
+            if legacy.exists():
+                return legacy
+        return None
+
+    def _tmp_for(self, path: Path) -> Path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+
+    def put(self, key, data, content_type=None):
+        path = self._path(key)
+        tmp = self._tmp_for(path)
+        tmp.write_bytes(data)
+        tmp.replace(path)
+        return key
+
+    def put_fileobj(self, key, fileobj, content_type=None):
+        path = self._path(key)
+        tmp = self._tmp_for(path)
+        with open(tmp, "wb") as out:
+            shutil.copyfileobj(fileobj, out)
+        tmp.replace(path)
+        return key
+
+    def put_file(self, key, src_path, content_type=None):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # same filesystem in the normal case, so this is a rename
+        shutil.move(src_path, path)
+        return key
+
+    def get(self, key):
+        path = self._existing_path(key)
+        if not path:
+            raise FileNotFoundError(key)
+        return path.read_bytes()
+
+    def exists(self, key):
+        return self._existing_path(key) is not None
+
+    def delete(self, key):
+        path = self._existing_path(key)
+        if path:
+            path.unlink(missing_ok=True)
+
+    def list_session(self, session_id):
+        keys = []
+        for d in (self.root / shard_prefix(str(session_id)) / str(session_id), self.root / str(session_id)):
+            if d.is_dir():
+                keys.extend(f"{session_id}/{p.name}" for p in d.iterdir() if p.is_file() and not p.name.startswith("."))
+        return sorted(set(keys))
+
+    def local_path(self, key):
+        path = self._existing_path(key)
+        return str(path) if path else None
+
+
+class S3Storage(StorageBackend):
+    """
+    S3-compatible object storage (AWS, MinIO, ...). Object names reuse the
+    hashed shard prefix so keys spread across the keyspace. `client` can be
+    injected; otherwise boto3 is imported lazily.
+    """
+
+    def __init__(self, bucket: str, client=None, prefix: str = "", **client_kwargs):
+        if client is None:
+            import boto3  # optional dependency, only needed for this backend
+            client = boto3.client("s3", **{k: v for k, v in client_kwargs.items() if v is not None})
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+
+    def _session_prefix(self, session_id) -> str:
+        name = f"{shard_prefix(str(session_id))}/{session_id}/"
+        return f"{self.prefix}/{name}" if self.prefix else name
+
+    def _object_name(self, key: str) -> str:
+        session_id, name = _split(key)
+        return self._session_prefix(session_id) + name
+
+    def _extra(self, content_type):
+        return {"ContentType": content_type} if content_type else {}
+
+    def put(self, key, data, content_type=None):
+        self.client.put_object(Bucket=self.bucket, Key=self._object_name(key), Body=data, **self._extra(content_type))
+        return key
+
+    def put_fileobj(self, key, fileobj, content_type=None):
+        extra = {"ExtraArgs": self._extra(content_type)} if content_type else {}
+        self.client.upload_fileobj(fileobj, self.bucket, self._object_name(key), **extra)
+        return key
+
+    def put_file(self, key, src_path, content_type=None):
+        extra = {"ExtraArgs": self._extra(content_type)} if content_type else {}
+        self.client.upload_file(src_path, self.bucket, self._object_name(key), **extra)
+        os.remove(src_path)
+        return key
+
+    def get(self, key):
+        try:
+            obj = self.client.get_object(Bucket=self.bucket, Key=self._object_name(key))
+        except Exception as e:
+            if _is_not_found(e):
+                raise FileNotFoundError(key) from e
+            raise
+        return obj["Body"].read()
+
+    def exists(self, key):
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._object_name(key))
+            return True
+        except Exception as e:
+            if _is_not_found(e):
+                return False
+            raise
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=self._object_name(key))
+
+    def list_session(self, session_id):
+        prefix = self._session_prefix(session_id)
+        keys, token = [], None
+        while True:
+            kwargs = {"Bucket": self.bucket, "Prefix": prefix}
+            if token:
+                kwargs["ContinuationToken"] = token
+            page = self.client.list_objects_v2(**kwargs)
+            keys.extend(f"{session_id}/{o['Key'][len(prefix):]}" for o in page.get("Contents", []))
+            if not page.get("IsTruncated"):
+                return keys
+            token = page.get("NextContinuationToken")
+
+
+def _is_not_found(exc: Exception) -> bool:
+    code = str(getattr(exc, "response", {}).get("Error", {}).get("Code", ""))
+    return code in ("404", "NoSuchKey", "NotFound")
+
+
+_storage: Optional[StorageBackend] = None
+
+
+def build_storage() -> StorageBackend:
+    if settings.STORAGE_BACKEND == "s3":
+        if not settings.S3_BUCKET:
+            raise RuntimeError("S3_BUCKET must be set when STORAGE_BACKEND=s3")
+        return S3Storage(
+            settings.S3_BUCKET,
+            prefix=settings.S3_PREFIX,
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            region_name=settings.S3_REGION,
+            aws_access_key_id=settings.S3_ACCESS_KEY_ID,
+            aws_secret_access_key=settings.S3_SECRET_ACCESS_KEY,
+        )
+    if settings.STORAGE_BACKEND != "local":
+        raise RuntimeError(f"unknown STORAGE_BACKEND {settings.STORAGE_BACKEND!r}")
+    return LocalStorage(settings.UPLOAD_ROOT)
+
+
+def get_storage() -> StorageBackend:
+    global _storage
+    if _storage is None:
+        _storage = build_storage()
+    return _storage
+
+
+def set_storage(backend: Optional[StorageBackend]) -> None:
+    """Swap the process-wide backend (tests, scripts)."""
+    global _storage
+    _storage = backend
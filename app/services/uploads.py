@@ -0,0 +1,210 @@
+# app/services/uploads.py
+import hashlib
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+from uuid import UUID
+
+from fastapi import HTTPException, Request, UploadFile
+from sqlalchemy import case, delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.db import engine
+from app.models.domain_models import StoredBlob, UploadedDocument
+from app.services.storage import content_key, get_storage
+from app.services.workers import BackgroundLoop, register_loop
+
+# multipart framing around the file itself; keeps the Content-Length pre-check honest
+_MULTIPART_OVERHEAD = 16 * 1024
+
+
+@dataclass
+class UploadDigest:
+    filename: str
+    content_type: Optional[str]
+    size: int
+    sha256: str
+
+
+def reject_oversized_request(request: Optional[Request], max_bytes: Optional[int] = None):
+    """Fail before reading the body when the client already told us it is too big."""
+    max_bytes = max_bytes or settings.MAX_UPLOAD_BYTES
+    length = request.headers.get("content-length") if request is not None else None
+    if length and length.isdigit() and int(length) > max_bytes + _MULTIPART_OVERHEAD:
+        raise HTTPException(status_code=413, detail=f"Upload exceeds {max_bytes} bytes")
+
+
+async def digest_upload(file: UploadFile, max_bytes: Optional[int] = None) -> UploadDigest:
+    """
+    Hash an upload in fixed-size chunks, aborting as soon as it passes
+    `max_bytes`, and rewind it. Nothing is written: known content never is.
+    """
+    max_bytes = max_bytes or settings.MAX_UPLOAD_BYTES
+    chunk_size = settings.UPLOAD_CHUNK_BYTES
+    digest = hashlib.sha256()
+    size = 0
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_bytes:
+            raise HTTPException(status_code=413, detail=f"Upload exceeds {max_bytes} bytes")
+        digest.update(chunk)
+    await file.seek(0)
+    return UploadDigest(os.path.basename(file.filename or "upload"), file.content_type, size, digest.hexdigest())
+
+
+def _pin_blob(db: Session, sha256: str) -> Optional[StoredBlob]:
+    """Take a reference on an existing blob; None when there is no such blob."""
+    res = db.execute(
+        update(StoredBlob)
+        .where(StoredBlob.sha256 == sha256)
+        .values(refcount=StoredBlob.refcount + 1, orphaned_at=None)
+    )
+    db.commit()
+    if res.rowcount != 1:
+        return None
+    blob = db.get(StoredBlob, sha256)
+    db.refresh(blob)
+    return blob
+
+
+def _unpin_blob(db: Session, sha256: str, now: Optional[datetime] = None):
+    now = now or datetime.utcnow()
+    db.execute(
+        update(StoredBlob)
+        .where(StoredBlob.sha256 == sha256)
+        .values(
+            refcount=StoredBlob.refcount - 1,
+            orphaned_at=case((StoredBlob.refcount <= 1, now), else_=StoredBlob.orphaned_at),
+        )
+    )
+
+
+def _store_blob(db: Session, fileobj, digest: UploadDigest) -> StoredBlob:
+    """Return a pinned blob for `digest`, writing the content only if it isn't stored yet."""
+    storage = get_storage()
+    blob = _pin_blob(db, digest.sha256)
+    if blob is not None:
+        if not storage.exists(blob.key):
+            # row survived but the object went missing; put it back
+            storage.put_fileobj(blob.key, fileobj, content_type=blob.content_type)
+        return blob
+
+    key = content_key(digest.sha256)
+    storage.put_fileobj(key, fileobj, content_type=digest.content_type)
+    blob = StoredBlob(
+        sha256=digest.sha256, key=key, size_bytes=digest.size, content_type=digest.content_type, refcount=1
+    )
+    try:
+        db.add(blob); db.commit(); db.refresh(blob)
+    except IntegrityError:
+        # a concurrent upload of the same content created the row first
+        db.rollback()
+        blob = _pin_blob(db, digest.sha256)
+    return blob
+
+
+def _record(db: Session, session_id: UUID, fileobj, digest: UploadDigest, kind: str) -> UploadedDocument:
+    # the same file uploaded again under the same name is the same document; under
+    # another name it is a second document on the same blob, so both URLs keep working
+    existing = db.exec(
+        select(UploadedDocument).where(
+            UploadedDocument.session_id == session_id,
+            UploadedDocument.kind == kind,
+            UploadedDocument.sha256 == digest.sha256,
+            UploadedDocument.filename == digest.filename,
+        )
+    ).first()
+    if existing:
+        return existing
+
+    blob = _store_blob(db, fileobj, digest)
+    doc = UploadedDocument(
+        session_id=session_id,
+        kind=kind,
+        key=blob.key,
+        filename=digest.filename,
+        content_type=digest.content_type,
+        size_bytes=digest.size,
+        sha256=digest.sha256,
+    )
+    try:
+        db.add(doc); db.commit(); db.refresh(doc)
+    except Exception:
+        db.rollback()
+        _unpin_blob(db, digest.sha256)
+        db.commit()
+        raise
+    return doc
+
+
+async def save_upload(
+    db: Session,
+    session_id: UUID,
+    file: UploadFile,
+    kind: str = "salary_slip",
+    request: Optional[Request] = None,
+) -> UploadedDocument:
+    """Shared upload path: size-capped hashing pass, then a session reference to the deduplicated blob."""
+    reject_oversized_request(request)
+    digest = await digest_upload(file)
+    return await run_in_threadpool(_record, db, session_id, file.file, digest, kind)
+
+
+def release_document(db: Session, doc: UploadedDocument):
+    """Drop a session's reference; the blob itself goes once GC finds it unreferenced."""
+    db.delete(doc)
+    _unpin_blob(db, doc.sha256)
+    db.commit()
+
+
+def release_session_documents(db: Session, session_id: UUID) -> int:
+    docs = db.exec(select(UploadedDocument).where(UploadedDocument.session_id == session_id)).all()
+    for doc in docs:
+        db.delete(doc)
+        _unpin_blob(db, doc.sha256)
+    db.commit()
+    return len(docs)
+
+
+def collect_unreferenced_blobs(db: Session, grace_seconds: Optional[int] = None, now: Optional[datetime] = None) -> int:
+    """Delete blobs nobody has referenced for `grace_seconds`. Returns how many were removed."""
+    grace = settings.UPLOAD_GC_GRACE_SECONDS if grace_seconds is None else grace_seconds
+    cutoff = (now or datetime.utcnow()) - timedelta(seconds=grace)
+    candidates = db.exec(
+        select(StoredBlob).where(StoredBlob.refcount <= 0, StoredBlob.orphaned_at <= cutoff)
+    ).all()
+    storage = get_storage()
+    removed = 0
+    for blob in candidates:
+        # conditional: an upload that pinned the blob since the select keeps it. The
+        # row delete isn't committed until the object is gone, so a concurrent pin
+        # waits on it and then stores the content afresh rather than pinning a row
+        # whose object is about to disappear
+        res = db.execute(delete(StoredBlob).where(StoredBlob.sha256 == blob.sha256, StoredBlob.refcount <= 0))
+        if res.rowcount != 1:
+            db.rollback()
+            continue
+        try:
+            storage.delete(blob.key)
+        except Exception:
+            db.rollback()
+            raise
+        db.commit()
+        removed += 1
+    return removed
+
+
+def register_upload_gc() -> BackgroundLoop:
+    def tick() -> bool:
+        with Session(engine) as db:
+            collect_unreferenced_blobs(db)
+        return False
+
+    return register_loop(BackgroundLoop("upload-gc", tick, settings.UPLOAD_GC_INTERVAL_SECONDS))
@@ -0,0 +1,63 @@
+# app/services/workers.py
+import logging
+import threading
+from typing import Callable, List
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundLoop:
+    """
+    Runs `tick()` repeatedly on a daemon thread until stopped.
+
+    `tick` returns True when it did some work, in which case it is called again
+    straight away; otherwise the loop sleeps for `interval` seconds.
+    """
+
+    def __init__(self, name: str, tick: Callable[[], bool], interval: float = 1.0):
+        self.name = name
+        self.tick = tick
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                busy = self.tick()
+            except Exception:
+                logger.exception("background loop %s failed", self.name)
+                busy = False
+            if not busy:
+                self._stop.wait(self.interval)
+
+
+_loops: List[BackgroundLoop] = []
+
+
+def register_loop(loop: BackgroundLoop) -> BackgroundLoop:
+    _loops.append(loop)
+    return loop
+
+
+def start_all():
+    for loop in _loops:
+        loop.start()
+
+
+def stop_all():
+    for loop in _loops:
+        loop.stop()
+    _loops.clear()
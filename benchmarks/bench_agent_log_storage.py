@@ -0,0 +1,104 @@
+# benchmarks/bench_agent_log_storage.py
+"""
+AgentLog table size and admin scan time: the legacy JSON column vs. typed
+columns plus a zstd-compressed payload (AGENT_LOG_COMPACT).
+
+    python -m benchmarks.bench_agent_log_storage --sessions 200 --turns 20
+
+Rows look like the ones handle_user_message writes: agent outputs, the full
+prompt and the model response. "scan" lists every session's decisions the way
+the admin agent-log view does; "summary" reads only the typed columns.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import text
+from sqlmodel import Session, SQLModel, select
+
+from app.core.config import settings
+from app.core.db import build_engine
+from app.models.domain_models import AgentLog
+from app.services.agent_logs import AGENT_LOG_SUMMARY_COLUMNS, agent_log_data, new_agent_log
+
+
+def _log(turn: int) -> dict:
+    approved = random.random() < 0.6
+    return {
+        "sales_agent": {"proposed_amount": random.randint(1, 20) * 50000, "tenure_months": 36, "interest_rate": 11.5},
+        "verification_agent": {"kyc_verified": True, "phone": "9876543210", "address": "12 MG Road, Bengaluru"},
+        "underwriting_agent": {
+            "approved": approved,
+            "reason": "within pre-approved limit" if approved else "EMI exceeds 50% of salary",
+            "credit_score": random.randint(600, 850),
+        },
+        "emotion_agent": {"sentiment": random.choice(["positive", "neutral", "anxious"])},
+        "prompt": "You are a helpful loan assistant.\n" + "\n".join(f"user: message {i}" for i in range(turn)),
+        "model_response": {"reply": "Here is your offer summary. " * 8, "action": "NONE"},
+        "model_latency_ms": round(random.uniform(300, 2500), 1),
+    }
+
+
+def _fill(eng, sessions, turns: int):
+    SQLModel.metadata.create_all(eng)
+    with Session(eng) as db:
+        for sid in sessions:
+            for t in range(turns):
+                db.add(new_agent_log(sid, _log(t)))
+            db.commit()
+        db.execute(text("VACUUM"))
+
+
+def _table_bytes(eng) -> int:
+    with eng.connect() as conn:
+        return conn.execute(text("SELECT SUM(pgsize) FROM dbstat WHERE name = 'agentlog'")).scalar()
+
+
+def _timed(fn, sessions) -> float:
+    t = time.perf_counter()
+    for sid in sessions:
+        fn(sid)
+    return time.perf_counter() - t
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=20, help="agent logs per session")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix="finsync-bench-")
+    sessions = [uuid.uuid4() for _ in range(args.sessions)]
+    for name, compact in (("legacy", False), ("compact", True)):
+        settings.AGENT_LOG_COMPACT = compact
+        random.seed(0)
+        eng = build_engine(f"sqlite:///{os.path.join(tmpdir, name + '.db')}")
+        _fill(eng, sessions, args.turns)
+
+        with Session(eng) as db:
+            def scan(sid):
+                rows = db.exec(select(AgentLog).where(AgentLog.session_id == sid).order_by(AgentLog.created_at)).all()
+                return [agent_log_data(r)["underwriting_agent"]["approved"] for r in rows]
+
+            def summary(sid):
+                return db.exec(
+                    select(*AGENT_LOG_SUMMARY_COLUMNS).where(AgentLog.session_id == sid).order_by(AgentLog.created_at)
+                ).all()
+
+            full_s = _timed(scan, sessions)
+            db.expunge_all()
+            summary_s = _timed(summary, sessions) if compact else None
+
+        size = _table_bytes(eng)
+        eng.dispose()
+        line = f"{name:8s} {size / 1024:10.0f} KiB  scan {full_s * 1000:8.1f} ms"
+        if summary_s is not None:
+            line += f"  summary {summary_s * 1000:8.1f} ms"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
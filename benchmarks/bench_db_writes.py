@@ -0,0 +1,69 @@
+# benchmarks/bench_db_writes.py
+"""
+Concurrent write throughput: SQLAlchemy defaults vs. the engine profile from
+app.core.db.build_engine. Each thread plays a chat session, committing one
+Message per turn like handle_user_message does.
+
+    python -m benchmarks.bench_db_writes --threads 8 --writes 500
+    python -m benchmarks.bench_db_writes --url postgresql+psycopg2://u:p@localhost/finsync_bench
+
+Without --url a throwaway SQLite file is used. Point --url at a scratch
+database: the bench creates tables and writes rows into it.
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.core.db import build_engine
+from app.models.domain_models import Message, SimulationSession
+
+
+def _run(engine, threads: int, writes: int):
+    SQLModel.metadata.create_all(engine)
+    errors = []
+    barrier = threading.Barrier(threads)
+
+    def chat():
+        with Session(engine) as db:
+            sess = SimulationSession()
+            db.add(sess); db.commit(); db.refresh(sess)
+            barrier.wait()
+            for i in range(writes):
+                try:
+                    db.add(Message(session_id=sess.id, sender="user", text=f"turn {i}")); db.commit()
+                except OperationalError as e:  # "database is locked"
+                    db.rollback()
+                    errors.append(e)
+
+    workers = [threading.Thread(target=chat) for _ in range(threads)]
+    t = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - t
+    engine.dispose()
+    return (threads * writes - len(errors)) / elapsed, len(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", help="database URL (default: a temporary SQLite file)")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--writes", type=int, default=500, help="commits per thread")
+    args = parser.parse_args()
+
+    tmpdir = None if args.url else tempfile.mkdtemp(prefix="finsync-bench-")
+    for name, factory in (("defaults", lambda url: create_engine(url)), ("profile", build_engine)):
+        url = args.url or f"sqlite:///{os.path.join(tmpdir, name + '.db')}"
+        rate, failed = _run(factory(url), args.threads, args.writes)
+        print(f"{name:9s} {rate:9.1f} writes/s  ({failed} failed commits, {args.threads} threads)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# benchmarks/bench_email_outbox.py
+"""
+Outbox send throughput vs. claim size, against a Resend stand-in with fixed
+per-request latency (httpx.MockTransport). Every email is its own request
+(each carries its own idempotency key); the claim size sets how many rows
+share one lease UPDATE and one keep-alive stretch.
+
+    python -m benchmarks.bench_email_outbox --emails 2000 --latency-ms 150
+"""
+import argparse
+import os
+import time
+
+import httpx
+from sqlmodel import Session, delete
+
+from app.core.db import engine, init_db
+from app.models.domain_models import EmailOutbox
+from app.services import email_outbox
+from app.services.email_templates import loan_confirmation_html
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--emails", type=int, default=2000)
+    parser.add_argument("--latency-ms", type=float, default=150.0)
+    parser.add_argument("--batch-sizes", default="1,10,50,100")
+    args = parser.parse_args()
+
+    os.environ.setdefault("RESEND_API_KEY", "re_bench")
+    os.environ.setdefault("SENDER_EMAIL", "bench@finsync.test")
+
+    def handler(request: httpx.Request):
+        time.sleep(args.latency_ms / 1000)
+        return httpx.Response(200, json={"id": request.headers["Idempotency-Key"]})
+
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+    email_outbox._http = lambda: client
+    init_db()
+
+    html = loan_confirmation_html("Bench", 30, 100000, 3000, 12.5, 36)
+    for size in [int(s) for s in args.batch_sizes.split(",")]:
+        with Session(engine) as db:
+            db.exec(delete(EmailOutbox))
+            db.add_all(EmailOutbox(to_email=f"c{i}@example.com", subject="bench", html=html) for i in range(args.emails))
+            db.commit()
+
+        t = time.perf_counter()
+        while email_outbox.flush_outbox("bench", batch_size=size):
+            pass
+        elapsed = time.perf_counter() - t
+        print(f"batch={size:4d}: {args.emails / elapsed:9.1f} emails/s")
+
+    with Session(engine) as db:
+        db.exec(delete(EmailOutbox))
+        db.commit()
+
+
+if __name__ == "__main__":
+    main()
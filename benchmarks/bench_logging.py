@@ -0,0 +1,101 @@
+# benchmarks/bench_logging.py
+"""
+Caller-side latency of a log call: a plain synchronous StreamHandler vs. the
+queue handler from app.core.log, both writing JSON lines to the same sink.
+
+    python -m benchmarks.bench_logging
+    python -m benchmarks.bench_logging --records 20000 --threads 8 --sink-delay-us 50
+
+--sink-delay-us stands in for a slow consumer of stdout (a terminal, a full
+pipe to a log shipper): every write sleeps that long. The queue handler's
+numbers are what a request pays; the writes still happen, on the listener
+thread. The queue is sized to hold the whole run, so nothing is dropped.
+"""
+import argparse
+import logging
+import logging.handlers
+import queue
+import statistics
+import threading
+import time
+
+from app.core.log import JsonFormatter, RequestIdFilter, _QueueHandler
+
+
+class _SlowSink:
+    def __init__(self, delay_s: float):
+        self.delay_s = delay_s
+        self._lock = threading.Lock()
+
+    def write(self, s):
+        with self._lock:  # one stdout
+            if self.delay_s:
+                time.sleep(self.delay_s)
+
+    def flush(self):
+        pass
+
+
+def _run(handler: logging.Handler, records: int, threads: int):
+    log = logging.getLogger(f"bench.{id(handler)}")
+    log.propagate = False
+    log.setLevel(logging.INFO)
+    log.addHandler(handler)
+    latencies = []
+    lat_lock = threading.Lock()
+
+    def worker(n):
+        mine = []
+        for i in range(n):
+            t = time.perf_counter()
+            log.info("login", extra={"customer_id": f"CUST_{i:06d}"})
+            mine.append(time.perf_counter() - t)
+        with lat_lock:
+            latencies.extend(mine)
+
+    ts = [threading.Thread(target=worker, args=(records // threads,)) for _ in range(threads)]
+    t = time.perf_counter()
+    for th in ts:
+        th.start()
+    for th in ts:
+        th.join()
+    elapsed = time.perf_counter() - t
+    log.removeHandler(handler)
+    latencies.sort()
+    return (
+        statistics.median(latencies) * 1e6,
+        latencies[int(len(latencies) * 0.99)] * 1e6,
+        len(latencies) / elapsed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=10_000)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--sink-delay-us", type=float, default=20.0)
+    args = parser.parse_args()
+    sink = _SlowSink(args.sink_delay_us / 1e6)
+
+    direct = logging.StreamHandler(sink)
+    direct.setFormatter(JsonFormatter())
+    direct.addFilter(RequestIdFilter())
+
+    out = logging.StreamHandler(sink)
+    out.setFormatter(JsonFormatter())
+    q = queue.Queue(maxsize=args.records + 1)
+    queued = _QueueHandler(q)
+    queued.addFilter(RequestIdFilter())
+    listener = logging.handlers.QueueListener(q, out)
+    listener.start()
+
+    for name, handler in (("sync stream", direct), ("queue", queued)):
+        p50, p99, rate = _run(handler, args.records, args.threads)
+        print(f"{name:12s}  p50 {p50:8.1f} us  p99 {p99:8.1f} us  {rate:10.0f} calls/s")
+    t = time.perf_counter()
+    listener.stop()
+    print(f"queue drained {time.perf_counter() - t:.2f}s after the last call")
+
+
+if __name__ == "__main__":
+    main()
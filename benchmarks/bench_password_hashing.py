@@ -0,0 +1,67 @@
+# benchmarks/bench_password_hashing.py
+"""
+Login throughput: bcrypt verifies per second through the password pool, per
+worker count, and per core.
+
+    python -m benchmarks.bench_password_hashing
+    python -m benchmarks.bench_password_hashing --rounds 10 12 --workers 1 2 4 --logins 200
+
+Each login is one verify_password call from one of --clients threads, i.e.
+the path a sync login route takes. Requests refused with 503 (pool queue
+full) are counted separately; raise --max-pending to see raw throughput.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.services import password_service
+
+
+def _run(logins: int, clients: int, hash: str):
+    def one(_):
+        try:
+            password_service.verify_password("correct horse", hash)
+            return 0
+        except HTTPException:
+            return 1
+
+    t = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as ex:
+        refused = sum(ex.map(one, range(logins)))
+    return time.perf_counter() - t, refused
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, nargs="+", default=[settings.BCRYPT_ROUNDS])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, os.cpu_count() or 1])
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--clients", type=int, default=32, help="concurrent login threads")
+    parser.add_argument("--max-pending", type=int, default=10_000)
+    args = parser.parse_args()
+
+    settings.PASSWORD_HASH_MAX_PENDING = args.max_pending
+    settings.PASSWORD_HASH_TIMEOUT_SECONDS = 600.0
+    for rounds in args.rounds:
+        settings.BCRYPT_ROUNDS = rounds
+        for workers in sorted(set(args.workers)):
+            settings.PASSWORD_HASH_WORKERS = workers
+            password_service.shutdown_password_pool()
+            hash = password_service.hash_password("correct horse")  # also starts the pool
+            elapsed, refused = _run(args.logins, args.clients, hash)
+            done = args.logins - refused
+            rate = done / elapsed
+            cores = min(workers, os.cpu_count() or 1)
+            print(
+                f"rounds {rounds:2d}  workers {workers:2d}  {rate:8.1f} logins/s"
+                f"  {rate / cores:7.1f} /s per core  ({done} ok, {refused} refused)"
+            )
+    password_service.shutdown_password_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# benchmarks/bench_smtp_pool.py
+"""
+SMTP throughput: pooled connections vs. one connection per message.
+
+Runs against a local aiosmtpd sink (pip install aiosmtpd) unless --host/--port
+point at a real relay. Default volume matches a month-end sanction-letter batch.
+
+    python -m benchmarks.bench_smtp_pool --messages 5000 --threads 8
+"""
+import argparse
+import smtplib
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.services.pdf_mailer import build_email_message
+from app.services.smtp_pool import SMTPConnectionPool
+
+ATTACHMENT = ("sanction.pdf", b"%PDF-1.4\n" + b"0" * 40_000)  # about the size of a real letter
+
+
+def _messages(n):
+    cfg = {"sender": "noreply@finsync.test"}
+    return [
+        build_email_message(cfg, f"customer{i}@example.com", f"Sanction Letter [{i:08d}]", "Please find attached.", [ATTACHMENT])
+        for i in range(n)
+    ]
+
+
+def _unpooled(host, port, starttls, user, password, msgs, threads):
+    def send(msg):
+        with smtplib.SMTP(host, port) as s:
+            if starttls:
+                s.starttls()
+            if user:
+                s.login(user, password)
+            s.send_message(msg)
+
+    with ThreadPoolExecutor(threads) as ex:
+        list(ex.map(send, msgs))
+    return len(msgs)
+
+
+def _pooled(host, port, starttls, user, password, msgs, threads, batch):
+    pool = SMTPConnectionPool(host, port, user, password, max_size=threads, starttls=starttls)
+    batches = [msgs[i:i + batch] for i in range(0, len(msgs), batch)]
+    with ThreadPoolExecutor(threads) as ex:
+        list(ex.map(pool.send_many, batches))
+    pool.close()
+    return pool.connects
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--batch", type=int, default=50, help="messages handed to send_many at once")
+    parser.add_argument("--host")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--starttls", action="store_true")
+    parser.add_argument("--user")
+    parser.add_argument("--password")
+    args = parser.parse_args()
+
+    controller = None
+    host, port = args.host, args.port
+    if not host:
+        from aiosmtpd.controller import Controller
+
+        class Sink:
+            async def handle_DATA(self, server, session, envelope):
+                return "250 OK"
+
+        controller = Controller(Sink(), hostname="127.0.0.1", port=port)
+        controller.start()
+        host = "127.0.0.1"
+
+    msgs = _messages(args.messages)
+    try:
+        t = time.perf_counter()
+        _unpooled(host, port, args.starttls, args.user, args.password, msgs, args.threads)
+        unpooled = time.perf_counter() - t
+
+        t = time.perf_counter()
+        connects = _pooled(host, port, args.starttls, args.user, args.password, msgs, args.threads, args.batch)
+        pooled = time.perf_counter() - t
+    finally:
+        if controller:
+            controller.stop()
+
+    print(f"messages={args.messages} threads={args.threads} batch={args.batch}")
+    print(f"per-message connection: {args.messages / unpooled:8.1f} msg/s ({args.messages} connects)")
+    print(f"pooled:                 {args.messages / pooled:8.1f} msg/s ({connects} connects)")
+
+
+if __name__ == "__main__":
+    main()
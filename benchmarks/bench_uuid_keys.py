@@ -0,0 +1,88 @@
+# benchmarks/bench_uuid_keys.py
+"""
+Insert throughput and primary-key index size: uuid4 vs. uuid7 ids on a
+Message-shaped table.
+
+    python -m benchmarks.bench_uuid_keys --rows 1000000
+    python -m benchmarks.bench_uuid_keys --rows 10000000 --url postgresql+psycopg2://u:p@localhost/finsync_bench
+
+The gap grows with the table: it shows once the PK index no longer fits in
+cache, so run the 10M case against Postgres (or SQLite with a small
+cache_size) for representative numbers. Without --url a throwaway SQLite file
+is used. Point --url at a scratch database: the bench drops and recreates its
+own tables.
+"""
+import argparse
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, Uuid, insert, text
+
+from app.core.db import build_engine
+from app.core.ids import uuid7
+
+
+def _table(metadata: MetaData, name: str) -> Table:
+    return Table(
+        name, metadata,
+        Column("id", Uuid, primary_key=True),
+        Column("session_id", Uuid, nullable=False),
+        Column("sender", String, nullable=False),
+        Column("text", String, nullable=False),
+        Column("created_at", DateTime, nullable=False),
+    )
+
+
+def _index_bytes(conn, table: str) -> int:
+    if conn.dialect.name == "postgresql":
+        return conn.execute(text(f"SELECT pg_relation_size('{table}_pkey')")).scalar()
+    return conn.execute(
+        text("SELECT SUM(pgsize) FROM dbstat WHERE name = (SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :t)"),
+        {"t": table},
+    ).scalar()
+
+
+def _run(eng, table: Table, factory, rows: int, batch: int):
+    session_id = uuid.uuid4()
+    done = 0
+    t = time.perf_counter()
+    while done < rows:
+        n = min(batch, rows - done)
+        now = datetime.utcnow()
+        with eng.begin() as conn:
+            conn.execute(insert(table), [
+                {"id": factory(), "session_id": session_id, "sender": "user", "text": "hello", "created_at": now}
+                for _ in range(n)
+            ])
+        done += n
+    elapsed = time.perf_counter() - t
+    with eng.connect() as conn:
+        size = _index_bytes(conn, table.name)
+    return rows / elapsed, size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", help="database URL (default: a temporary SQLite file)")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=5000, help="rows per transaction")
+    args = parser.parse_args()
+
+    tmpdir = None if args.url else tempfile.mkdtemp(prefix="finsync-bench-")
+    for name, factory in (("uuid4", uuid.uuid4), ("uuid7", uuid7)):
+        url = args.url or f"sqlite:///{os.path.join(tmpdir, name + '.db')}"
+        eng = build_engine(url)
+        metadata = MetaData()
+        table = _table(metadata, f"bench_message_{name}")
+        metadata.drop_all(eng)
+        metadata.create_all(eng)
+        rate, size = _run(eng, table, factory, args.rows, args.batch)
+        eng.dispose()
+        print(f"{name}  {rate:10.0f} rows/s  pk index {size / 2**20:8.1f} MiB  ({args.rows} rows)")
+
+
+if __name__ == "__main__":
+    main()
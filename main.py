@@ -1,7 +1,6 @@
 # main.py
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from pathlib import Path
 import logging
 
 from app.api import (
@@ -13,13 +12,26 @@ from app.api import (
     routes_mocks,
     routes_admin,
     routes_health,
+    routes_jobs,
 )
-from app.core.db import init_db
+from app.core.db import check_schema_version, dispose_async_engine
+from app.core.log import RequestIdMiddleware, configure_logging
+from app.core.replica import dispose_replica_engines, register_replica_heartbeat
 from app.api.ai_openrouter import router as openrouter_router
 from app.api.routes_email import router as email_router
+from app.services import job_handlers  # noqa: F401  (registers job kinds)
+from app.services.job_queue import register_job_workers
+from app.services import workers
+from app.services.storage import get_storage
+from app.services.smtp_pool import close_smtp_pools
+from app.services.email_outbox import register_outbox_flusher
+from app.services.salary_extraction import shutdown_extraction_pool
+from app.services.password_service import shutdown_password_pool
+from app.services.uploads import register_upload_gc
+from app.services.archive import register_session_archiver
 
 
-logging.basicConfig(level=logging.INFO)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 
@@ -33,6 +45,7 @@ def create_app():
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    app.add_middleware(RequestIdMiddleware)
 
     app.include_router(routes_health.router, prefix="/api")
     app.include_router(routes_auth.router, prefix="/api")
@@ -42,15 +55,34 @@ def create_app():
     app.include_router(routes_sessions.router, prefix="/api")
     app.include_router(routes_mocks.router, prefix="/api")
     app.include_router(routes_admin.router, prefix="/api")
+    app.include_router(routes_jobs.router, prefix="/api")
     app.include_router(openrouter_router)
     app.include_router(email_router)
 
 
     @app.on_event("startup")
     def on_startup():
-        Path("uploads").mkdir(exist_ok=True, parents=True)
-        init_db()
-        print ("Application startup complete")
+        get_storage()
+        check_schema_version()
+        register_job_workers()
+        register_outbox_flusher()
+        register_upload_gc()
+        register_session_archiver()
+        register_replica_heartbeat()
+        workers.start_all()
+        logger.info("Application startup complete")
+
+    @app.on_event("shutdown")
+    def on_shutdown():
+        workers.stop_all()
+        close_smtp_pools()
+        shutdown_extraction_pool()
+        shutdown_password_pool()
+
+    @app.on_event("shutdown")
+    async def on_shutdown_async():
+        await dispose_async_engine()
+        await dispose_replica_engines()
 
     return app
 
@@ -0,0 +1,143 @@
+"""initial schema
+
+Tables as the app created them with create_all() before migrations, so an
+existing database can be stamped at this revision. Tables added since then
+are created by later revisions.
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-19 01:06:06
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('simulationsession',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'IN_PROGRESS', 'OFFER_GENERATED', 'REJECTED', 'COMPLETED', 'AWAITING_SALARY', name='sessionstatus'), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('customer_id', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('simulationsession', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_simulationsession_customer_id'), ['customer_id'], unique=False)
+
+    op.create_table('user',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('customer_id', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('name', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('email', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('phone', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('password_hash', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_user_customer_id'), ['customer_id'], unique=True)
+
+    op.create_table('message',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('session_id', sa.Uuid(), nullable=False),
+    sa.Column('sender', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('text', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['session_id'], ['simulationsession.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('message', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_message_session_id'), ['session_id'], unique=False)
+
+    op.create_table('offer',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('session_id', sa.Uuid(), nullable=False),
+    sa.Column('requested_amount', sa.Float(), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('tenure_months', sa.Integer(), nullable=False),
+    sa.Column('interest_rate', sa.Float(), nullable=False),
+    sa.Column('monthly_emi', sa.Float(), nullable=False),
+    sa.Column('status', sa.Enum('APPROVED', 'REJECTED', 'PENDING', name='offerstatus'), nullable=False),
+    sa.Column('reason_summary', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('pre_approved_limit', sa.Float(), nullable=True),
+    sa.Column('decision_reason', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('salary_slip_path', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['session_id'], ['simulationsession.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('offer', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_offer_session_id'), ['session_id'], unique=False)
+
+    op.create_table('userprofile',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('session_id', sa.Uuid(), nullable=False),
+    sa.Column('customer_id', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('name', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('age', sa.Integer(), nullable=False),
+    sa.Column('income_monthly', sa.Float(), nullable=False),
+    sa.Column('existing_emi', sa.Float(), nullable=False),
+    sa.Column('employment_type', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('loan_type', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('desired_amount', sa.Float(), nullable=False),
+    sa.Column('desired_tenure_months', sa.Integer(), nullable=False),
+    sa.Column('mood', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('salary_reported', sa.Float(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['session_id'], ['simulationsession.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('userprofile', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_userprofile_session_id'), ['session_id'], unique=False)
+
+    op.create_table('agentlog',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('session_id', sa.Uuid(), nullable=False),
+    sa.Column('offer_id', sa.Uuid(), nullable=True),
+    sa.Column('log', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['offer_id'], ['offer.id'], ),
+    sa.ForeignKeyConstraint(['session_id'], ['simulationsession.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('agentlog', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_agentlog_session_id'), ['session_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('agentlog', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_agentlog_session_id'))
+
+    op.drop_table('agentlog')
+    with op.batch_alter_table('userprofile', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_userprofile_session_id'))
+
+    op.drop_table('userprofile')
+    with op.batch_alter_table('offer', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_offer_session_id'))
+
+    op.drop_table('offer')
+    with op.batch_alter_table('message', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_message_session_id'))
+
+    op.drop_table('message')
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_user_customer_id'))
+
+    op.drop_table('user')
+    with op.batch_alter_table('simulationsession', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_simulationsession_customer_id'))
+
+    op.drop_table('simulationsession')
@@ -0,0 +1,63 @@
+"""composite indexes for the hot query shapes
+
+- message (session_id, created_at): transcript for a session in order
+- agentlog (session_id, created_at): latest log per session (last-prompt,
+  sanction letter); ORDER BY created_at DESC walks the index backwards
+- userprofile (customer_id, created_at): latest profile on the dashboard
+- offer (session_id, status): approved offer for a session
+
+The single-column session_id indexes are a prefix of the new ones and are
+dropped. On Postgres the indexes are built CONCURRENTLY so chat writes keep
+flowing while they build.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 01:06:21
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, new index, columns, superseded single-column index)
+INDEXES = [
+    ('message', 'ix_message_session_id_created_at', ['session_id', 'created_at'], 'ix_message_session_id'),
+    ('agentlog', 'ix_agentlog_session_id_created_at', ['session_id', 'created_at'], 'ix_agentlog_session_id'),
+    ('userprofile', 'ix_userprofile_customer_id_created_at', ['customer_id', 'created_at'], None),
+    ('offer', 'ix_offer_session_id_status', ['session_id', 'status'], 'ix_offer_session_id'),
+]
+
+
+def _postgres() -> bool:
+    return op.get_bind().dialect.name == 'postgresql'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if _postgres():
+        with op.get_context().autocommit_block():
+            for table, name, columns, old in INDEXES:
+                op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+                if old:
+                    op.drop_index(old, table_name=table, postgresql_concurrently=True)
+        return
+    for table, name, columns, old in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+        if old:
+            op.drop_index(old, table_name=table)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, name, columns, old in reversed(INDEXES):
+        if old:
+            op.create_index(old, table, [columns[0]], unique=False)
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,111 @@
+"""compact agent log storage
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 02:10:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import json
+
+import sqlalchemy as sa
+import sqlmodel
+import zstandard
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH = 500
+
+# The row encoding as of this revision, copied rather than imported from
+# app.services.agent_logs so later changes there can't alter this migration.
+ZSTD_JSON = "zstd+json"
+ZSTD_LEVEL = 6
+
+
+def encode_log(log, compressor):
+    return compressor.compress(json.dumps(log, separators=(",", ":"), default=str).encode())
+
+
+def decode_log(payload, encoding, decompressor):
+    if encoding != ZSTD_JSON:
+        raise ValueError(f"unknown agent log encoding {encoding!r}")
+    return json.loads(decompressor.decompress(payload))
+
+
+def summarize(log):
+    decision = log.get("underwriting_agent") or log.get("salary_resume") or {}
+    offer = decision.get("offer") or {}
+    latency = log.get("model_latency_ms")
+    return {
+        "approved": decision.get("approved"),
+        "reason": decision.get("reason") or offer.get("reason_summary"),
+        "sentiment": (log.get("emotion_agent") or {}).get("sentiment"),
+        "model_latency_ms": float(latency) if latency is not None else None,
+    }
+
+agentlog = sa.table(
+    'agentlog',
+    sa.column('id', sa.Uuid()),
+    sa.column('log', sa.JSON()),
+    sa.column('approved', sa.Boolean()),
+    sa.column('reason', sa.String()),
+    sa.column('sentiment', sa.String()),
+    sa.column('model_latency_ms', sa.Float()),
+    sa.column('payload', sa.LargeBinary()),
+    sa.column('encoding', sa.String()),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('agentlog', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('approved', sa.Boolean(), nullable=True))
+        batch_op.add_column(sa.Column('reason', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+        batch_op.add_column(sa.Column('sentiment', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+        batch_op.add_column(sa.Column('model_latency_ms', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('payload', sa.LargeBinary(), nullable=True))
+        batch_op.add_column(sa.Column('encoding', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+
+    # convert existing rows in batches; each converted row drops out of the next select
+    conn = op.get_bind()
+    compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+    while True:
+        rows = conn.execute(
+            sa.select(agentlog.c.id, agentlog.c.log)
+            .where(agentlog.c.payload.is_(None), agentlog.c.log.is_not(None))
+            .limit(BATCH)
+        ).all()
+        if not rows:
+            break
+        for row_id, log in rows:
+            log = log or {}
+            conn.execute(
+                agentlog.update().where(agentlog.c.id == row_id).values(
+                    log=sa.null(), payload=encode_log(log, compressor), encoding=ZSTD_JSON, **summarize(log)
+                )
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    conn = op.get_bind()
+    decompressor = zstandard.ZstdDecompressor()
+    rows = conn.execute(
+        sa.select(agentlog.c.id, agentlog.c.payload, agentlog.c.encoding).where(agentlog.c.payload.is_not(None))
+    )
+    for row_id, payload, encoding in rows.all():
+        conn.execute(agentlog.update().where(agentlog.c.id == row_id).values(log=decode_log(payload, encoding, decompressor)))
+
+    with op.batch_alter_table('agentlog', schema=None) as batch_op:
+        batch_op.drop_column('encoding')
+        batch_op.drop_column('payload')
+        batch_op.drop_column('model_latency_ms')
+        batch_op.drop_column('sentiment')
+        batch_op.drop_column('reason')
+        batch_op.drop_column('approved')
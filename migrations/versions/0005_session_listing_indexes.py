@@ -0,0 +1,60 @@
+"""keyset indexes for the admin session listing
+
+- simulationsession (created_at, id): unfiltered pages, newest first
+- simulationsession (status, created_at, id): pages filtered by status
+- simulationsession (customer_id, created_at, id): pages filtered by
+  customer; supersedes the single-column customer_id index
+
+Built CONCURRENTLY on Postgres, like 0002.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 02:40:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, Sequence[str], None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, new index, columns, superseded single-column index)
+INDEXES = [
+    ('simulationsession', 'ix_simulationsession_created_at_id', ['created_at', 'id'], None),
+    ('simulationsession', 'ix_simulationsession_status_created_at_id', ['status', 'created_at', 'id'], None),
+    ('simulationsession', 'ix_simulationsession_customer_id_created_at_id', ['customer_id', 'created_at', 'id'],
+     'ix_simulationsession_customer_id'),
+]
+
+
+def _postgres() -> bool:
+    return op.get_bind().dialect.name == 'postgresql'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if _postgres():
+        with op.get_context().autocommit_block():
+            for table, name, columns, old in INDEXES:
+                op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+                if old:
+                    op.drop_index(old, table_name=table, postgresql_concurrently=True)
+        return
+    for table, name, columns, old in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+        if old:
+            op.drop_index(old, table_name=table)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, name, columns, old in reversed(INDEXES):
+        if old:
+            op.create_index(old, table, [columns[0]], unique=False)
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,45 @@
+"""(created_at, id) indexes for the audit export
+
+- message (created_at, id), agentlog (created_at, id): the export walks a
+  date range in this order and resumes from a (created_at, id) cursor
+
+Built CONCURRENTLY on Postgres, like 0002.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 03:05:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, Sequence[str], None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('message', 'ix_message_created_at_id', ['created_at', 'id']),
+    ('agentlog', 'ix_agentlog_created_at_id', ['created_at', 'id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            for table, name, columns in INDEXES:
+                op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+        return
+    for table, name, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, name, columns in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,45 @@
+"""index of sessions archived to cold storage
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 04:20:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, Sequence[str], None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('archivedsession',
+    sa.Column('session_id', sa.Uuid(), nullable=False),
+    sa.Column('customer_id', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('status', sa.Enum('PENDING', 'IN_PROGRESS', 'OFFER_GENERATED', 'REJECTED', 'COMPLETED', 'AWAITING_SALARY', name='sessionstatus'), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('closed_at', sa.DateTime(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.Column('partition', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('key', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('frame_offset', sa.Integer(), nullable=False),
+    sa.Column('frame_length', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('session_id')
+    )
+    with op.batch_alter_table('archivedsession', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_archivedsession_customer_id'), ['customer_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('archivedsession', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_archivedsession_customer_id'))
+
+    op.drop_table('archivedsession')
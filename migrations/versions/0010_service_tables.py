@@ -0,0 +1,161 @@
+"""tables added after the create_all() baseline
+
+Job queue, email outbox, letter regeneration runs, salary extraction cache and
+deduplicated uploads. Databases migrated before 0001 was cut back to the
+baseline already have some of these, so existing tables are left alone.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19 05:10:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, Sequence[str], None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    if 'emailoutbox' not in existing:
+        op.create_table('emailoutbox',
+        sa.Column('id', sa.Uuid(), nullable=False),
+        sa.Column('to_email', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('subject', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('html', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('template', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('status', sa.Enum('PENDING', 'SENDING', 'SENT', 'FAILED', name='outboxstatus'), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('max_attempts', sa.Integer(), nullable=False),
+        sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+        sa.Column('lease_owner', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('lease_expires_at', sa.DateTime(), nullable=True),
+        sa.Column('last_error', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('provider_message_id', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('sent_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+        )
+        with op.batch_alter_table('emailoutbox', schema=None) as batch_op:
+            batch_op.create_index(batch_op.f('ix_emailoutbox_next_attempt_at'), ['next_attempt_at'], unique=False)
+            batch_op.create_index(batch_op.f('ix_emailoutbox_status'), ['status'], unique=False)
+
+    if 'letterregenrun' not in existing:
+        op.create_table('letterregenrun',
+        sa.Column('id', sa.Uuid(), nullable=False),
+        sa.Column('status', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False),
+        sa.Column('processed', sa.Integer(), nullable=False),
+        sa.Column('failed', sa.Integer(), nullable=False),
+        sa.Column('cursor_created_at', sa.DateTime(), nullable=True),
+        sa.Column('cursor_offer_id', sa.Uuid(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    if 'salaryextraction' not in existing:
+        op.create_table('salaryextraction',
+        sa.Column('sha256', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('salary', sa.Float(), nullable=True),
+        sa.Column('net_salary', sa.Float(), nullable=True),
+        sa.Column('gross_salary', sa.Float(), nullable=True),
+        sa.Column('pages', sa.Integer(), nullable=False),
+        sa.Column('error', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('sha256')
+        )
+
+    if 'storedblob' not in existing:
+        op.create_table('storedblob',
+        sa.Column('sha256', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('key', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('size_bytes', sa.Integer(), nullable=False),
+        sa.Column('content_type', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('refcount', sa.Integer(), nullable=False),
+        sa.Column('orphaned_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('sha256')
+        )
+        with op.batch_alter_table('storedblob', schema=None) as batch_op:
+            batch_op.create_index(batch_op.f('ix_storedblob_orphaned_at'), ['orphaned_at'], unique=False)
+
+    if 'job' not in existing:
+        op.create_table('job',
+        sa.Column('id', sa.Uuid(), nullable=False),
+        sa.Column('kind', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('status', sa.Enum('PENDING', 'RUNNING', 'SUCCEEDED', 'FAILED', name='jobstatus'), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=True),
+        sa.Column('result', sa.JSON(), nullable=True),
+        sa.Column('last_error', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('max_attempts', sa.Integer(), nullable=False),
+        sa.Column('run_after', sa.DateTime(), nullable=False),
+        sa.Column('lease_owner', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('lease_expires_at', sa.DateTime(), nullable=True),
+        sa.Column('session_id', sa.Uuid(), nullable=True),
+        sa.Column('parent_id', sa.Uuid(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['session_id'], ['simulationsession.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        with op.batch_alter_table('job', schema=None) as batch_op:
+            batch_op.create_index(batch_op.f('ix_job_kind'), ['kind'], unique=False)
+            batch_op.create_index(batch_op.f('ix_job_run_after'), ['run_after'], unique=False)
+            batch_op.create_index(batch_op.f('ix_job_session_id'), ['session_id'], unique=False)
+            batch_op.create_index(batch_op.f('ix_job_status'), ['status'], unique=False)
+
+    if 'uploadeddocument' not in existing:
+        op.create_table('uploadeddocument',
+        sa.Column('id', sa.Uuid(), nullable=False),
+        sa.Column('session_id', sa.Uuid(), nullable=False),
+        sa.Column('kind', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('key', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('filename', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('content_type', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('size_bytes', sa.Integer(), nullable=False),
+        sa.Column('sha256', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['session_id'], ['simulationsession.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        with op.batch_alter_table('uploadeddocument', schema=None) as batch_op:
+            batch_op.create_index(batch_op.f('ix_uploadeddocument_session_id'), ['session_id'], unique=False)
+            batch_op.create_index(batch_op.f('ix_uploadeddocument_sha256'), ['sha256'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('uploadeddocument', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_uploadeddocument_sha256'))
+        batch_op.drop_index(batch_op.f('ix_uploadeddocument_session_id'))
+
+    op.drop_table('uploadeddocument')
+    with op.batch_alter_table('job', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_job_status'))
+        batch_op.drop_index(batch_op.f('ix_job_session_id'))
+        batch_op.drop_index(batch_op.f('ix_job_run_after'))
+        batch_op.drop_index(batch_op.f('ix_job_kind'))
+
+    op.drop_table('job')
+    with op.batch_alter_table('storedblob', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_storedblob_orphaned_at'))
+
+    op.drop_table('storedblob')
+    op.drop_table('salaryextraction')
+    op.drop_table('letterregenrun')
+    with op.batch_alter_table('emailoutbox', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_emailoutbox_status'))
+        batch_op.drop_index(batch_op.f('ix_emailoutbox_next_attempt_at'))
+
+    op.drop_table('emailoutbox')
@@ -0,0 +1,14 @@
+import pytest
+
+from app.models.domain_models import Offer, OfferStatus
+
+
+@pytest.fixture
+def make_offer():
+    """Build an unsaved Offer for a session; amount doubles as the requested amount."""
+    def make(session_id, amount=100000.0, status=OfferStatus.APPROVED):
+        return Offer(
+            session_id=session_id, requested_amount=amount, amount=amount, tenure_months=12,
+            interest_rate=12.0, monthly_emi=amount / 12, status=status, reason_summary="test",
+        )
+    return make
@@ -0,0 +1,67 @@
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from main import app
+from app.core.db import engine, init_db
+from app.models.domain_models import SessionStatus, SimulationSession
+
+client = TestClient(app)
+
+
+def _seed(customer_id: str, n: int, start: datetime):
+    init_db()
+    with Session(engine) as db:
+        for i in range(n):
+            status = SessionStatus.COMPLETED if i % 3 == 0 else SessionStatus.IN_PROGRESS
+            # pairs share a timestamp so the id tie-breaker is exercised
+            db.add(SimulationSession(customer_id=customer_id, status=status, created_at=start + timedelta(seconds=i // 2)))
+        db.commit()
+
+
+def test_pages_walk_every_session_once_newest_first():
+    customer = f"PAGE_{uuid.uuid4().hex[:8]}"
+    _seed(customer, 11, datetime(2026, 1, 1))
+
+    seen, cursor = [], None
+    while True:
+        params = {"customer_id": customer, "limit": 4}
+        if cursor:
+            params["cursor"] = cursor
+        body = client.get("/api/admin/sessions", params=params).json()
+        assert len(body["sessions"]) <= 4
+        seen += body["sessions"]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == 11 and len({s["id"] for s in seen}) == 11
+    keys = [(s["created_at"], s["id"]) for s in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_filters_and_counts():
+    customer = f"PAGE_{uuid.uuid4().hex[:8]}"
+    start = datetime(2026, 2, 1)
+    _seed(customer, 9, start)
+
+    body = client.get("/api/admin/sessions", params={
+        "customer_id": customer, "status": "completed", "counts": True,
+    }).json()
+    assert {s["status"] for s in body["sessions"]} == {"completed"}
+    assert body["counts"] == {"completed": 3}
+
+    body = client.get("/api/admin/sessions", params={
+        "customer_id": customer, "counts": True,
+        "created_from": (start + timedelta(seconds=1)).isoformat(), "created_to": (start + timedelta(seconds=3)).isoformat(),
+    }).json()
+    assert len(body["sessions"]) == 4
+    assert sum(body["counts"].values()) == 4
+
+
+def test_page_size_is_bounded_and_bad_cursor_rejected():
+    body = client.get("/api/admin/sessions", params={"limit": 10_000}).json()
+    assert len(body["sessions"]) <= 500
+    assert client.get("/api/admin/sessions", params={"cursor": "not-a-cursor"}).status_code == 400
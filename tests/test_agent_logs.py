@@ -0,0 +1,77 @@
+import json
+import uuid
+from datetime import datetime
+
+from alembic import command
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlmodel import Session
+
+from main import app
+from app.core.db import alembic_config, build_engine, engine, init_db
+from app.models.domain_models import SimulationSession
+from app.services.agent_logs import ZSTD_JSON, agent_log_data, new_agent_log
+
+client = TestClient(app)
+
+LOG = {
+    "sales_agent": {"proposed_amount": 500000, "tenure_months": 36},
+    "underwriting_agent": {"approved": False, "reason": "credit score below threshold"},
+    "emotion_agent": {"sentiment": "anxious"},
+    "prompt": "x" * 2000,
+    "model_latency_ms": 812.4,
+}
+
+
+def test_compact_row_round_trips():
+    al = new_agent_log(uuid.uuid4(), LOG)
+    assert al.log is None and al.encoding == ZSTD_JSON
+    assert len(al.payload) < len(json.dumps(LOG)) / 4
+    assert (al.approved, al.reason, al.sentiment, al.model_latency_ms) == (
+        False, "credit score below threshold", "anxious", 812.4
+    )
+    assert agent_log_data(al) == LOG
+
+
+def test_admin_agent_log_summary_and_full():
+    init_db()
+    with Session(engine) as db:
+        sess = SimulationSession()
+        db.add(sess); db.commit(); db.refresh(sess)
+        db.add(new_agent_log(sess.id, LOG)); db.commit()
+        sid = sess.id
+
+    full = client.get(f"/api/admin/sessions/{sid}/agent-log").json()["logs"]
+    assert full[0]["log"] == LOG
+    summary = client.get(f"/api/admin/sessions/{sid}/agent-log", params={"summary": True}).json()["logs"]
+    assert summary[0]["sentiment"] == "anxious" and "log" not in summary[0]
+    assert client.get(f"/api/admin/sessions/{sid}/last-prompt").json()["last_log"]["prompt"] == LOG["prompt"]
+
+
+def test_migration_compacts_existing_rows(tmp_path):
+    url = f"sqlite:///{tmp_path / 'legacy.db'}"
+    cfg = alembic_config(url)
+    command.upgrade(cfg, "0003")
+    eng = build_engine(url)
+    sid, lid = uuid.uuid4().hex, uuid.uuid4().hex
+    with eng.begin() as conn:
+        conn.execute(
+            text("INSERT INTO simulationsession (id, status, created_at, updated_at) VALUES (:id, 'ACTIVE', :now, :now)"),
+            {"id": sid, "now": datetime.utcnow()},
+        )
+        conn.execute(
+            text("INSERT INTO agentlog (id, session_id, log, created_at) VALUES (:id, :sid, :log, :now)"),
+            {"id": lid, "sid": sid, "log": json.dumps(LOG), "now": datetime.utcnow()},
+        )
+
+    command.upgrade(cfg, "head")
+    with eng.connect() as conn:
+        log, approved, sentiment, encoding = conn.execute(
+            text("SELECT log, approved, sentiment, encoding FROM agentlog")
+        ).one()
+    assert log is None and approved == 0 and sentiment == "anxious" and encoding == ZSTD_JSON
+
+    command.downgrade(cfg, "0003")
+    with eng.connect() as conn:
+        assert json.loads(conn.execute(text("SELECT log FROM agentlog")).scalar()) == LOG
+    eng.dispose()
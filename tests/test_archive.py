@@ -0,0 +1,129 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+from sqlmodel import Session, select
+
+from main import app
+from app.core.db import engine, init_db
+from app.models.domain_models import (
+    AgentLog, ArchivedSession, Message, Offer, SessionStatus, SimulationSession, StoredBlob, UploadedDocument,
+    UserProfile,
+)
+from app.services import archive
+from app.services.archive import archive_sessions
+from app.services.storage import LocalStorage, session_key, set_storage
+from app.services.uploads import collect_unreferenced_blobs
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def storage(tmp_path):
+    init_db()
+    backend = LocalStorage(str(tmp_path))
+    set_storage(backend)
+    yield backend
+    set_storage(None)
+
+
+def _closed_session(customer_id: str, status: SessionStatus, days_ago: int) -> uuid.UUID:
+    sid = client.post(f"/api/sessions/start?customer_id={customer_id}", json={}).json()["session_id"]
+    client.post(f"/api/sessions/{sid}/message", json={"sender": "user", "text": "I need a loan"})
+    client.post(
+        f"/api/sessions/{sid}/upload-salary",
+        files={"file": ("slip.pdf", b"%PDF-1.4 " + uuid.uuid4().bytes, "application/pdf")},
+        data={"declared_salary": "50000"},
+    )
+    sid = uuid.UUID(sid)
+    with Session(engine) as db:
+        # straight SQL: an ORM write would bump updated_at back to now
+        db.execute(update(SimulationSession).where(SimulationSession.id == sid).values(
+            status=status, updated_at=datetime.utcnow() - timedelta(days=days_ago),
+        ))
+        db.commit()
+    return sid
+
+
+def _hot_rows(db, sid):
+    return sum(
+        len(db.exec(select(model).where(model.session_id == sid)).all())
+        for model in (UserProfile, Message, Offer, AgentLog, UploadedDocument)
+    ) + (db.get(SimulationSession, sid) is not None)
+
+
+def test_old_closed_sessions_move_to_cold_storage(storage):
+    customer = f"ARCH_{uuid.uuid4().hex[:8]}"
+    old = _closed_session(customer, SessionStatus.COMPLETED, days_ago=200)
+    recent = _closed_session(customer, SessionStatus.REJECTED, days_ago=10)
+    with Session(engine) as db:
+        messages_before = len(db.exec(select(Message).where(Message.session_id == old)).all())
+        assert messages_before > 0
+
+        assert archive_sessions(db, after_days=180) >= 1
+        assert _hot_rows(db, old) == 0
+        assert _hot_rows(db, recent) > 0
+        entry = db.get(ArchivedSession, old)
+        assert entry.customer_id == customer and entry.key.startswith("archive-")
+
+    doc = client.get(f"/api/admin/archive/sessions/{old}").json()
+    assert doc["session"]["id"] == str(old)
+    assert len(doc["messages"]) == messages_before
+    assert doc["profiles"] and doc["uploads"]
+    assert client.get(f"/api/admin/archive/sessions/{recent}").status_code == 404
+
+    # the archive keeps its reference: upload GC never takes the slip
+    (upload,) = doc["uploads"]
+    with Session(engine) as db:
+        collect_unreferenced_blobs(db, grace_seconds=0)
+        blob = db.get(StoredBlob, upload["sha256"])
+        assert blob.refcount == 1 and blob.orphaned_at is None
+    assert storage.exists(upload["key"])
+
+
+def test_sessions_share_monthly_partitions_and_decode_independently(storage):
+    customer = f"ARCH_{uuid.uuid4().hex[:8]}"
+    sids = [_closed_session(customer, SessionStatus.COMPLETED, days_ago=400) for _ in range(3)]
+    with Session(engine) as db:
+        archive_sessions(db, after_days=365)
+        entries = [db.get(ArchivedSession, sid) for sid in sids]
+    assert len({e.key for e in entries}) == 1  # started in the same month, archived in one run
+    assert sorted(e.frame_offset for e in entries)[0] == 0
+    for sid in sids:
+        assert client.get(f"/api/admin/archive/sessions/{sid}").json()["session"]["id"] == str(sid)
+
+
+def test_persisted_letters_move_to_cold_storage(storage):
+    sid = _closed_session(f"ARCH_{uuid.uuid4().hex[:8]}", SessionStatus.COMPLETED, days_ago=200)
+    key = session_key(sid, "sanction_abcd1234.pdf")
+    storage.put(key, b"%PDF-1.4 letter", content_type="application/pdf")
+
+    with Session(engine) as db:
+        archive_sessions(db, after_days=180)
+    assert list(storage.root.rglob("*.ndjson.zst"))
+    assert not storage.exists(key)
+    (f,) = client.get(f"/api/admin/archive/sessions/{sid}").json()["files"]
+    assert f["key"] == key and f["archived_key"].startswith("archive-")
+    assert storage.get(f["archived_key"]) == b"%PDF-1.4 letter"
+
+
+def test_failed_commit_removes_the_runs_partitions(storage, monkeypatch):
+    sid = _closed_session(f"ARCH_{uuid.uuid4().hex[:8]}", SessionStatus.COMPLETED, days_ago=200)
+    letter = session_key(sid, "sanction_abcd1234.pdf")
+    storage.put(letter, b"%PDF-1.4 letter", content_type="application/pdf")
+
+    def fail(conn, customer_ids):
+        raise RuntimeError("database went away")
+
+    monkeypatch.setattr(archive, "invalidate_dashboards", fail)
+    with Session(engine) as db:
+        with pytest.raises(RuntimeError):
+            archive_sessions(db, after_days=180)
+        assert db.get(SimulationSession, sid) is not None
+        assert db.get(ArchivedSession, sid) is None
+    assert not list(storage.root.rglob("*.ndjson.zst"))
+    assert storage.exists(letter)
+    # nor is the letter's cold copy left behind
+    assert not [p for p in storage.root.rglob("*") if p.is_file() and "archive-" in str(p)]
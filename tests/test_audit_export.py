@@ -0,0 +1,69 @@
+import json
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from main import app
+from app.core.config import settings
+from app.core.db import engine, init_db
+from app.models.domain_models import Message, SimulationSession
+from app.services.agent_logs import new_agent_log
+
+client = TestClient(app)
+START = datetime(2025, 3, 1)
+
+
+def _seed():
+    init_db()
+    with Session(engine) as db:
+        sess = SimulationSession()
+        db.add(sess); db.commit(); db.refresh(sess)
+        for i in range(5):
+            at = START + timedelta(minutes=i)
+            db.add(Message(session_id=sess.id, sender="user", text=f"turn {i}", created_at=at))
+            al = new_agent_log(sess.id, {"emotion_agent": {"sentiment": "neutral"}, "turn": i})
+            al.created_at = at
+            db.add(al)
+        db.commit()
+        return sess.id
+
+
+def _lines(body: bytes):
+    return [json.loads(line) for line in body.decode().splitlines()]
+
+
+def test_export_streams_logs_then_messages_and_resumes(monkeypatch):
+    monkeypatch.setattr(settings, "AUDIT_EXPORT_BATCH_ROWS", 2)  # several partitions and chunks
+    sid = _seed()
+
+    rows = _lines(client.get("/api/admin/export/audit", params={"session_id": str(sid)}).content)
+    assert rows[-1] == {"type": "end", "rows": 10}
+    assert [r["type"] for r in rows[:-1]] == ["agent_log"] * 5 + ["message"] * 5
+    assert [r["log"]["turn"] for r in rows[:5]] == list(range(5))
+
+    resumed = _lines(client.get("/api/admin/export/audit", params={
+        "session_id": str(sid), "cursor": rows[6]["cursor"],
+    }).content)
+    assert [r["id"] for r in resumed[:-1]] == [r["id"] for r in rows[7:-1]]
+
+
+def test_export_gzip_and_date_range():
+    sid = _seed()
+    resp = client.get(
+        "/api/admin/export/audit",
+        params={"session_id": str(sid), "created_from": (START + timedelta(minutes=3)).isoformat()},
+        headers={"accept-encoding": "gzip"},
+    )
+    assert resp.headers["content-encoding"] == "gzip"
+    assert resp.headers["content-type"] == "application/x-ndjson"
+    rows = _lines(resp.content)  # httpx undoes the gzip transfer encoding
+    assert rows[-1]["rows"] == 4
+    assert {r["type"] for r in rows[:-1]} == {"agent_log", "message"}
+
+
+def test_export_requires_a_scope_and_a_valid_cursor():
+    assert client.get("/api/admin/export/audit").status_code == 400
+    assert client.get("/api/admin/export/audit", params={
+        "created_from": START.isoformat(), "cursor": "bogus.xyz",
+    }).status_code == 400
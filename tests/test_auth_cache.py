@@ -0,0 +1,97 @@
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from jose import jwt
+from sqlalchemy import event
+from sqlmodel import Session
+
+from main import app
+from app.core.config import settings
+from app.core.db import engine, get_async_engine, init_db
+from app.models.domain_models import User
+from app.services import jwt_service
+from app.services.jwt_service import create_access_token
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def user():
+    init_db()
+    jwt_service._token_cache.clear()
+    jwt_service._user_cache.clear()
+    cid = f"AUTH_{uuid.uuid4().hex[:8]}"
+    with Session(engine) as db:
+        u = User(customer_id=cid, name="Cache User", email=f"{cid.lower()}@example.com", phone="9000000000")
+        db.add(u); db.commit(); db.refresh(u)
+        return u
+
+
+def _auth(token):
+    return {"authorization": f"Bearer {token}"}
+
+
+def _count_user_selects():
+    seen = []
+
+    def record(conn, cursor, statement, *args):
+        if 'FROM "user"' in statement or "FROM user" in statement:
+            seen.append(statement)
+
+    return seen, record
+
+
+def test_second_request_needs_no_decode_and_no_db(user, monkeypatch):
+    token = create_access_token({"sub": user.customer_id})
+    assert client.get("/api/me", headers=_auth(token)).json()["customer_id"] == user.customer_id
+
+    decodes = []
+    monkeypatch.setattr(jwt_service.jwt, "decode", lambda *a, **k: decodes.append(1))
+    seen, record = _count_user_selects()
+    sync_engine = get_async_engine().sync_engine
+    event.listen(sync_engine, "before_cursor_execute", record)
+    try:
+        assert client.get("/api/me", headers=_auth(token)).json()["phone"] == "9000000000"
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", record)
+    assert decodes == [] and seen == []
+
+
+def test_snapshot_leaves_out_the_password_hash(user):
+    with Session(engine) as db:
+        db.get(User, user.id).password_hash = "$2b$04$not-a-real-hash"
+        db.commit()
+    token = create_access_token({"sub": user.customer_id})
+    assert client.get("/api/me", headers=_auth(token)).status_code == 200
+    snapshot = jwt_service._user_cache.get(user.customer_id)
+    assert snapshot["customer_id"] == user.customer_id
+    assert "password_hash" not in snapshot
+
+
+def test_save_profile_invalidates_the_snapshot(user):
+    token = create_access_token({"sub": user.customer_id})
+    client.get("/api/me", headers=_auth(token))
+    resp = client.post("/api/user/save-profile", json={"phone": "9111111111"}, headers=_auth(token))
+    assert resp.status_code == 200 and "access_token" not in resp.json()
+    assert client.get("/api/me", headers=_auth(token)).json()["phone"] == "9111111111"
+
+
+def test_profile_claims_skip_the_database(user, monkeypatch):
+    monkeypatch.setattr(settings, "AUTH_PROFILE_CLAIMS", True)
+    token = create_access_token({"sub": user.customer_id}, user=user)
+    with Session(engine) as db:
+        db.delete(db.get(User, user.id)); db.commit()  # only the token knows this user now
+    me = client.get("/api/me", headers=_auth(token)).json()
+    assert (me["name"], me["email"], me["id"]) == (user.name, user.email, str(user.id))
+
+
+def test_cached_claims_do_not_outlive_the_token(user):
+    token = jwt.encode(
+        {"sub": user.customer_id, "exp": datetime.utcnow() + timedelta(seconds=2)}, settings.SECRET_KEY, algorithm="HS256"
+    )
+    assert client.get("/api/me", headers=_auth(token)).status_code == 200
+    time.sleep(3.1)  # jose compares whole seconds
+    assert client.get("/api/me", headers=_auth(token)).status_code == 401
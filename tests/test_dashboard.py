@@ -0,0 +1,104 @@
+import uuid
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from main import app
+from app.core.db import engine, init_db
+from app.models.domain_models import (
+    DashboardSummary, SessionStatus, SimulationSession, User, UserProfile,
+)
+from app.services import dashboard
+from app.services.jwt_service import get_current_user_async
+
+client = TestClient(app)
+
+
+def _profile(customer_id, income):
+    return UserProfile(
+        session_id=uuid.uuid4(), customer_id=customer_id, name="Dash", age=30, income_monthly=income,
+        existing_emi=0, employment_type="salaried", loan_type="personal loan",
+        desired_amount=100000, desired_tenure_months=12,
+    )
+
+
+@pytest.fixture
+def customer(make_offer):
+    init_db()
+    cid = f"DASH_{uuid.uuid4().hex[:8]}"
+    with Session(engine) as db:
+        user = User(customer_id=cid, name="Dash", email=f"{cid}@example.com")
+        mine, theirs = SimulationSession(customer_id=cid), SimulationSession(customer_id="SOMEONE_ELSE")
+        db.add_all([user, mine, theirs]); db.commit()
+        db.add_all([make_offer(mine.id), make_offer(theirs.id, 999.0), _profile(cid, 50000)]); db.commit()
+        db.refresh(user); db.refresh(mine)
+        session_id = mine.id
+    app.dependency_overrides[get_current_user_async] = lambda: user
+    yield cid, session_id
+    app.dependency_overrides.pop(get_current_user_async, None)
+
+
+def test_dashboard_returns_only_the_customers_loans_and_caches(customer, monkeypatch):
+    cid, _ = customer
+    data = client.get("/api/dashboard").json()
+    assert [l["amount"] for l in data["sanctioned_loans"]] == [100000.0]
+    assert data["counts"]["offers_by_status"] == {"Approved": 1}
+    assert data["profile_summary"]["income_monthly"] == 50000
+
+    # second view is served from the materialized row
+    monkeypatch.setattr(dashboard, "compute_summary", lambda *a: pytest.fail("recomputed a cached summary"))
+    assert client.get("/api/dashboard").json()["sanctioned_loans"] == data["sanctioned_loans"]
+
+
+def test_offer_and_profile_writes_invalidate(customer, make_offer):
+    cid, session_id = customer
+    client.get("/api/dashboard")
+
+    with Session(engine) as db:
+        db.add(make_offer(session_id, 250000.0)); db.commit()
+        assert db.get(DashboardSummary, cid).data is None
+    assert len(client.get("/api/dashboard").json()["sanctioned_loans"]) == 2
+
+    with Session(engine) as db:
+        db.add(_profile(cid, 80000)); db.commit()
+    assert client.get("/api/dashboard").json()["profile_summary"]["income_monthly"] == 80000
+
+
+def test_write_during_recompute_is_not_cached(customer, make_offer, monkeypatch):
+    cid, session_id = customer
+    compute = dashboard.compute_summary
+
+    def racing_compute(db, customer_id):
+        data = compute(db, customer_id)
+        with Session(engine) as other:  # lands after the generation was read
+            other.add(make_offer(session_id, 1.0)); other.commit()
+        return data
+
+    monkeypatch.setattr(dashboard, "compute_summary", racing_compute)
+    client.get("/api/dashboard")
+    with Session(engine) as db:
+        assert db.get(DashboardSummary, cid).data is None
+
+
+def test_session_status_and_new_sessions_invalidate(customer):
+    cid, session_id = customer
+    assert client.get("/api/dashboard").json()["counts"]["sessions_by_status"] == {"pending": 1}
+
+    with Session(engine) as db:
+        sess = db.get(SimulationSession, session_id)
+        sess.status = SessionStatus.REJECTED
+        db.add(sess); db.commit()
+    assert client.get("/api/dashboard").json()["counts"]["sessions_by_status"] == {"rejected": 1}
+
+    with Session(engine) as db:
+        db.add(SimulationSession(customer_id=cid)); db.commit()
+    assert client.get("/api/dashboard").json()["counts"]["sessions_by_status"] == {"rejected": 1, "pending": 1}
+
+    # touching a session without changing its status keeps the cached row
+    with Session(engine) as db:
+        sess = db.get(SimulationSession, session_id)
+        sess.updated_at = datetime.utcnow()
+        db.add(sess); db.commit()
+        assert db.get(DashboardSummary, cid).data is not None
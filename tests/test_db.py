@@ -0,0 +1,28 @@
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.db import async_database_url, build_engine, engine_options
+
+
+def test_sqlite_profile_pragmas(tmp_path):
+    eng = build_engine(f"sqlite:///{tmp_path / 'profile.db'}")
+    with eng.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == settings.SQLITE_BUSY_TIMEOUT_MS
+        assert conn.execute(text("PRAGMA cache_size")).scalar() == -settings.SQLITE_CACHE_SIZE_KB
+    eng.dispose()
+
+
+def test_server_profile_pool_options():
+    opts = engine_options("postgresql+psycopg2://u:p@db/finsync")
+    assert opts["pool_size"] == settings.DB_POOL_SIZE
+    assert opts["max_overflow"] == settings.DB_MAX_OVERFLOW
+    assert opts["pool_recycle"] == settings.DB_POOL_RECYCLE_SECONDS
+    assert opts["pool_pre_ping"] is True
+    assert "pool_size" not in engine_options("sqlite:///./x.db")
+
+
+def test_async_url_uses_async_drivers():
+    assert async_database_url("sqlite:///./finsync.db") == "sqlite+aiosqlite:///./finsync.db"
+    assert async_database_url("postgresql+psycopg2://u:p@db:5432/finsync") == "postgresql+asyncpg://u:p@db:5432/finsync"
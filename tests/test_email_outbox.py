@@ -0,0 +1,119 @@
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from main import app
+from app.core.db import engine, init_db
+from app.models.domain_models import EmailOutbox, OutboxStatus
+from app.services import email_outbox
+from app.services.email_templates import loan_confirmation_html
+
+client = TestClient(app)
+
+PAYLOAD = {
+    "name": "Asha",
+    "age": 31,
+    "loan_amount": 250000,
+    "emi": 8123.5,
+    "interest_rate": 12.5,
+    "tenure_months": 36,
+    "email": "asha@example.com",
+}
+
+
+class FakeHttp:
+    def __init__(self, status_code=200, fail_on=()):
+        self.status_code = status_code
+        self.fail_on = set(fail_on)
+        self.calls = []
+
+    def post(self, url, headers=None, json=None):
+        self.calls.append((headers["Idempotency-Key"], json))
+        status = 500 if len(self.calls) in self.fail_on else self.status_code
+        n = len(self.calls)
+
+        class Resp:
+            status_code = status
+            text = "error"
+
+            def json(self_inner):
+                return {"id": f"re_{n}"}
+
+        return Resp()
+
+
+@pytest.fixture(autouse=True)
+def _env(monkeypatch):
+    init_db()
+    with Session(engine) as db:
+        for row in db.exec(select(EmailOutbox)).all():
+            db.delete(row)
+        db.commit()
+    monkeypatch.setenv("RESEND_API_KEY", "re_test")
+    monkeypatch.setenv("SENDER_EMAIL", "loans@finsync.test")
+
+
+def test_endpoint_queues_and_returns_202():
+    resp = client.post("/api/email/send-loan-confirmation", json=PAYLOAD)
+    assert resp.status_code == 202
+    with Session(engine) as db:
+        row = db.exec(select(EmailOutbox)).one()
+    assert row.status == OutboxStatus.PENDING
+    assert "₹250,000.00" in row.html
+
+
+def test_flush_sends_each_row_under_its_own_key(monkeypatch):
+    fake = FakeHttp()
+    monkeypatch.setattr(email_outbox, "_http", lambda: fake)
+    for _ in range(5):
+        client.post("/api/email/send-loan-confirmation", json=PAYLOAD)
+
+    assert email_outbox.flush_outbox(batch_size=10) == 5
+    with Session(engine) as db:
+        rows = db.exec(select(EmailOutbox)).all()
+    assert {r.status for r in rows} == {OutboxStatus.SENT}
+    assert all(r.provider_message_id for r in rows)
+    assert sorted(key for key, _ in fake.calls) == sorted(f"outbox-{r.id}" for r in rows)
+
+
+def test_one_failed_send_leaves_the_rest_of_the_batch_sent(monkeypatch):
+    fake = FakeHttp(fail_on={2})
+    monkeypatch.setattr(email_outbox, "_http", lambda: fake)
+    for _ in range(3):
+        client.post("/api/email/send-loan-confirmation", json=PAYLOAD)
+
+    assert email_outbox.flush_outbox(batch_size=10) == 3
+    failed_key = fake.calls[1][0]
+    with Session(engine) as db:
+        rows = db.exec(select(EmailOutbox)).all()
+    assert sorted(r.status for r in rows) == sorted([OutboxStatus.SENT, OutboxStatus.SENT, OutboxStatus.PENDING])
+    (retry,) = [r for r in rows if r.status == OutboxStatus.PENDING]
+    assert f"outbox-{retry.id}" == failed_key
+
+    # the retry goes out under the same key, on its own
+    with Session(engine) as db:
+        db.get(EmailOutbox, retry.id).next_attempt_at = datetime.utcnow()
+        db.commit()
+    assert email_outbox.flush_outbox() == 1
+    assert fake.calls[-1][0] == failed_key
+
+
+def test_failed_batch_is_retried_later(monkeypatch):
+    monkeypatch.setattr(email_outbox, "_http", lambda: FakeHttp(status_code=503))
+    client.post("/api/email/send-loan-confirmation", json=PAYLOAD)
+
+    assert email_outbox.flush_outbox() == 1
+    with Session(engine) as db:
+        row = db.exec(select(EmailOutbox)).one()
+    assert row.status == OutboxStatus.PENDING
+    assert row.attempts == 1
+    assert row.next_attempt_at > datetime.utcnow()
+    # backing off: nothing due right now
+    assert email_outbox.flush_outbox() == 0
+
+
+def test_template_escapes_values():
+    html = loan_confirmation_html("<script>", 30, 1, 1, 1, 1)
+    assert "<script>" not in html and "&lt;script&gt;" in html
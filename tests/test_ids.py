@@ -0,0 +1,46 @@
+import threading
+import time
+import uuid
+
+from sqlmodel import Session
+
+from app.core.db import engine, init_db
+from app.core.ids import uuid7, uuid7_time
+from app.models.domain_models import Message, SimulationSession
+
+
+def test_uuid7_layout_and_time():
+    before = time.time()
+    u = uuid7()
+    assert u.version == 7 and u.variant == uuid.RFC_4122
+    assert before - 0.01 <= uuid7_time(u) <= time.time() + 0.01
+
+
+def test_uuid7_strictly_increasing_within_a_millisecond_and_across_threads():
+    ids = [uuid7() for _ in range(20000)]
+    assert ids == sorted(ids) and len(set(ids)) == len(ids)
+    assert str(ids[0]) < str(ids[-1])  # text form sorts the same way
+
+    seen = []
+    def burst():
+        seen.extend(uuid7() for _ in range(2000))
+    threads = [threading.Thread(target=burst) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(set(seen)) == len(seen)
+
+
+def test_new_rows_get_v7_ids_and_v4_rows_still_load():
+    init_db()
+    with Session(engine) as db:
+        sess = SimulationSession()
+        db.add(sess); db.commit(); db.refresh(sess)
+        legacy = Message(id=uuid.uuid4(), session_id=sess.id, sender="user", text="old key")
+        fresh = Message(session_id=sess.id, sender="user", text="new key")
+        db.add_all([legacy, fresh]); db.commit()
+        legacy_id, fresh_id = legacy.id, fresh.id
+        db.expunge_all()
+        assert fresh_id.version == 7
+        assert db.get(Message, legacy_id).text == "old key"
@@ -0,0 +1,189 @@
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from main import app
+from app.core.config import settings
+from app.core.db import engine, init_db
+from app.models.domain_models import Job, JobStatus, SimulationSession, UserProfile
+from app.services import job_handlers
+from app.services.job_handlers import enqueue_sanction_letter
+from app.services.job_queue import claim_next_job, enqueue_job, job_handler, run_job, run_pending_jobs
+from app.services.storage import get_storage
+
+client = TestClient(app)
+
+calls = []
+
+
+@job_handler("test_echo")
+def _echo(db, payload):
+    calls.append(payload["value"])
+    return {"echo": payload["value"]}
+
+
+@job_handler("test_fail")
+def _fail(db, payload):
+    raise RuntimeError("boom")
+
+
+@job_handler("test_slow")
+def _slow(db, payload):
+    time.sleep(payload["seconds"])
+    with Session(engine) as other:
+        stolen = claim_next_job(other, "w2")
+    return {"stolen": stolen is not None}
+
+
+@pytest.fixture(autouse=True)
+def _schema():
+    init_db()
+    # keep jobs from other tests out of the way
+    with Session(engine) as db:
+        for job in db.exec(select(Job)).all():
+            db.delete(job)
+        db.commit()
+    calls.clear()
+
+
+def test_chain_runs_in_order_and_status_endpoint_reports_steps():
+    with Session(engine) as db:
+        job = enqueue_job(db, "test_echo", {"value": 1}, then=[{"kind": "test_echo", "payload": {"value": 2}}])
+
+    assert run_pending_jobs() == 2
+    assert calls == [1, 2]
+
+    resp = client.get(f"/api/jobs/{job.id}")
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["chain_status"] == "succeeded"
+    assert [s["result"]["echo"] for s in body["steps"]] == [1, 2]
+
+
+def test_failed_job_backs_off_then_fails_after_max_attempts():
+    with Session(engine) as db:
+        job = enqueue_job(db, "test_fail", {})
+        job.max_attempts = 2
+        db.add(job); db.commit()
+
+        claimed = claim_next_job(db, "w1")
+        run_job(db, claimed)
+        db.refresh(job)
+        assert job.status == JobStatus.PENDING
+        assert job.run_after > datetime.utcnow()
+        assert job.last_error == "boom"
+
+        # not due yet
+        assert claim_next_job(db, "w1") is None
+
+        claimed = claim_next_job(db, "w1", now=job.run_after + timedelta(seconds=1))
+        run_job(db, claimed)
+        db.refresh(job)
+        assert job.status == JobStatus.FAILED
+        assert job.attempts == 2
+
+
+def test_expired_lease_is_reclaimed():
+    with Session(engine) as db:
+        job = enqueue_job(db, "test_echo", {"value": 3})
+        first = claim_next_job(db, "w1")
+        assert first.id == job.id
+        # a live lease is not claimable by another worker
+        assert claim_next_job(db, "w2") is None
+
+        later = datetime.utcnow() + timedelta(hours=1)
+        second = claim_next_job(db, "w2", now=later)
+        assert second.id == job.id
+        assert second.lease_owner == "w2"
+        assert second.attempts == 2
+
+
+def test_worker_that_lost_its_lease_does_not_record_an_outcome():
+    with Session(engine) as db:
+        job = enqueue_job(db, "test_echo", {"value": 4}, then=[{"kind": "test_echo", "payload": {"value": 5}}])
+        stale = claim_next_job(db, "w1")
+        with Session(engine) as other:
+            claim_next_job(other, "w2", now=datetime.utcnow() + timedelta(hours=1))
+
+        run_job(db, stale)  # w1 finishes after its lease was reclaimed
+        assert stale.status == JobStatus.RUNNING and stale.lease_owner == "w2"
+        assert stale.result is None
+        assert db.exec(select(Job).where(Job.parent_id == job.id)).all() == []
+
+
+def test_expired_lease_on_last_attempt_fails_the_job():
+    with Session(engine) as db:
+        job = enqueue_job(db, "test_echo", {"value": 6})
+        job.max_attempts = 1
+        db.add(job); db.commit()
+        claim_next_job(db, "w1")
+
+        assert claim_next_job(db, "w2", now=datetime.utcnow() + timedelta(hours=1)) is None
+        db.refresh(job)
+        assert job.status == JobStatus.FAILED
+        assert job.lease_owner is None and job.finished_at is not None
+        assert calls == []
+
+
+def test_lease_is_renewed_while_the_handler_runs(monkeypatch):
+    monkeypatch.setattr(settings, "JOB_LEASE_SECONDS", 0.3)
+    with Session(engine) as db:
+        job = enqueue_job(db, "test_slow", {"seconds": 0.6})
+    assert run_pending_jobs("w1") == 1
+    with Session(engine) as db:
+        job = db.get(Job, job.id)
+        assert job.status == JobStatus.SUCCEEDED
+        assert job.result == {"stolen": False}
+
+
+def test_finalize_enqueues_sanction_letter():
+    start = client.post("/api/sessions/start?customer_id=CUST_JOBS", json={})
+    sid = start.json()["session_id"]
+    with Session(engine) as db:
+        profile = db.exec(select(UserProfile).where(UserProfile.session_id == uuid.UUID(sid))).first()
+        profile.desired_amount = 40000.0
+        profile.desired_tenure_months = 12
+        db.add(profile); db.commit()
+
+    resp = client.post(f"/api/sessions/{sid}/finalize", data={"approved": "true"})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["job_id"]
+    assert not get_storage().exists(body["pdf_path"])
+
+    run_pending_jobs()
+    assert get_storage().exists(body["pdf_path"])
+    assert client.get(body["pdf_url"]).content.startswith(b"%PDF")
+    status = client.get(f"/api/jobs/{body['job_id']}").json()
+    assert status["chain_status"] == "succeeded"
+    assert [s["kind"] for s in status["steps"]] == ["render_pdf"]
+
+
+def test_letter_email_still_goes_out_when_metadata_stamping_fails(monkeypatch):
+    sent = []
+    monkeypatch.setattr(job_handlers, "augment_pdf_bytes", lambda data, metadata: 1 / 0)
+    monkeypatch.setattr(job_handlers, "send_email_smtp", lambda **kw: sent.append(kw))
+
+    with Session(engine) as db:
+        sess = SimulationSession(customer_id="CUST_JOBS")
+        db.add(sess); db.commit(); db.refresh(sess)
+        key = f"{sess.id}/sanction_stamp.pdf"
+        job = enqueue_sanction_letter(
+            db, sess.id, key, "Jobs User",
+            {"amount": 1000, "tenure_months": 12, "interest_rate": 13.5, "monthly_emi": 0,
+             "status": "Approved", "reason_summary": "test"},
+            {}, "stamp001",
+            email={"to_email": "jobs@example.com", "subject": "Letter", "body": "Attached."},
+        )
+
+    run_pending_jobs()
+    status = client.get(f"/api/jobs/{job.id}").json()
+    assert status["chain_status"] == "succeeded"
+    assert status["steps"][0]["result"]["stamped"] is False
+    (mail,) = sent
+    assert mail["attachments"][0][1].startswith(b"%PDF")
+    get_storage().delete(key)
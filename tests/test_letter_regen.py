@@ -0,0 +1,72 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import Session, select
+
+from app.core.db import engine, init_db
+from app.models.domain_models import LetterRegenRun, Offer, OfferStatus, SimulationSession, UserProfile
+from app.services.agent_logs import new_agent_log
+from app.services.letter_regen import _build_tasks, regenerate_letters
+from app.services.storage import get_storage
+
+
+@pytest.fixture()
+def approved_offers():
+    init_db()
+    with Session(engine) as db:
+        for o in db.exec(select(Offer)).all():
+            db.delete(o)
+        db.commit()
+        base = datetime.utcnow() - timedelta(days=1)
+        for i in range(3):
+            sess = SimulationSession(customer_id=f"REGEN_{i}")
+            db.add(sess); db.commit(); db.refresh(sess)
+            db.add(UserProfile(
+                session_id=sess.id, name=f"Regen {i}", age=30, income_monthly=50000, existing_emi=0,
+                employment_type="salaried", loan_type="personal", desired_amount=10000, desired_tenure_months=12,
+            ))
+            db.add(Offer(
+                session_id=sess.id, requested_amount=10000, amount=10000, tenure_months=12,
+                interest_rate=13.5, monthly_emi=900, status=OfferStatus.APPROVED,
+                reason_summary="ok", created_at=base + timedelta(minutes=i),
+            ))
+        db.commit()
+
+
+def test_regeneration_resumes_after_interruption(approved_offers):
+    gen = regenerate_letters(chunk_size=2, workers=1)
+    first = next(gen)
+    assert first["processed"] == 2 and first["total"] == 3
+    gen.close()  # simulate the client going away mid-run
+
+    with Session(engine) as db:
+        run = db.get(LetterRegenRun, uuid.UUID(first["run_id"]))
+        assert run.status == "interrupted"
+
+    progress = list(regenerate_letters(run_id=run.id, chunk_size=2, workers=1))
+    final = progress[-1]
+    assert final["status"] == "completed"
+    assert final["processed"] == 3 and final["failed"] == 0
+    assert final["letters_per_second"]
+
+    with Session(engine) as db:
+        offers = db.exec(select(Offer)).all()
+    assert len({o.sanction_letter_key for o in offers}) == 3
+    assert all(get_storage().get(o.sanction_letter_key).startswith(b"%PDF") for o in offers)
+    for o in offers:
+        get_storage().delete(o.sanction_letter_key)
+
+
+def test_tasks_use_the_latest_agent_log(approved_offers):
+    with Session(engine) as db:
+        offer = db.exec(select(Offer)).first()
+        base = datetime.utcnow()
+        for i, stage in enumerate(("offer", "final", "early")):
+            al = new_agent_log(offer.session_id, {"stage": stage})
+            al.created_at = base + timedelta(seconds=(1, 2, 0)[i])
+            db.add(al)
+        db.commit()
+
+        (task,) = _build_tasks(db, LetterRegenRun(total=1), [offer])
+    assert task["agent_log"] == {"stage": "final"}
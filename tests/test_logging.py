@@ -0,0 +1,107 @@
+import io
+import json
+import logging
+import logging.handlers
+import queue
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from app.core.db import init_db
+from app.core.log import JsonFormatter, RequestIdFilter, SampleFilter, _QueueHandler, request_id
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def pipeline():
+    """A private queue -> listener -> JSON-lines buffer, on its own logger."""
+    q = queue.Queue(maxsize=100)
+    handler = _QueueHandler(q)
+    handler.addFilter(RequestIdFilter())
+    out = io.StringIO()
+    stream = logging.StreamHandler(out)
+    stream.setFormatter(JsonFormatter())
+    listener = logging.handlers.QueueListener(q, stream)
+    log = logging.getLogger("test.finsync.logging")
+    log.propagate = False
+    log.setLevel(logging.DEBUG)
+    log.addHandler(handler)
+    listener.start()
+
+    def lines():
+        listener.stop()
+        return [json.loads(line) for line in out.getvalue().splitlines()]
+
+    yield log, handler, lines
+    log.removeHandler(handler)
+
+
+def test_json_lines_carry_request_id_extras_and_traceback(pipeline):
+    log, _, lines = pipeline
+    token = request_id.set("req-1")
+    try:
+        log.info("login %s", "ok", extra={"customer_id": "CUST_1"})
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            log.exception("boom")
+    finally:
+        request_id.reset(token)
+    log.warning("outside")
+
+    first, second, third = lines()
+    assert first["msg"] == "login ok"
+    assert first["level"] == "INFO"
+    assert first["request_id"] == "req-1"
+    assert first["customer_id"] == "CUST_1"
+    assert "ZeroDivisionError" in second["exc"]
+    assert "request_id" not in third
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = _QueueHandler(queue.Queue(maxsize=2))
+    log = logging.getLogger("test.finsync.logging.full")
+    log.propagate = False
+    log.addHandler(handler)
+    try:
+        for i in range(5):
+            log.warning("record %s", i)
+    finally:
+        log.removeHandler(handler)
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+
+
+def test_sampling_keeps_warnings():
+    f = SampleFilter({"hot": 0.0})
+    rec = lambda name, level: logging.LogRecord(name, level, "", 0, "m", None, None)
+    assert not f.filter(rec("hot", logging.INFO))
+    assert f.filter(rec("hot", logging.WARNING))
+    assert f.filter(rec("cold", logging.INFO))
+
+
+def test_request_id_header_is_bound_and_echoed():
+    init_db()
+    seen = []
+
+    class Capture(logging.Handler):
+        def emit(self, record):
+            seen.append(record.request_id)
+
+    capture = Capture()
+    capture.addFilter(RequestIdFilter())
+    log = logging.getLogger("app.api.routes_auth")
+    log.addHandler(capture)
+    try:
+        r = client.post("/api/auth/login", data={"username": "nobody@example.com", "password": "x"},
+                        headers={"X-Request-ID": "abc123"})
+    finally:
+        log.removeHandler(capture)
+    assert r.status_code == 401
+    assert r.headers["x-request-id"] == "abc123"
+    assert seen == ["abc123"]
+
+    generated = client.get("/api/health").headers["x-request-id"]
+    assert len(generated) == 32
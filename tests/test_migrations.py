@@ -0,0 +1,99 @@
+import json
+import uuid
+from datetime import datetime
+
+import pytest
+from alembic import command
+from sqlalchemy import inspect, text
+
+from app.core.config import settings
+from app.core.db import alembic_config, build_engine, check_schema_version, schema_revisions
+from app.services.agent_logs import decode_log
+
+
+@pytest.fixture
+def migrated(tmp_path):
+    url = f"sqlite:///{tmp_path / 'migrated.db'}"
+    command.upgrade(alembic_config(url), "head")
+    eng = build_engine(url)
+    yield url, eng
+    eng.dispose()
+
+
+def test_migrations_match_models(migrated):
+    url, _ = migrated
+    command.check(alembic_config(url))  # raises if the models drifted from the revisions
+
+
+def test_schema_version_check(tmp_path, migrated, monkeypatch):
+    _, eng = migrated
+    current, head = schema_revisions(eng)
+    assert current == head
+    check_schema_version(eng)
+
+    fresh = build_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    with pytest.raises(RuntimeError, match="alembic upgrade head"):
+        check_schema_version(fresh)
+    monkeypatch.setattr(settings, "DB_MIGRATE_ON_STARTUP", True)
+    check_schema_version(fresh)
+    assert schema_revisions(fresh)[0] == head
+    fresh.dispose()
+
+
+def test_stamped_create_all_database_upgrades_to_head(tmp_path):
+    url = f"sqlite:///{tmp_path / 'legacy.db'}"
+    cfg = alembic_config(url)
+    command.upgrade(cfg, "0001")  # the tables the old create_all() startup made
+    eng = build_engine(url)
+    assert set(inspect(eng).get_table_names()) == {
+        "alembic_version", "user", "simulationsession", "userprofile", "message", "offer", "agentlog",
+    }
+    command.upgrade(cfg, "head")
+    command.check(cfg)
+    eng.dispose()
+
+
+@pytest.mark.parametrize("sql, index", [
+    ("SELECT * FROM message WHERE session_id = :s ORDER BY created_at", "ix_message_session_id_created_at"),
+    ("SELECT * FROM agentlog WHERE session_id = :s ORDER BY created_at DESC LIMIT 1", "ix_agentlog_session_id_created_at"),
+    ("SELECT * FROM userprofile WHERE customer_id = :s ORDER BY created_at DESC LIMIT 1", "ix_userprofile_customer_id_created_at"),
+    ("SELECT * FROM offer WHERE session_id = :s AND status = 'APPROVED'", "ix_offer_session_id_status"),
+    ("SELECT * FROM simulationsession ORDER BY created_at DESC, id DESC LIMIT 51", "ix_simulationsession_created_at_id"),
+    ("SELECT * FROM message WHERE created_at >= :s ORDER BY created_at, id", "ix_message_created_at_id"),
+    ("SELECT * FROM agentlog WHERE created_at >= :s ORDER BY created_at, id", "ix_agentlog_created_at_id"),
+    ("SELECT * FROM simulationsession WHERE status = 'PENDING' ORDER BY created_at DESC, id DESC LIMIT 51",
+     "ix_simulationsession_status_created_at_id"),
+    ("SELECT * FROM simulationsession WHERE customer_id = :s ORDER BY created_at DESC, id DESC LIMIT 51",
+     "ix_simulationsession_customer_id_created_at_id"),
+])
+def test_hot_queries_use_composite_indexes(migrated, sql, index):
+    _, eng = migrated
+    with eng.connect() as conn:
+        plan = " ".join(row[-1] for row in conn.execute(text("EXPLAIN QUERY PLAN " + sql), {"s": "x"}))
+    assert index in plan
+    assert "TEMP B-TREE" not in plan  # no separate sort step
+
+
+def test_agent_log_compaction_round_trips(tmp_path):
+    url = f"sqlite:///{tmp_path / 'agentlog.db'}"
+    cfg = alembic_config(url)
+    command.upgrade(cfg, "0003")
+    eng = build_engine(url)
+    sid, log_id = uuid.uuid4(), uuid.uuid4()
+    log = {"underwriting_agent": {"approved": True, "offer": {"reason_summary": "ok"}}, "model_latency_ms": 12}
+    with eng.begin() as conn:
+        conn.execute(text("INSERT INTO simulationsession (id, status, created_at, updated_at) VALUES (:id, 'COMPLETED', :t, :t)"),
+                     {"id": sid.hex, "t": datetime(2026, 1, 1)})
+        conn.execute(text("INSERT INTO agentlog (id, session_id, log, created_at) VALUES (:id, :s, :log, :t)"),
+                     {"id": log_id.hex, "s": sid.hex, "log": json.dumps(log), "t": datetime(2026, 1, 1)})
+
+    command.upgrade(cfg, "0004")
+    with eng.connect() as conn:
+        row = conn.execute(text("SELECT log, payload, encoding, approved, reason, model_latency_ms FROM agentlog")).one()
+    assert row.log is None and row.approved and row.reason == "ok" and row.model_latency_ms == 12.0
+    assert decode_log(row.payload, row.encoding) == log  # what the app reads back
+
+    command.downgrade(cfg, "0003")
+    with eng.connect() as conn:
+        assert json.loads(conn.execute(text("SELECT log FROM agentlog")).scalar()) == log
+    eng.dispose()
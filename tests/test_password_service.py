@@ -0,0 +1,96 @@
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from main import app
+from app.core.config import settings
+from app.core.db import engine, init_db
+from app.models.domain_models import User
+from app.api import routes_auth
+from app.services import password_service
+from app.services.password_service import hash_password, needs_rehash, verify_password
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def _cheap_rounds(monkeypatch):
+    init_db()
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 4)
+    password_service.shutdown_password_pool()
+    yield
+    password_service.shutdown_password_pool()
+
+
+def _rounds(hash: str) -> int:
+    return int(hash.split("$")[2])
+
+
+def test_hash_and_verify_in_pool():
+    h = hash_password("s3cret")
+    assert _rounds(h) == 4
+    assert verify_password("s3cret", h)
+    assert not verify_password("wrong", h)
+
+
+def test_full_queue_is_refused_with_503(monkeypatch):
+    monkeypatch.setattr(settings, "PASSWORD_HASH_MAX_PENDING", 1)
+    password_service.shutdown_password_pool()
+    h = hash_password("s3cret")
+
+    _, pending = password_service._get_pool()
+    pending.acquire()  # stand-in for a hash still in flight
+    try:
+        with pytest.raises(HTTPException) as exc:
+            verify_password("s3cret", h)
+        assert exc.value.status_code == 503
+        assert exc.value.headers["Retry-After"] == "1"
+    finally:
+        pending.release()
+    assert verify_password("s3cret", h)
+
+
+def test_slow_hash_times_out_as_503(monkeypatch):
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 12)
+    monkeypatch.setattr(settings, "PASSWORD_HASH_TIMEOUT_SECONDS", 0.01)
+    with pytest.raises(HTTPException) as exc:
+        hash_password("s3cret")
+    assert exc.value.status_code == 503
+
+
+def test_submit_racing_shutdown_is_503(monkeypatch):
+    pool, pending = password_service._get_pool()
+    pool.shutdown(wait=True)  # as if shutdown_password_pool() ran after _get_pool()
+    monkeypatch.setattr(password_service, "_get_pool", lambda: (pool, pending))
+    with pytest.raises(HTTPException) as exc:
+        hash_password("s3cret")
+    assert exc.value.status_code == 503
+    assert pending.acquire(blocking=False)  # the slot was given back
+
+
+def test_login_upgrades_hash_when_cost_changes(monkeypatch):
+    monkeypatch.setattr(routes_auth, "add_customer_to_mocks", lambda customer: None)
+    email = f"{uuid.uuid4().hex[:8]}@example.com"
+    r = client.post("/api/auth/signup", json={"name": "A", "email": email, "phone": "9999999999", "password": "pw123456"})
+    assert r.status_code == 200
+    with Session(engine) as db:
+        old = db.exec(select(User).where(User.email == email)).one().password_hash
+    assert _rounds(old) == 4 and not needs_rehash(old)
+
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 5)
+    assert needs_rehash(old)
+    r = client.post("/api/auth/login", data={"username": email, "password": "pw123456"})
+    assert r.status_code == 200
+    with Session(engine) as db:
+        new = db.exec(select(User).where(User.email == email)).one().password_hash
+    assert _rounds(new) == 5
+    assert verify_password("pw123456", new)
+
+    # a wrong password never rewrites the hash
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 6)
+    assert client.post("/api/auth/login", data={"username": email, "password": "nope"}).status_code == 401
+    with Session(engine) as db:
+        assert db.exec(select(User).where(User.email == email)).one().password_hash == new
@@ -0,0 +1,79 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel
+
+from main import app
+from app.core import replica
+from app.core.config import settings
+from app.core.db import engine, init_db
+from app.models.domain_models import Message, ReplicaHeartbeat, SimulationSession
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def replica_db(tmp_path, monkeypatch):
+    init_db()
+    monkeypatch.setattr(settings, "DATABASE_REPLICA_URL", f"sqlite:///{tmp_path / 'replica.db'}")
+    replica.monitor.reset()
+    eng = replica.replica_engine()
+    SQLModel.metadata.create_all(eng)
+    yield eng
+    asyncio.run(replica.dispose_replica_engines())
+
+
+def _beat(eng, age_seconds: float):
+    # stands in for replication of the primary's heartbeat row
+    with Session(eng) as db:
+        beat = db.get(ReplicaHeartbeat, 1) or ReplicaHeartbeat(id=1)
+        beat.beat_at = datetime.utcnow() - timedelta(seconds=age_seconds)
+        db.add(beat); db.commit()
+    replica.monitor.reset()
+
+
+def _replica_only_session(eng):
+    sid = uuid.uuid4()
+    with Session(eng) as db:
+        db.add(SimulationSession(id=sid, customer_id="REPLICA_ONLY"))
+        db.add(Message(session_id=sid, sender="user", text="from the replica"))
+        db.commit()
+    return sid
+
+
+def test_reads_go_to_fresh_replica(replica_db):
+    sid = _replica_only_session(replica_db)
+    _beat(replica_db, 0.5)
+
+    msgs = client.get(f"/api/sessions/{sid}/messages").json()["messages"]
+    assert [m["text"] for m in msgs] == ["from the replica"]
+    ids = {s["id"] for s in client.get("/api/admin/sessions").json()["sessions"]}
+    assert str(sid) in ids
+
+
+def test_lagging_or_missing_replica_falls_back_to_primary(replica_db, monkeypatch):
+    sid = _replica_only_session(replica_db)
+
+    _beat(replica_db, settings.REPLICA_MAX_LAG_SECONDS + 10)
+    assert client.get(f"/api/sessions/{sid}/messages").json()["messages"] == []
+    assert str(sid) not in {s["id"] for s in client.get("/api/admin/sessions").json()["sessions"]}
+
+    # unreachable replica: no heartbeat table at all
+    monkeypatch.setattr(settings, "DATABASE_REPLICA_URL", "sqlite:////nonexistent/dir/replica.db")
+    asyncio.run(replica.dispose_replica_engines())
+    assert client.get(f"/api/sessions/{sid}/messages").json()["messages"] == []
+
+
+def test_heartbeat_written_on_primary_and_read_sessions_refuse_writes(replica_db):
+    replica.write_heartbeat()
+    with Session(engine) as db:
+        assert (datetime.utcnow() - db.get(ReplicaHeartbeat, 1).beat_at).total_seconds() < 5
+
+    session = next(replica.get_read_session())
+    session.add(SimulationSession())
+    with pytest.raises(replica.ReadOnlySessionError):
+        session.commit()
+    session.close()
@@ -0,0 +1,114 @@
+import io
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from reportlab.pdfgen import canvas
+from sqlmodel import Session, select
+
+from main import app
+from app.core.db import engine, init_db
+from app.models.domain_models import Job, JobStatus, Offer, SalaryExtraction, UserProfile
+from app.services.chat_service import extract_salary_job
+from app.services.job_queue import run_pending_jobs
+from app.services.salary_extraction import parse_salary_text
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def _schema():
+    init_db()
+    with Session(engine) as db:
+        for row in db.exec(select(Job)).all() + db.exec(select(SalaryExtraction)).all():
+            db.delete(row)
+        db.commit()
+
+
+def _payslip(*lines):
+    buf = io.BytesIO()
+    c = canvas.Canvas(buf)
+    y = 800
+    for line in lines:
+        c.drawString(72, y, line)
+        y -= 20
+    c.save()
+    return buf.getvalue()
+
+
+def _start(customer="CUST_62EBFC"):
+    sid = client.post(f"/api/sessions/start?customer_id={customer}", json={}).json()["session_id"]
+    with Session(engine) as db:
+        profile = db.exec(select(UserProfile).where(UserProfile.session_id == uuid.UUID(sid))).first()
+        profile.desired_amount = 100000.0
+        profile.desired_tenure_months = 12
+        db.add(profile); db.commit()
+    return sid
+
+
+def test_parse_salary_text_prefers_net():
+    text = "Basic 30,000 HRA 12,000\nGross Salary : Rs. 1,02,500.00\nNet\nPay (Rs.) 86,250.50 Days 30"
+    assert parse_salary_text(text) == {"net_salary": 86250.5, "gross_salary": 102500.0, "salary": 86250.5}
+    assert parse_salary_text("Total Earnings INR 52000 Days paid 31")["salary"] == 52000.0
+    assert parse_salary_text("Employee code 1234 Net Pay: 30")["salary"] is None
+
+
+def test_upload_is_extracted_off_request_and_cached():
+    slip = _payslip("ACME Pvt Ltd - Payslip", "Gross Salary: Rs. 52,500.00", "Net Pay: Rs. 45,000.00")
+    sid = _start()
+
+    resp = client.post(f"/api/chat/{sid}/upload-salary", files={"file": ("slip.pdf", slip, "application/pdf")})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["status"] == "processing"
+
+    assert run_pending_jobs() == 1
+    with Session(engine) as db:
+        job = db.get(Job, uuid.UUID(body["job_id"]))
+        assert job.status == JobStatus.SUCCEEDED
+        assert job.result["salary"] == 45000.0
+        profile = db.exec(select(UserProfile).where(UserProfile.session_id == uuid.UUID(sid))).first()
+        assert profile.salary_reported == 45000.0
+
+    # the same slip on another session resumes immediately from the cache
+    sid2 = _start()
+    resp = client.post(f"/api/sessions/{sid2}/upload-salary", files={"file": ("again.pdf", slip, "application/pdf")})
+    assert resp.status_code == 200
+    assert resp.json().get("status") != "processing"
+    assert run_pending_jobs() == 0
+    with Session(engine) as db:
+        assert len(db.exec(select(SalaryExtraction)).all()) == 1
+        profile = db.exec(select(UserProfile).where(UserProfile.session_id == uuid.UUID(sid2))).first()
+        assert profile.salary_reported == 45000.0
+
+
+def test_unreadable_slip_still_resumes_underwriting():
+    sid = _start()
+    resp = client.post(f"/api/chat/{sid}/upload-salary", files={"file": ("slip.pdf", b"not a pdf", "application/pdf")})
+    job_id = uuid.UUID(resp.json()["job_id"])
+    run_pending_jobs()
+    with Session(engine) as db:
+        assert db.get(Job, job_id).status == JobStatus.SUCCEEDED
+        row = db.exec(select(SalaryExtraction)).one()
+        assert row.salary is None and row.error
+
+
+def test_retried_extraction_job_does_not_duplicate_the_offer():
+    slip = _payslip("ACME Pvt Ltd - Payslip", "Net Pay: Rs. 95,000.00")
+    sid = _start()
+    with Session(engine) as db:
+        profile = db.exec(select(UserProfile).where(UserProfile.session_id == uuid.UUID(sid))).first()
+        profile.income_monthly = 95000.0  # affordable: underwriting approves
+        db.add(profile); db.commit()
+    resp = client.post(f"/api/chat/{sid}/upload-salary", files={"file": ("slip.pdf", slip, "application/pdf")})
+    job_id = uuid.UUID(resp.json()["job_id"])
+    assert run_pending_jobs() == 1
+    with Session(engine) as db:
+        assert len(db.exec(select(Offer).where(Offer.session_id == uuid.UUID(sid))).all()) == 1
+
+    # the worker died after the offer committed; the lease lapses and the job runs again
+    with Session(engine) as db:
+        job = db.get(Job, job_id)
+        extract_salary_job(db, job.payload)
+        offers = db.exec(select(Offer).where(Offer.session_id == uuid.UUID(sid))).all()
+    assert len(offers) == 1
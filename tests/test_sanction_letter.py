@@ -0,0 +1,93 @@
+import io
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from pypdf import PdfReader
+from sqlmodel import Session
+
+from main import app
+from app.core.config import settings
+from app.core.db import engine, init_db
+from app.models.domain_models import SimulationSession, UserProfile
+from app.services import pdf_mailer
+from app.services.pdf_service import render_sanction_pdf
+from app.services.storage import LocalStorage, set_storage
+
+client = TestClient(app)
+
+OFFER = {
+    "amount": 100000, "tenure_months": 12, "interest_rate": 12.0, "monthly_emi": 8885,
+    "status": "Approved", "reason_summary": "test",
+}
+
+
+@pytest.fixture
+def storage(tmp_path):
+    init_db()
+    backend = LocalStorage(str(tmp_path))
+    set_storage(backend)
+    yield backend
+    set_storage(None)
+
+
+@pytest.fixture
+def approved_session(make_offer):
+    init_db()
+    with Session(engine) as db:
+        sess = SimulationSession(customer_id="CUST_LETTER")
+        db.add(sess); db.commit(); db.refresh(sess)
+        db.add(UserProfile(
+            session_id=sess.id, name="Letter User", age=30, income_monthly=50000, existing_emi=0,
+            employment_type="salaried", loan_type="personal", desired_amount=100000, desired_tenure_months=12,
+        ))
+        db.add(make_offer(sess.id))
+        db.commit()
+        return sess.id
+
+
+def test_render_returns_pdf_bytes_with_metadata():
+    data = render_sanction_pdf("Letter User", OFFER, {}, "REF12345", metadata={"FinSyncRef": "REF12345"})
+    assert isinstance(data, bytes) and data.startswith(b"%PDF")
+    reader = PdfReader(io.BytesIO(data))
+    assert reader.metadata["/FinSyncRef"] == "REF12345"
+    assert "REF12345" in reader.pages[0].extract_text()
+
+
+def test_letter_is_served_from_memory(storage, approved_session, monkeypatch):
+    monkeypatch.setattr(settings, "PERSIST_SANCTION_LETTERS", False)
+    resp = client.get(f"/api/sessions/{approved_session}/sanction-letter")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/pdf"
+    assert resp.content.startswith(b"%PDF")
+    assert storage.list_session(approved_session) == []
+
+
+def test_letter_is_persisted_in_the_background(storage, approved_session, monkeypatch):
+    monkeypatch.setattr(settings, "PERSIST_SANCTION_LETTERS", True)
+    resp = client.get(f"/api/sessions/{approved_session}/sanction-letter")
+    filename = resp.headers["content-disposition"].split('filename="')[1].rstrip('"')
+    assert storage.list_session(approved_session) == [f"{approved_session}/{filename}"]
+    assert storage.get(f"{approved_session}/{filename}") == resp.content
+
+
+def test_no_letter_without_an_approved_offer(storage):
+    assert client.get(f"/api/sessions/{uuid.uuid4()}/sanction-letter").status_code == 404
+
+
+def test_send_email_smtp_attaches_in_memory_pdf(monkeypatch):
+    sent = []
+
+    class Pool:
+        def send(self, msg):
+            sent.append(msg)
+
+    monkeypatch.setattr(pdf_mailer, "get_smtp_pool", lambda cfg: Pool())
+    pdf = render_sanction_pdf("Letter User", OFFER, {}, "REF12345")
+    pdf_mailer.send_email_smtp({"host": "smtp.test", "port": 25, "sender": "noreply@finsync.test"},
+                               "user@example.com", "Your letter", "Attached.", attachments=[("sanction_REF12345.pdf", pdf)])
+
+    (attachment,) = list(sent[0].iter_attachments())
+    assert attachment.get_filename() == "sanction_REF12345.pdf"
+    assert attachment.get_content_type() == "application/pdf"
+    assert attachment.get_content() == pdf
@@ -0,0 +1,68 @@
+import uuid
+from contextlib import contextmanager
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import Session
+
+from main import app
+from app.core.db import engine, init_db
+from app.models.domain_models import OfferStatus, SessionStatus, SimulationSession
+
+client = TestClient(app)
+
+
+@contextmanager
+def _selects():
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def test_summary_etag_and_304(make_offer):
+    init_db()
+    sid = client.post("/api/sessions/start?customer_id=CUST_ETAG", json={}).json()["session_id"]
+
+    first = client.get(f"/api/sessions/{sid}")
+    etag = first.headers["etag"]
+    assert first.json()["user_profile"]["session_id"] == sid
+
+    with _selects() as statements:
+        cached = client.get(f"/api/sessions/{sid}", headers={"if-none-match": etag})
+    assert cached.status_code == 304 and cached.headers["etag"] == etag
+    assert len(statements) == 1 and "JOIN" not in statements[0]
+
+    # any write to the session, its profile or its offers changes the tag
+    with Session(engine) as db:
+        db.add(make_offer(uuid.UUID(sid), 1000.0, OfferStatus.PENDING)); db.commit()
+    changed = client.get(f"/api/sessions/{sid}", headers={"if-none-match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+
+    with Session(engine) as db:
+        sess = db.get(SimulationSession, uuid.UUID(sid))
+        sess.status = SessionStatus.COMPLETED
+        db.add(sess); db.commit()
+    assert client.get(f"/api/sessions/{sid}", headers={"if-none-match": changed.headers["etag"]}).status_code == 200
+
+
+def test_summary_returns_latest_offer_in_one_query(make_offer):
+    init_db()
+    sid = client.post("/api/sessions/start?customer_id=CUST_ETAG", json={}).json()["session_id"]
+    with Session(engine) as db:
+        db.add(make_offer(uuid.UUID(sid), 1000.0, OfferStatus.PENDING)); db.commit()
+        db.add(make_offer(uuid.UUID(sid), 2000.0, OfferStatus.PENDING)); db.commit()
+
+    with _selects() as statements:
+        body = client.get(f"/api/sessions/{sid}").json()
+    assert body["latest_offer"]["amount"] == 2000.0
+    assert len(statements) == 1
+
+    assert client.get(f"/api/sessions/{uuid.uuid4()}").status_code == 404
@@ -249,11 +249,15 @@ def test_dashboard_endpoint(monkeypatch):
             desired_tenure_months=12,
         )
         db.add(profile); db.commit(); db.refresh(profile)
+        db.refresh(user)  # the profile commit expired it; load it before the session closes
 
-    # Monkeypatch the dependency used in routes_dashboard
-    monkeypatch.setattr("app.api.routes_dashboard.get_current_user", lambda: user)
-
-    resp = client.get("/api/dashboard")
+    # Override the (async) auth dependency used in routes_dashboard
+    from app.services.jwt_service import get_current_user_async
+    app.dependency_overrides[get_current_user_async] = lambda: user
+    try:
+        resp = client.get("/api/dashboard")
+    finally:
+        app.dependency_overrides.pop(get_current_user_async, None)
     assert resp.status_code == 200
     data = resp.json()
     assert data.get("customer_id") == "DASH_1"
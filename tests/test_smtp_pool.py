@@ -0,0 +1,88 @@
+import socket
+
+import pytest
+
+pytest.importorskip("aiosmtpd")
+from aiosmtpd.controller import Controller
+
+from app.services.pdf_mailer import build_email_message, send_email_smtp
+from app.services.smtp_pool import SMTPConnectionPool, close_smtp_pools, get_smtp_pool
+
+
+class Sink:
+    def __init__(self):
+        self.messages = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        return "250 OK"
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture()
+def sink():
+    handler = Sink()
+    controller = Controller(handler, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    yield controller, handler
+    controller.stop()
+
+
+def _msg(i, attachments=None):
+    cfg = {"sender": "noreply@finsync.test"}
+    return build_email_message(cfg, f"user{i}@example.com", f"Letter {i}", "body", attachments)
+
+
+def test_pool_reuses_one_connection_for_a_batch(sink):
+    controller, handler = sink
+    pool = SMTPConnectionPool(controller.hostname, controller.port, starttls=False, max_size=2)
+
+    results = pool.send_many([_msg(i) for i in range(10)])
+    pool.send(_msg(10, attachments=[("letter.pdf", b"%PDF-1.4 test")]))
+
+    assert all(err is None for _, err in results)
+    assert len(handler.messages) == 11
+    assert pool.connects == 1
+    assert b"letter.pdf" in handler.messages[-1].content
+    pool.close()
+
+
+def test_pool_replaces_dead_connection(sink):
+    controller, handler = sink
+    pool = SMTPConnectionPool(controller.hostname, controller.port, starttls=False)
+    pool.send(_msg(1))
+
+    # the server (or a NAT box) drops the idle session
+    pool._idle[0].smtp.sock.shutdown(socket.SHUT_RDWR)
+
+    pool.send(_msg(2))
+    assert len(handler.messages) == 2
+    assert pool.connects == 2
+    pool.close()
+
+
+def test_pool_recycles_after_message_limit(sink):
+    controller, handler = sink
+    pool = SMTPConnectionPool(controller.hostname, controller.port, starttls=False, max_messages_per_connection=3)
+    pool.send_many([_msg(i) for i in range(7)])
+    assert len(handler.messages) == 7
+    assert pool.connects == 3
+    pool.close()
+
+
+def test_send_email_smtp_uses_shared_pool_from_settings(sink):
+    controller, handler = sink
+    cfg = {"host": controller.hostname, "port": controller.port, "sender": "noreply@finsync.test", "starttls": False}
+    try:
+        send_email_smtp(cfg, "a@example.com", "One", "body")
+        send_email_smtp(cfg, "b@example.com", "Two", "body", attachments=[("letter.pdf", b"%PDF-1.4 test")])
+        pool = get_smtp_pool(cfg)
+        assert len(handler.messages) == 2
+        assert pool.connects == 1
+    finally:
+        close_smtp_pools()
@@ -0,0 +1,108 @@
+import io
+import uuid
+
+import pytest
+
+from app.services.storage import LocalStorage, S3Storage, StorageBackend, session_key, shard_prefix
+
+
+class NotFound(Exception):
+    response = {"Error": {"Code": "404"}}
+
+
+class FakeS3Client:
+    """Minimal in-memory stand-in for an S3/MinIO endpoint."""
+
+    def __init__(self):
+        self.objects = {}
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        self.objects[(Bucket, Key)] = bytes(Body)
+
+    def upload_fileobj(self, fileobj, bucket, key, **kwargs):
+        self.objects[(bucket, key)] = fileobj.read()
+
+    def upload_file(self, path, bucket, key, **kwargs):
+        with open(path, "rb") as f:
+            self.objects[(bucket, key)] = f.read()
+
+    def get_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise NotFound()
+        return {"Body": io.BytesIO(self.objects[(Bucket, Key)])}
+
+    def head_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise NotFound()
+        return {}
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop((Bucket, Key), None)
+
+    def list_objects_v2(self, Bucket, Prefix, **kwargs):
+        return {"Contents": [{"Key": k} for (b, k) in sorted(self.objects) if b == Bucket and k.startswith(Prefix)]}
+
+
+def test_local_storage_shards_by_session_hash(tmp_path):
+    storage = LocalStorage(str(tmp_path))
+    sid = uuid.uuid4()
+    key = storage.put(session_key(sid, "a.pdf"), b"data")
+
+    expected = tmp_path / shard_prefix(str(sid)) / str(sid) / "a.pdf"
+    assert storage.local_path(key) == str(expected)
+    assert storage.get(key) == b"data"
+    assert storage.list_session(sid) == [key]
+    # nothing but shard directories at the top level
+    assert all(len(p.name) == 2 for p in tmp_path.iterdir())
+
+    storage.delete(key)
+    assert not storage.exists(key)
+
+
+def test_local_storage_reads_legacy_layouts(tmp_path):
+    sid = uuid.uuid4()
+    (tmp_path / str(sid)).mkdir()
+    (tmp_path / str(sid) / "old.pdf").write_bytes(b"nested")
+    (tmp_path / f"{sid}_flat.pdf").write_bytes(b"flat")
+
+    storage = LocalStorage(str(tmp_path))
+    assert storage.get(session_key(sid, "old.pdf")) == b"nested"
+    assert storage.get(session_key(sid, "flat.pdf")) == b"flat"
+
+
+def test_session_key_rejects_traversal():
+    assert session_key("s", "../../etc/passwd") == "s/passwd"
+    with pytest.raises(ValueError):
+        session_key("s", "..")
+
+
+def test_incomplete_backend_fails_at_construction():
+    class PutOnly(StorageBackend):
+        def put(self, key, data, content_type=None):
+            return key
+
+    with pytest.raises(TypeError):
+        PutOnly()
+
+
+def test_s3_storage_round_trip_against_stand_in(tmp_path):
+    client = FakeS3Client()
+    storage = S3Storage("letters", client=client, prefix="finsync")
+    sid = uuid.uuid4()
+
+    storage.put(session_key(sid, "a.pdf"), b"one")
+    storage.put_fileobj(session_key(sid, "b.pdf"), io.BytesIO(b"two"))
+    src = tmp_path / "c.pdf"
+    src.write_bytes(b"three")
+    storage.put_file(session_key(sid, "c.pdf"), str(src))
+
+    assert not src.exists()
+    assert storage.get(session_key(sid, "b.pdf")) == b"two"
+    assert storage.list_session(sid) == [session_key(sid, n) for n in ("a.pdf", "b.pdf", "c.pdf")]
+    assert all(k.startswith(f"finsync/{shard_prefix(str(sid))}/") for (_, k) in client.objects)
+    assert storage.local_path(session_key(sid, "a.pdf")) is None
+
+    storage.delete(session_key(sid, "a.pdf"))
+    assert not storage.exists(session_key(sid, "a.pdf"))
+    with pytest.raises(FileNotFoundError):
+        storage.get(session_key(sid, "a.pdf"))
@@ -0,0 +1,180 @@
+import hashlib
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from main import app
+from app.core.config import settings
+from app.core.db import engine, init_db
+from app.models.domain_models import StoredBlob, UploadedDocument
+from app.services.storage import get_storage
+from app.services.uploads import collect_unreferenced_blobs, release_session_documents
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def _schema():
+    init_db()
+
+
+def _session():
+    return client.post("/api/sessions/start?customer_id=CUST_UPLOAD", json={}).json()["session_id"]
+
+
+def test_upload_records_sha256_and_stores_file(monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_CHUNK_BYTES", 7)  # force several chunks
+    sid = _session()
+    content = b"%PDF-1.4 salary slip " * 50
+    resp = client.post(f"/api/sessions/{sid}/upload-salary", files={"file": ("slip.pdf", content, "application/pdf")})
+    assert resp.status_code == 200
+
+    with Session(engine) as db:
+        doc = db.exec(select(UploadedDocument).where(UploadedDocument.session_id == uuid.UUID(sid))).one()
+    assert doc.sha256 == hashlib.sha256(content).hexdigest()
+    assert doc.size_bytes == len(content)
+    assert get_storage().get(doc.key) == content
+
+
+def test_oversized_upload_is_rejected(monkeypatch):
+    monkeypatch.setattr(settings, "MAX_UPLOAD_BYTES", 1024)
+    sid = _session()
+    resp = client.post(f"/api/chat/{sid}/upload-salary", files={"file": ("big.pdf", b"x" * 64 * 1024, "application/pdf")})
+    assert resp.status_code == 413
+    with Session(engine) as db:
+        assert not db.exec(select(UploadedDocument).where(UploadedDocument.session_id == uuid.UUID(sid))).all()
+
+
+def test_cap_is_enforced_while_streaming(monkeypatch):
+    # within the Content-Length slack, so only the streaming check can catch it
+    monkeypatch.setattr(settings, "MAX_UPLOAD_BYTES", 1024)
+    sid = _session()
+    resp = client.post(f"/api/chat/{sid}/upload-salary", files={"file": ("big.pdf", b"x" * 2048, "application/pdf")})
+    assert resp.status_code == 413
+
+
+def test_reupload_reuses_stored_content(monkeypatch):
+    content = b"%PDF-1.4 dedup " + uuid.uuid4().bytes
+    sha = hashlib.sha256(content).hexdigest()
+    storage = get_storage()
+    writes = []
+    original = storage.put_fileobj
+    monkeypatch.setattr(storage, "put_fileobj", lambda key, f, content_type=None: writes.append(key) or original(key, f, content_type))
+
+    sid1, sid2 = _session(), _session()
+    for sid, name in ((sid1, "slip.pdf"), (sid1, "slip-again.pdf"), (sid2, "copy.pdf")):
+        client.post(f"/api/sessions/{sid}/upload-salary", files={"file": (name, content, "application/pdf")})
+
+    client.post(f"/api/sessions/{sid1}/upload-salary", files={"file": ("slip.pdf", content, "application/pdf")})
+
+    assert len(writes) == 1
+    with Session(engine) as db:
+        blob = db.get(StoredBlob, sha)
+        docs = db.exec(select(UploadedDocument).where(UploadedDocument.sha256 == sha)).all()
+    assert blob.refcount == 3
+    assert len(docs) == 3 and {d.key for d in docs} == {blob.key}
+
+    resp = client.get(f"/api/sessions/{sid2}/uploads/copy.pdf")
+    assert resp.status_code == 200 and resp.content == content
+    # a re-upload under a new name doesn't take the old URL away
+    for name in ("slip.pdf", "slip-again.pdf"):
+        assert client.get(f"/api/sessions/{sid1}/uploads/{name}").content == content
+
+
+def test_unreferenced_blob_is_collected():
+    content = b"%PDF-1.4 gc " + uuid.uuid4().bytes
+    sha = hashlib.sha256(content).hexdigest()
+    sid1, sid2 = _session(), _session()
+    for sid in (sid1, sid2):
+        client.post(f"/api/sessions/{sid}/upload-salary", files={"file": ("slip.pdf", content, "application/pdf")})
+
+    with Session(engine) as db:
+        key = db.get(StoredBlob, sha).key
+        release_session_documents(db, uuid.UUID(sid1))
+        assert collect_unreferenced_blobs(db, grace_seconds=0) == 0  # still referenced by sid2
+        release_session_documents(db, uuid.UUID(sid2))
+        assert db.get(StoredBlob, sha).orphaned_at is not None
+        assert collect_unreferenced_blobs(db, grace_seconds=3600) == 0  # within the grace period
+        assert collect_unreferenced_blobs(db, grace_seconds=0) == 1
+        assert db.get(StoredBlob, sha) is None
+    assert not get_storage().exists(key)
+
+
+def test_blob_row_outlives_its_object_during_collection(monkeypatch):
+    content = b"%PDF-1.4 gc race " + uuid.uuid4().bytes
+    sha = hashlib.sha256(content).hexdigest()
+    sid = _session()
+    client.post(f"/api/sessions/{sid}/upload-salary", files={"file": ("slip.pdf", content, "application/pdf")})
+    storage = get_storage()
+    original = storage.delete
+    seen = []
+
+    def delete(key):
+        # what a concurrent upload would see while the object is being removed
+        with Session(engine) as other:
+            seen.append(other.get(StoredBlob, sha) is not None)
+        original(key)
+
+    monkeypatch.setattr(storage, "delete", delete)
+    with Session(engine) as db:
+        release_session_documents(db, uuid.UUID(sid))
+        assert collect_unreferenced_blobs(db, grace_seconds=0) == 1
+        assert db.get(StoredBlob, sha) is None
+    assert seen == [True]
+
+
+def test_failed_object_delete_keeps_the_blob_row(monkeypatch):
+    content = b"%PDF-1.4 gc fail " + uuid.uuid4().bytes
+    sha = hashlib.sha256(content).hexdigest()
+    sid = _session()
+    client.post(f"/api/sessions/{sid}/upload-salary", files={"file": ("slip.pdf", content, "application/pdf")})
+    monkeypatch.setattr(get_storage(), "delete", lambda key: 1 / 0)
+    with Session(engine) as db:
+        release_session_documents(db, uuid.UUID(sid))
+        with pytest.raises(ZeroDivisionError):
+            collect_unreferenced_blobs(db, grace_seconds=0)
+        assert db.get(StoredBlob, sha) is not None
+
+
+def test_upload_serving_supports_conditional_get_and_ranges():
+    content = b"%PDF-1.4 serve " + uuid.uuid4().bytes + b"0123456789"
+    sid = _session()
+    client.post(f"/api/sessions/{sid}/upload-salary", files={"file": ("slip.pdf", content, "application/pdf")})
+    url = f"/api/sessions/{sid}/uploads/slip.pdf"
+
+    resp = client.get(url)
+    assert resp.status_code == 200 and resp.content == content
+    assert resp.headers["content-type"] == "application/pdf"
+    assert resp.headers["content-disposition"].startswith("inline")
+    etag = resp.headers["etag"]
+    assert etag == f'"{hashlib.sha256(content).hexdigest()}"'
+    assert "last-modified" in resp.headers
+
+    resp = client.get(url, headers={"If-None-Match": etag})
+    assert resp.status_code == 304 and resp.content == b""
+    resp = client.get(url, headers={"If-Modified-Since": resp.headers["last-modified"]})
+    assert resp.status_code == 304
+
+    resp = client.get(url, headers={"Range": "bytes=-10"})
+    assert resp.status_code == 206 and resp.content == b"0123456789"
+    assert resp.headers["content-range"] == f"bytes {len(content) - 10}-{len(content) - 1}/{len(content)}"
+
+    # a stale If-Range validator gets the whole file
+    resp = client.get(url, headers={"Range": "bytes=0-3", "If-Range": '"stale"'})
+    assert resp.status_code == 200 and resp.content == content
+
+
+def test_ranges_from_non_local_storage(monkeypatch):
+    content = b"abcdefghij" * 10
+    sid = _session()
+    client.post(f"/api/sessions/{sid}/upload-salary", files={"file": ("slip.pdf", content, "application/pdf")})
+    monkeypatch.setattr(get_storage(), "local_path", lambda key: None)
+    url = f"/api/sessions/{sid}/uploads/slip.pdf"
+
+    resp = client.get(url, headers={"Range": "bytes=10-19"})
+    assert resp.status_code == 206 and resp.content == b"abcdefghij"
+    assert client.get(url, headers={"Range": "bytes=500-"}).status_code == 416
+    etag = client.get(url).headers["etag"]
+    assert client.get(url, headers={"If-None-Match": f"W/{etag}"}).status_code == 304